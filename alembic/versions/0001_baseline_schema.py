@@ -0,0 +1,103 @@
+"""Baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.true()),
+        sa.Column("is_superuser", sa.Boolean(), server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "model_metadata",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("model_version", sa.String(50), nullable=False),
+        sa.Column("model_path", sa.String(500), nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_model_metadata_model_version", "model_metadata", ["model_version"], unique=True)
+    op.create_index("ix_model_metadata_is_active", "model_metadata", ["is_active"])
+
+    op.create_table(
+        "predictions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("request_id", sa.String(100), nullable=False, unique=True),
+        sa.Column("prediction_type", sa.String(20), nullable=False),
+        sa.Column("input_features", postgresql.JSONB(), nullable=False),
+        sa.Column("prediction_result", postgresql.JSONB(), nullable=False),
+        sa.Column("model_version", sa.String(50), nullable=False),
+        sa.Column("confidence_score", sa.Float()),
+        sa.Column("processing_time_ms", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "api_metrics",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("endpoint", sa.String(100), nullable=False),
+        sa.Column("method", sa.String(10), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("response_time_ms", sa.Integer(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("model_version", sa.String(50), sa.ForeignKey("model_metadata.model_version")),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_api_metrics_endpoint", "api_metrics", ["endpoint"])
+    op.create_index("ix_api_metrics_user_id", "api_metrics", ["user_id"])
+    op.create_index("ix_api_metrics_timestamp", "api_metrics", ["timestamp"])
+
+    op.create_table(
+        "api_metrics_rollups",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("interval_seconds", sa.Integer(), nullable=False),
+        sa.Column("endpoint", sa.String(100), nullable=False),
+        sa.Column("method", sa.String(10), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("model_version", sa.String(50)),
+        sa.Column("request_count", sa.Integer(), nullable=False),
+        sa.Column("total_ms", sa.Float(), nullable=False),
+        sa.Column("min_ms", sa.Float(), nullable=False),
+        sa.Column("max_ms", sa.Float(), nullable=False),
+        sa.Column("latency_histogram", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.UniqueConstraint(
+            "bucket_start", "endpoint", "method", "status_code", "user_id", "model_version",
+            name="uq_api_metrics_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index("ix_api_metrics_rollups_bucket_start", "api_metrics_rollups", ["bucket_start"])
+
+
+def downgrade() -> None:
+    op.drop_table("api_metrics_rollups")
+    op.drop_table("api_metrics")
+    op.drop_table("predictions")
+    op.drop_table("model_metadata")
+    op.drop_table("users")
@@ -0,0 +1,34 @@
+"""Composite index for keyset-paginated prediction history
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so a live predictions table is not locked against writes;
+    # newest-first scans walk the btree backwards, so ascending order serves them
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_predictions_user_id_created_at_id",
+            "predictions",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_predictions_user_id_created_at_id",
+            table_name="predictions",
+            postgresql_concurrently=True,
+        )
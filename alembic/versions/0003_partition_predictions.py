@@ -0,0 +1,130 @@
+"""Partition predictions by day and add daily summary tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Daily partitions created up front; the partition service keeps extending them
+PREMAKE_DAYS = 7
+
+
+def _create_predictions(**table_kwargs) -> None:
+    op.create_table(
+        "predictions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("request_id", sa.String(100), nullable=False),
+        sa.Column("prediction_type", sa.String(20), nullable=False),
+        sa.Column("input_features", postgresql.JSONB(), nullable=False),
+        sa.Column("prediction_result", postgresql.JSONB(), nullable=False),
+        sa.Column("model_version", sa.String(50), nullable=False),
+        sa.Column("confidence_score", sa.Float()),
+        sa.Column("processing_time_ms", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        **table_kwargs,
+    )
+
+
+def upgrade() -> None:
+    # Keep the unpartitioned table aside and rename its constraints out of the way
+    op.rename_table("predictions", "predictions_legacy")
+    op.execute("ALTER INDEX predictions_pkey RENAME TO predictions_legacy_pkey")
+    # UNIQUE(request_id) from 0001, or the plain index this migration's downgrade restores
+    op.execute("ALTER INDEX IF EXISTS predictions_request_id_key RENAME TO predictions_legacy_request_id_key")
+    op.execute("ALTER INDEX IF EXISTS ix_predictions_request_id RENAME TO ix_predictions_legacy_request_id")
+    op.execute("ALTER INDEX ix_predictions_user_id_created_at_id RENAME TO ix_predictions_legacy_user_id_created_at_id")
+
+    # Primary and unique keys of a partitioned table must include the partition key.
+    # UNIQUE(request_id) is not kept: with created_at added it would enforce nothing.
+    _create_predictions(postgresql_partition_by="RANGE (created_at)")
+    op.create_primary_key("predictions_pkey", "predictions", ["id", "created_at"])
+    op.create_index("ix_predictions_user_id_created_at_id", "predictions", ["user_id", "created_at", "id"])
+
+    # Existing rows go to one catch-all partition ending at today (UTC); they age
+    # out as a unit once today falls out of the retention window
+    today = datetime.now(timezone.utc).date()
+    op.execute(
+        "CREATE TABLE predictions_p_legacy PARTITION OF predictions "
+        f"FOR VALUES FROM (MINVALUE) TO ('{today.isoformat()} 00:00:00+00')"
+    )
+    # Rows with no daily partition (maintenance stopped for too long) land here
+    # instead of failing the insert; maintenance moves them into daily partitions
+    op.execute("CREATE TABLE predictions_p_default PARTITION OF predictions DEFAULT")
+    for offset in range(PREMAKE_DAYS + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE predictions_p{day.strftime('%Y%m%d')} PARTITION OF predictions "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+            f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+        )
+
+    op.execute(
+        "INSERT INTO predictions "
+        "(id, user_id, request_id, prediction_type, input_features, prediction_result, "
+        "model_version, confidence_score, processing_time_ms, created_at) "
+        "SELECT id, user_id, request_id, prediction_type, input_features, prediction_result, "
+        "model_version, confidence_score, processing_time_ms, COALESCE(created_at, now()) "
+        "FROM predictions_legacy"
+    )
+    op.drop_table("predictions_legacy")
+
+    op.create_table(
+        "prediction_daily_user_summaries",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("model_version", sa.String(50), nullable=False),
+        sa.Column("prediction_count", sa.Integer(), nullable=False),
+        sa.Column("extrovert_count", sa.Integer(), nullable=False),
+        sa.Column("avg_confidence", sa.Float()),
+        sa.Column("avg_processing_ms", sa.Float()),
+        sa.UniqueConstraint(
+            "day", "user_id", "model_version",
+            name="uq_prediction_daily_user_summary",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index("ix_prediction_daily_user_summaries_day", "prediction_daily_user_summaries", ["day"])
+    op.create_index("ix_prediction_daily_user_summaries_user_id", "prediction_daily_user_summaries", ["user_id"])
+
+    op.create_table(
+        "prediction_daily_model_summaries",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("model_version", sa.String(50), primary_key=True),
+        sa.Column("prediction_count", sa.Integer(), nullable=False),
+        sa.Column("extrovert_count", sa.Integer(), nullable=False),
+        sa.Column("user_count", sa.Integer(), nullable=False),
+        sa.Column("avg_confidence", sa.Float()),
+        sa.Column("avg_processing_ms", sa.Float()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("prediction_daily_model_summaries")
+    op.drop_table("prediction_daily_user_summaries")
+
+    op.rename_table("predictions", "predictions_partitioned")
+    op.execute("ALTER TABLE predictions_partitioned RENAME CONSTRAINT predictions_pkey TO predictions_partitioned_pkey")
+    op.execute("ALTER INDEX ix_predictions_user_id_created_at_id RENAME TO ix_predictions_partitioned_user_id_created_at_id")
+
+    _create_predictions()
+    op.create_primary_key("predictions_pkey", "predictions", ["id"])
+    # Idempotent requests share their key as request_id, and rows logged while
+    # partitioned may repeat one, so the restored lookup index is not unique
+    op.create_index("ix_predictions_request_id", "predictions", ["request_id"])
+    op.create_index("ix_predictions_user_id_created_at_id", "predictions", ["user_id", "created_at", "id"])
+    op.execute("INSERT INTO predictions SELECT * FROM predictions_partitioned")
+    # Dropping the parent drops its partitions; detached archive_* tables are left alone
+    op.drop_table("predictions_partitioned")
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
@@ -8,9 +8,18 @@ from app.core.security import decode_access_token, oauth2_scheme
 from app.db.models import User  # Added missing import
 
 async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
+    user = await authenticate_token(db, token)
+    # Attribute the request to the user in API metrics rollups
+    request.state.user_id = user.id
+    return user
+
+
+async def authenticate_token(db: AsyncSession, token: str) -> User:
+    """User of a bearer token; raises 401 when the token or user is invalid."""
     try:
         payload = decode_access_token(token)
         user_id = payload.get("sub")
@@ -32,3 +41,14 @@ async def get_current_user(
             detail="User not found"
         )
     return user
+
+
+async def get_current_superuser(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
@@ -0,0 +1,218 @@
+"""
+Admin-only diagnostics endpoints.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_superuser
+from app.crud.metrics import metrics_crud
+from app.db.session import get_db
+from app.schemas.admin import (
+    AllocationSite,
+    ApiMetricsRollupOut,
+    MemorySnapshotInfo,
+    MemoryStatus,
+    ModuleAllocationDiff,
+    ProfilingConfig,
+    ProfileListResponse,
+)
+
+router = APIRouter(dependencies=[Depends(get_current_superuser)])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/profiles", response_model=ProfileListResponse)
+async def list_profiles(request: Request):
+    """
+    List stored request profiles.
+    
+    Returns:
+        Current sampling rate and stored profiles, newest first
+    """
+    profiler = request.app.state.profiler
+    return ProfileListResponse(
+        sample_every=profiler.sample_every,
+        profiles=profiler.list_profiles()
+    )
+
+
+@router.get("/profiles/{name}")
+async def get_profile(request: Request, name: str):
+    """
+    Download a stored profile in collapsed-stack format.
+    
+    Args:
+        name: Profile file name
+    
+    Returns:
+        Collapsed stacks, one ``frame;frame count`` line per stack
+    """
+    path = request.app.state.profiler.get_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.put("/profiling", response_model=ProfilingConfig)
+async def configure_profiling(request: Request, config: ProfilingConfig):
+    """
+    Change the one-in-N request sampling rate without a redeploy.
+    
+    Args:
+        config: New profiling configuration
+    
+    Returns:
+        Applied profiling configuration
+    """
+    request.app.state.profiler.sample_every = config.sample_every
+    logger.info(f"Request profiling sampling set to 1 in {config.sample_every}")
+    return config
+
+
+@router.get("/memory", response_model=MemoryStatus)
+async def memory_status(request: Request):
+    """
+    Report tracemalloc state and stored snapshots.
+    
+    Returns:
+        Memory tracing status
+    """
+    return request.app.state.memory_profiler.status()
+
+
+@router.post("/memory/start", response_model=MemoryStatus)
+async def start_memory_tracing(request: Request, frames: int = Query(1, ge=1, le=50)):
+    """
+    Start tracing allocations.
+    
+    Args:
+        frames: Frames stored per allocation traceback
+    
+    Returns:
+        Memory tracing status
+    """
+    memory_profiler = request.app.state.memory_profiler
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/stop", response_model=MemoryStatus)
+async def stop_memory_tracing(request: Request):
+    """
+    Stop tracing allocations and discard snapshots.
+    
+    Returns:
+        Memory tracing status
+    """
+    memory_profiler = request.app.state.memory_profiler
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotInfo)
+async def take_memory_snapshot(request: Request):
+    """
+    Take a tracemalloc snapshot off the event loop.
+    
+    Returns:
+        Id and capture time of the new snapshot
+    """
+    memory_profiler = request.app.state.memory_profiler
+    try:
+        snapshot_id = await asyncio.to_thread(memory_profiler.take_snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return next(s for s in memory_profiler.status()["snapshots"] if s["id"] == snapshot_id)
+
+
+@router.get("/memory/top", response_model=List[AllocationSite])
+async def top_allocations(
+    request: Request,
+    snapshot_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|module)$"),
+):
+    """
+    Largest allocation sites of a snapshot.
+    
+    Args:
+        snapshot_id: Snapshot to report on (latest if omitted)
+        limit: Number of sites returned
+        group_by: Group by source line, file or module
+    
+    Returns:
+        Allocation sites ordered by size
+    """
+    memory_profiler = request.app.state.memory_profiler
+    try:
+        return await asyncio.to_thread(memory_profiler.top, snapshot_id, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/memory/diff", response_model=List[ModuleAllocationDiff])
+async def diff_allocations(
+    request: Request,
+    base_id: int,
+    target_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=500),
+):
+    """
+    Allocation growth between two snapshots, grouped by module.
+    
+    Args:
+        base_id: Older snapshot
+        target_id: Newer snapshot (latest if omitted)
+        limit: Number of modules returned
+    
+    Returns:
+        Modules ordered by absolute size change
+    """
+    memory_profiler = request.app.state.memory_profiler
+    try:
+        return await asyncio.to_thread(memory_profiler.diff, base_id, target_id, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/memory/structures")
+async def memory_structures(request: Request, include_types: bool = False) -> Dict[str, Any]:
+    """
+    Sizes of caches, queues, windows and resident models.
+    
+    Args:
+        include_types: Also count all live objects by type (slow)
+    
+    Returns:
+        Structure reports keyed by name
+    """
+    memory_profiler = request.app.state.memory_profiler
+    return await asyncio.to_thread(memory_profiler.structures, include_types)
+
+
+@router.get("/api-metrics", response_model=List[ApiMetricsRollupOut])
+async def api_metrics_rollups(
+    since_minutes: int = Query(60, ge=1, le=60 * 24 * 31),
+    endpoint: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Per-interval API metrics rollups for dashboards.
+    
+    Args:
+        since_minutes: How far back to look
+        endpoint: Optional route template filter, e.g. "/predict/single"
+        limit: Maximum rows returned
+    
+    Returns:
+        Rollup rows, newest first
+    """
+    since = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
+    return await metrics_crud.get_rollups(db, since=since, endpoint=endpoint, limit=limit)
@@ -1,8 +1,20 @@
 # app/api/endpoints/gui.py - OPTIMIZED VERSION
-from fastapi import APIRouter, Request, Form, status, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, Form, File, UploadFile, status, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+import asyncio
 import logging
+import os
+import re
+from functools import partial
+
+from app.core.config import settings
+from app.core.logging import log_prediction_sampled
+from app.core.metrics import mark_handler_start, record_prediction
+from app.core.scheduler import INTERACTIVE, BULK, LaneFullError
+from app.services.csv_scoring_service import CSVFormatError, CSVScoringJob
+from app.schemas.request import PersonalityFeatures
+from app.api.endpoints.health import increment_prediction_count
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -28,6 +40,8 @@ async def handle_gui(
     post_frequency: float = Form(...),
 ):
     """Handle form submission using the global predictor instance."""
+    mark_handler_start(request)
+    
     try:
         # Build feature dict
         features = {
@@ -46,10 +60,18 @@ async def handle_gui(
         
         predictor = request.app.state.predictor  # Single line - no object creation!
         
-        # Make prediction using the reusable predictor
-        prediction_result = predictor.predict_single(features)
+        # The model (and drift monitor) expect the training feature names
+        model_features = PersonalityFeatures(**features).to_dict()
+        
+        # Make prediction on the interactive lane, shared with identical requests in flight
+        prediction_result = await predictor.predict_single_coalesced(
+            partial(request.app.state.scheduler.run, INTERACTIVE), model_features, endpoint="gui"
+        )
         
-        logger.info(f"GUI prediction successful: {prediction_result}")
+        if log_prediction_sampled():
+            logger.info("GUI prediction successful", extra={"prediction": prediction_result['prediction']})
+        increment_prediction_count()
+        record_prediction("gui", settings.MODEL_VERSION, "success", samples=1)
 
         # Render result page
         return templates.TemplateResponse(
@@ -64,8 +86,12 @@ async def handle_gui(
         
     except HTTPException:
         raise
+    except LaneFullError as e:
+        record_prediction("gui", settings.MODEL_VERSION, "rejected")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"GUI prediction failed: {str(e)}")
+        record_prediction("gui", settings.MODEL_VERSION, "error")
         
         # Render error in the form
         return templates.TemplateResponse(
@@ -77,3 +103,69 @@ async def handle_gui(
             },
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         )
+
+
+
+@router.get("/gui/upload", response_class=HTMLResponse, tags=["GUI"])
+async def render_upload(request: Request):
+    """Render the CSV upload form"""
+    return templates.TemplateResponse("gui_upload.html", {"request": request})
+
+
+@router.post("/gui/upload", tags=["GUI"])
+async def handle_upload(request: Request, file: UploadFile = File(...)):
+    """
+    Score an uploaded CSV file and stream the scored file back as a download.
+    
+    Rows are read, validated and scored in chunks on the bulk lane while the
+    response streams, so the file is never held in memory as a whole.
+    """
+    mark_handler_start(request)
+    
+    if not hasattr(request.app.state, 'predictor'):
+        raise HTTPException(status_code=503, detail="Predictor not initialized")
+    scheduler = request.app.state.scheduler
+    
+    try:
+        # Reading the header touches the (possibly disk-spooled) upload, so it runs off the loop too
+        job = await scheduler.run(BULK, CSVScoringJob, request.app.state.predictor, file.file)
+    except CSVFormatError as e:
+        record_prediction("gui_csv", settings.MODEL_VERSION, "error")
+        return templates.TemplateResponse(
+            name="gui_upload.html",
+            context={"request": request, "error_message": str(e)},
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    except LaneFullError as e:
+        record_prediction("gui_csv", settings.MODEL_VERSION, "rejected")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    
+    async def scored_csv():
+        yield job.header()
+        while True:
+            try:
+                chunk = await scheduler.run(BULK, job.next_chunk, settings.csv_chunk_size)
+            except LaneFullError:
+                # The status line is already sent; wait for room instead of failing the download
+                await asyncio.sleep(0.5)
+                continue
+            except Exception as e:
+                logger.error(f"CSV scoring failed after {job.rows} rows: {str(e)}")
+                record_prediction("gui_csv", settings.MODEL_VERSION, "error", samples=job.rows)
+                yield f"# scoring failed after {job.rows} rows: {str(e)}\n"
+                return
+            if chunk is None:
+                break
+            yield chunk
+        
+        scored = job.rows - job.errors
+        increment_prediction_count(scored)
+        record_prediction("gui_csv", settings.MODEL_VERSION, "success", samples=scored)
+        logger.info("CSV scoring completed", extra={"samples": job.rows, "invalid_samples": job.errors})
+    
+    name = re.sub(r"[^\w.-]", "_", os.path.splitext(os.path.basename(file.filename or "predictions.csv"))[0])
+    return StreamingResponse(
+        scored_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{name}_scored.csv"'},
+    )
@@ -3,13 +3,13 @@ Health check endpoints.
 """
 
 import time
-import psutil
 import logging
 from datetime import datetime, timezone
 from fastapi import APIRouter, Request, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from app.schemas.response import HealthResponse, MetricsResponse
+from app.core.config import settings
+from app.schemas.response import DriftResponse, HealthResponse, MetricsResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,6 +19,28 @@ startup_time = time.time()
 prediction_count = 0
 
 
+def saturation_reason(request: Request) -> Optional[str]:
+    """
+    Explain why the worker is saturated, if it is.
+    
+    Returns:
+        Reason string, or None when the worker can take more traffic
+    """
+    sampler = getattr(request.app.state, 'sampler', None)
+    if sampler is not None:
+        loop_lag_ms = sampler.recent_loop_lag() * 1000
+        if loop_lag_ms > settings.ready_max_loop_lag_ms:
+            return f"Event loop lag {loop_lag_ms:.0f}ms exceeds {settings.ready_max_loop_lag_ms:.0f}ms"
+    
+    scheduler = getattr(request.app.state, 'scheduler', None)
+    if scheduler is not None:
+        queue_depth = scheduler.queue_depth()
+        if queue_depth > settings.ready_max_queue_depth:
+            return f"Queue depth {queue_depth} exceeds {settings.ready_max_queue_depth}"
+    
+    return None
+
+
 @router.get("/", response_model=HealthResponse)
 async def health_check(request: Request):
     """
@@ -59,6 +81,11 @@ async def readiness_check(request: Request):
         if not model_loaded:
             raise HTTPException(status_code=503, detail="Model not loaded")
         
+        # Steer load balancers away before requests start timing out
+        reason = saturation_reason(request)
+        if reason:
+            raise HTTPException(status_code=503, detail=f"Saturated: {reason}")
+        
         return HealthResponse(
             status="ready",
             timestamp=datetime.utcnow().isoformat(),
@@ -104,10 +131,8 @@ async def get_metrics(request: Request):
         # Calculate uptime
         uptime_seconds = time.time() - startup_time
         
-        # Get memory usage
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        memory_usage_mb = memory_info.rss / 1024 / 1024  # Convert to MB
+        # Resource readings come from the background sampler's ring buffers
+        sampler = request.app.state.sampler
         
         # Check model status
         model_loaded = hasattr(request.app.state, 'model_loader') and \
@@ -115,11 +140,15 @@ async def get_metrics(request: Request):
         
         model_status = "loaded" if model_loaded else "not_loaded"
         
+        scheduler = getattr(request.app.state, 'scheduler', None)
+        
         return MetricsResponse(
             total_predictions=prediction_count,
             model_status=model_status,
             uptime_seconds=uptime_seconds,
-            memory_usage_mb=memory_usage_mb
+            memory_usage_mb=sampler.memory_usage_mb(),
+            lanes=scheduler.stats() if scheduler else None,
+            resources=sampler.summary()
         )
     
     except Exception as e:
@@ -127,7 +156,27 @@ async def get_metrics(request: Request):
         raise HTTPException(status_code=500, detail="Metrics collection failed")
 
 
-def increment_prediction_count():
-    """Increment the prediction counter."""
+@router.get("/drift", response_model=DriftResponse)
+async def get_drift(request: Request):
+    """
+    Get feature and prediction drift of this worker's live traffic.
+    
+    Returns:
+        PSI, KS and missing rate per feature for the current and recent windows
+    """
+    if not hasattr(request.app.state, 'predictor'):
+        raise HTTPException(status_code=503, detail="Predictor not initialized")
+    
+    report = request.app.state.predictor.drift.report()
+    for window in [report["current"], *report["completed"]]:
+        window["drifted"] = sorted(
+            feature for feature, entry in window["features"].items()
+            if entry.get("psi", 0.0) > settings.drift_psi_alert
+        )
+    return DriftResponse(psi_alert=settings.drift_psi_alert, **report)
+
+
+def increment_prediction_count(count: int = 1):
+    """Increment the prediction counter by the number of samples scored."""
     global prediction_count
-    prediction_count += 1
\ No newline at end of file
+    prediction_count += count
\ No newline at end of file
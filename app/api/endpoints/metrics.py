@@ -0,0 +1,22 @@
+"""
+Prometheus metrics endpoint.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Expose metrics in the Prometheus text format.
+    
+    Returns:
+        Prometheus exposition payload
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
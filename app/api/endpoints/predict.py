@@ -3,30 +3,91 @@
 Prediction endpoints - OPTIMIZED VERSION
 """
 
+import time
+import hashlib
 import logging
-from fastapi import APIRouter, Request, HTTPException
-from typing import Dict, Any
+from functools import partial
+from urllib.parse import urlencode
+from fastapi import APIRouter, Request, Response, HTTPException, Depends, Header, Query
+from fastapi.responses import RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+from pydantic import ValidationError
 
-from app.schemas.request import SinglePredictionRequest, BatchPredictionRequest
-from app.schemas.response import SinglePredictionResponse, BatchPredictionResponse
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.metrics import (
+    BATCH_SIZE, mark_handler_start, mark_handler_done, record_prediction, time_stage
+)
+from app.core.responses import trusted_response
+from app.core.scheduler import INTERACTIVE, BULK, LaneFullError
+from app.crud.predictions import prediction_crud
+from app.db.models import User
+from app.db.session import get_db
+from app.schemas.prediction import PredictionCreate
+from app.utils.validation import BatchValidation, validate_batch
+from app.services.idempotency_service import MAX_KEY_LENGTH, IdempotencyKeyReused, idempotency_service
+from app.models.aggregate import PopulationSummary
+from app.schemas.request import (
+    FEATURE_NAMES, PersonalityFeatures, SinglePredictionRequest, BatchPredictionRequest, AggregateRequest,
+    WhatIfRequest, CounterfactualRequest
+)
+from app.schemas.response import (
+    SinglePredictionResponse, BatchPredictionResponse, ExplanationResponse, AggregateResponse,
+    WhatIfResponse, CounterfactualResponse
+)
 from app.api.endpoints.health import increment_prediction_count
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.post("/single", response_model=SinglePredictionResponse)
+
+def lane_full(error: LaneFullError) -> HTTPException:
+    """Map a saturated scheduling lane to a retryable 503."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
+def check_cascade(request: Request, cascade: bool) -> None:
+    """Reject cascaded requests when the loaded model has no calibrated cascade."""
+    if cascade and request.app.state.predictor.cascade is None:
+        raise HTTPException(status_code=400, detail="Cascaded inference is not available for this model")
+
+
+def validated(prediction_request: BatchPredictionRequest) -> BatchValidation:
+    """Validate a batch request's samples column-wise."""
+    with time_stage("validation"):
+        return validate_batch(prediction_request.features)
+
+
+def row_errors(validation: BatchValidation) -> List[Dict[str, Any]]:
+    """Per-sample validation errors, in request order."""
+    return [{"index": index, "errors": errors} for index, errors in sorted(validation.errors.items())]
+
+
+@router.post("/single", response_model=SinglePredictionResponse, response_model_exclude_none=True)
 async def predict_single(
+    request: Request,
     prediction_request: SinglePredictionRequest,
+    cascade: bool = Query(False, description="Stop scoring once the remaining trees cannot change the class"),
+    idempotency_key: Optional[str] = Header(
+        None,
+        max_length=MAX_KEY_LENGTH,
+        description="Client-chosen key; a retry with the same key and payload replays the stored result"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     start_time = time.time()
+    mark_handler_start(request)
+    check_cascade(request, cascade)
+    features = prediction_request.features.to_dict()
     
-    try:
-        # Make prediction using existing logic
+    async def score_and_log() -> Dict[str, Any]:
+        # Make prediction on the interactive lane, shared with identical requests in flight
         predictor = request.app.state.predictor
-        features = prediction_request.features.dict()
-        result = predictor.predict_single(features)
+        result = await predictor.predict_single_coalesced(
+            partial(request.app.state.scheduler.run, INTERACTIVE), features, cascade=cascade
+        )
         
         processing_time = int((time.time() - start_time) * 1000)
         
@@ -36,65 +97,249 @@ async def predict_single(
             input_features=features,
             prediction_result=result,
             model_version=settings.MODEL_VERSION,
-            confidence_score=result.get("confidence"),
+            # An early exit's confidence is from a partial ensemble; the stored result keeps
+            # early_exit, but the column feeding confidence summaries is left empty
+            confidence_score=None if result.get("early_exit") else result.get("confidence"),
             processing_time_ms=processing_time
         )
         
-        await prediction_crud.create_prediction(
-            db, prediction_data, current_user.id
+        with time_stage("db_log"):
+            # With a key, the row is committed together with the key's result
+            await prediction_crud.create_prediction(
+                db, prediction_data, current_user.id, request_id=idempotency_key, commit=not idempotency_key
+            )
+        return result
+    
+    try:
+        if idempotency_key:
+            result, replayed = await idempotency_service.execute(
+                db, current_user.id, idempotency_key, features, score_and_log
+            )
+        else:
+            result, replayed = await score_and_log(), False
+        
+        if replayed:
+            record_prediction("single", settings.MODEL_VERSION, "replayed")
+        else:
+            increment_prediction_count()
+            record_prediction("single", settings.MODEL_VERSION, "success", samples=1)
+        mark_handler_done(request)
+        
+        return trusted_response(
+            SinglePredictionResponse,
+            {"success": True, "result": result, "message": "Prediction completed successfully"},
+            exclude_none=True,
+            headers={"Idempotent-Replayed": "true"} if replayed else None
         )
         
-        return SinglePredictionResponse(
-            success=True,
-            result=result,
-            message="Prediction completed successfully"
+    except IdempotencyKeyReused as e:
+        record_prediction("single", settings.MODEL_VERSION, "rejected")
+        raise HTTPException(status_code=422, detail=str(e))
+    except LaneFullError as e:
+        record_prediction("single", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("single", settings.MODEL_VERSION, "error")
+        logger.error(f"Single prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def features_from_query(
+    time_spent_alone: Optional[float] = Query(None, ge=0, le=11, description="Hours spent alone per day (0-11)"),
+    stage_fear: Optional[str] = Query(None, description="Stage fear (Yes/No)"),
+    social_event_attendance: Optional[float] = Query(None, ge=0, le=10, description="Social event attendance (0-10)"),
+    going_outside: Optional[float] = Query(None, ge=0, le=10, description="Going outside frequency (0-10)"),
+    drained_after_socializing: Optional[str] = Query(None, description="Drained after socializing (Yes/No)"),
+    friends_circle_size: Optional[float] = Query(None, ge=0, le=15, description="Number of friends in circle (0-15)"),
+    post_frequency: Optional[float] = Query(None, ge=0, le=10, description="Social media posting frequency (0-10)")
+) -> PersonalityFeatures:
+    """Features of a GET prediction, validated like the POST body."""
+    try:
+        return PersonalityFeatures(
+            time_spent_alone=time_spent_alone,
+            stage_fear=stage_fear,
+            social_event_attendance=social_event_attendance,
+            going_outside=going_outside,
+            drained_after_socializing=drained_after_socializing,
+            friends_circle_size=friends_circle_size,
+            post_frequency=post_frequency
         )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+
+def canonical_query(features: PersonalityFeatures) -> str:
+    """
+    Canonical query string of a GET prediction.
+    
+    Fields come in a fixed order, missing ones are left out, categories are
+    title-cased and numbers use their shortest exact form (``5`` for 5.0).
+    Every spelling of the same input maps to one URL, so HTTP caches keep a
+    single entry for it.
+    """
+    params = []
+    for field in FEATURE_NAMES:
+        value = getattr(features, field)
+        if value is None:
+            continue
+        if isinstance(value, float):
+            value = repr(value)
+            value = value[:-2] if value.endswith(".0") else value
+        params.append((field, value))
+    return urlencode(params)
+
+
+def prediction_etag(predictor, features: Dict[str, Any]) -> str:
+    """Strong ETag of a prediction: model version plus the encoded features."""
+    key = f"{settings.MODEL_VERSION}|{predictor.encode(features)}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, as for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@router.get("/single", response_model=SinglePredictionResponse, response_model_exclude_none=True)
+async def predict_single_get(
+    request: Request,
+    features: PersonalityFeatures = Depends(features_from_query),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Cacheable single prediction with the features in the query string.
+    
+    Predictions are deterministic for a model version and encoded feature
+    vector, so the response carries a strong ETag derived from both and a
+    configurable Cache-Control. Non-canonical query strings are redirected
+    to the canonical URL, and a matching If-None-Match is answered with 304
+    without scoring. Unlike POST, the prediction is not logged per user.
+    
+    Args:
+        request: FastAPI request object
+        features: Features from the query string
+        if_none_match: ETags the client already holds
+    
+    Returns:
+        Single prediction response, 304 Not Modified or a redirect
+    """
+    mark_handler_start(request)
+    
+    if not hasattr(request.app.state, 'predictor'):
+        raise HTTPException(status_code=503, detail="Predictor not initialized")
+    predictor = request.app.state.predictor
+    
+    canonical = canonical_query(features)
+    if request.url.query != canonical:
+        return RedirectResponse(
+            f"{request.url.path}?{canonical}" if canonical else request.url.path,
+            status_code=301,
+            headers={"Cache-Control": settings.prediction_cache_control}
+        )
+    
+    model_features = features.to_dict()
+    etag = prediction_etag(predictor, model_features)
+    headers = {"ETag": etag, "Cache-Control": settings.prediction_cache_control}
+    if etag_matches(if_none_match, etag):
+        record_prediction("single_get", settings.MODEL_VERSION, "not_modified")
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        result = await predictor.predict_single_coalesced(
+            partial(request.app.state.scheduler.run, INTERACTIVE), model_features, endpoint="single_get"
+        )
+        
+        increment_prediction_count()
+        record_prediction("single_get", settings.MODEL_VERSION, "success", samples=1)
+        mark_handler_done(request)
         
+        return trusted_response(
+            SinglePredictionResponse,
+            {"success": True, "result": result, "message": "Prediction completed successfully"},
+            exclude_none=True,
+            headers=headers
+        )
+        
+    except LaneFullError as e:
+        record_prediction("single_get", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
     except Exception as e:
-        # Log error metrics
-        await metrics_service.log_error(db, str(e), current_user.id)
+        record_prediction("single_get", settings.MODEL_VERSION, "error")
+        logger.error(f"Single prediction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/batch", response_model=BatchPredictionResponse)
-async def predict_batch(request: Request, prediction_request: BatchPredictionRequest):
+@router.post("/batch", response_model=BatchPredictionResponse, response_model_exclude_none=True)
+async def predict_batch(
+    request: Request,
+    prediction_request: BatchPredictionRequest,
+    cascade: bool = Query(False, description="Stop scoring each sample once the remaining trees cannot change its class")
+):
     """
     Make batch personality predictions using the global predictor instance.
     
     Args:
         request: FastAPI request object  
         prediction_request: Batch prediction request
+        cascade: Use cascaded early-exit inference
     
     Returns:
         Batch prediction response
     """
+    mark_handler_start(request)
+    
     try:
         # Get the REUSABLE predictor from app state - NO MORE INSTANTIATION!
         if not hasattr(request.app.state, 'predictor'):
             raise HTTPException(status_code=503, detail="Predictor not initialized")
         
         predictor = request.app.state.predictor  # Single line - no object creation!
+        check_cascade(request, cascade)
         
-        # Convert features to list of dictionaries
-        features_list = [features.to_dict() for features in prediction_request.features]
+        # Validate column-wise; invalid samples are reported while the rest are scored
+        validation = validated(prediction_request)
+        if not validation.valid:
+            record_prediction("batch", settings.MODEL_VERSION, "rejected")
+            raise HTTPException(status_code=422, detail=row_errors(validation))
         
-        # Make predictions using the reusable predictor
-        results = predictor.predict_batch(features_list)
+        # Make predictions on the bulk lane so interactive traffic stays ahead
+        results = await request.app.state.scheduler.run(
+            BULK, predictor.predict_batch, validation.features, cascade
+        )
         
         # Increment prediction counter
-        for _ in results:
-            increment_prediction_count()
+        increment_prediction_count(len(results))
+        BATCH_SIZE.observe(len(results))
+        record_prediction("batch", settings.MODEL_VERSION, "success", samples=len(results))
+        mark_handler_done(request)
         
-        return BatchPredictionResponse(
-            success=True,
-            results=results,
-            count=len(results),
-            message="Batch prediction completed successfully"
-        )
+        content = {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "failed": len(validation.errors),
+            "message": (
+                "Batch prediction completed successfully" if not validation.errors
+                else f"Batch prediction completed; {len(validation.errors)} invalid samples skipped"
+            )
+        }
+        if validation.errors:
+            content["errors"] = row_errors(validation)
+        if cascade:
+            content["early_exit_rate"] = sum(result['early_exit'] for result in results) / len(results)
+        return trusted_response(BatchPredictionResponse, content, exclude_none=True)
         
     except HTTPException:
         raise
+    except LaneFullError as e:
+        record_prediction("batch", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
     except Exception as e:
+        record_prediction("batch", settings.MODEL_VERSION, "error")
         logger.error(f"Batch prediction failed: {str(e)}")
         raise HTTPException(
             status_code=500, 
@@ -102,6 +347,276 @@ async def predict_batch(request: Request, prediction_request: BatchPredictionReq
         )
 
 
+@router.post("/explain", response_model=ExplanationResponse)
+async def explain_batch(
+    request: Request,
+    prediction_request: BatchPredictionRequest,
+    top_k: Optional[int] = Query(None, ge=1, description="Only return the k largest contributions per sample")
+):
+    """
+    Explain predictions with per-feature contributions.
+    
+    Args:
+        request: FastAPI request object
+        prediction_request: Samples to explain
+        top_k: Trim each explanation to its k largest contributions
+    
+    Returns:
+        Explanation response
+    """
+    mark_handler_start(request)
+    
+    # Explanations are returned positionally, so every sample must be valid
+    validation = validated(prediction_request)
+    if validation.errors:
+        record_prediction("explain", settings.MODEL_VERSION, "rejected")
+        raise HTTPException(status_code=422, detail=row_errors(validation))
+    
+    try:
+        # Explanations run on the bulk lane so they never delay plain predictions
+        results = await request.app.state.scheduler.run(
+            BULK, request.app.state.predictor.explain_batch, validation.features, top_k
+        )
+        
+        record_prediction("explain", settings.MODEL_VERSION, "success", samples=len(results))
+        mark_handler_done(request)
+        
+        return trusted_response(ExplanationResponse, {"success": True, "results": results, "count": len(results)})
+        
+    except LaneFullError as e:
+        record_prediction("explain", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("explain", settings.MODEL_VERSION, "error")
+        logger.error(f"Explanation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+
+
+def summary_for(group_by: Optional[str]) -> PopulationSummary:
+    """Empty population summary, grouped on an API feature name."""
+    if group_by is not None and group_by not in FEATURE_NAMES:
+        raise HTTPException(status_code=422, detail=f"Unknown group_by feature: {group_by}")
+    return PopulationSummary(FEATURE_NAMES[group_by] if group_by else None)
+
+
+async def score_into(request: Request, summary: PopulationSummary, features_list: List[Dict[str, Any]]) -> None:
+    """Score a chunk on the bulk lane and fold only its aggregates into the summary."""
+    probabilities = await request.app.state.scheduler.run(
+        BULK, request.app.state.predictor.predict_probabilities, features_list
+    )
+    summary.update(features_list, probabilities)
+
+
+def aggregate_response(request: Request, summary: PopulationSummary, group_by: Optional[str]) -> Response:
+    """Record and build the response of an aggregate-only request."""
+    report = summary.report(request.app.state.predictor.model_loader.get_target_mapping())
+    count = report["overall"]["count"]
+    increment_prediction_count(count)
+    record_prediction("aggregate", settings.MODEL_VERSION, "success", samples=count)
+    content = {"success": True, "overall": report["overall"]}
+    if group_by is not None:
+        content.update(group_by=group_by, groups=report["groups"])
+    return trusted_response(AggregateResponse, content, exclude_none=True)
+
+
+@router.post("/aggregate", response_model=AggregateResponse, response_model_exclude_none=True)
+async def predict_aggregate(
+    request: Request,
+    aggregate_request: AggregateRequest,
+    group_by: Optional[str] = Query(None, description="Also aggregate per value of this feature (API field name)")
+):
+    """
+    Score a cohort and return only population aggregates.
+    
+    Args:
+        request: FastAPI request object
+        aggregate_request: Samples to score
+        group_by: Feature to split the aggregates on
+    
+    Returns:
+        Aggregate response
+    """
+    mark_handler_start(request)
+    summary = summary_for(group_by)
+    
+    try:
+        features_list = [features.to_dict() for features in aggregate_request.features]
+        for start in range(0, len(features_list), settings.aggregate_chunk_size):
+            await score_into(request, summary, features_list[start:start + settings.aggregate_chunk_size])
+        
+        mark_handler_done(request)
+        return aggregate_response(request, summary, group_by)
+        
+    except LaneFullError as e:
+        record_prediction("aggregate", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("aggregate", settings.MODEL_VERSION, "error")
+        logger.error(f"Aggregate prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Aggregate prediction failed: {str(e)}")
+
+
+@router.post("/aggregate/stream", response_model=AggregateResponse, response_model_exclude_none=True)
+async def predict_aggregate_stream(
+    request: Request,
+    group_by: Optional[str] = Query(None, description="Also aggregate per value of this feature (API field name)")
+):
+    """
+    Score a newline-delimited JSON stream of feature objects and return only aggregates.
+    
+    The body is read incrementally and scored in chunks as it arrives, so
+    memory stays bounded by the chunk size whatever the stream length.
+    
+    Args:
+        request: FastAPI request object; body is one ``features`` object per line
+        group_by: Feature to split the aggregates on
+    
+    Returns:
+        Aggregate response
+    """
+    mark_handler_start(request)
+    summary = summary_for(group_by)
+    
+    try:
+        chunk: List[Dict[str, Any]] = []
+        rows = 0
+        pending = b""
+        
+        def parse(line: bytes) -> None:
+            nonlocal rows
+            rows += 1
+            if rows > settings.aggregate_max_rows:
+                raise HTTPException(status_code=413, detail=f"Stream exceeds {settings.aggregate_max_rows} samples")
+            try:
+                chunk.append(PersonalityFeatures.model_validate_json(line).to_dict())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=f"Line {rows}: {e.errors(include_url=False)}")
+        
+        async for data in request.stream():
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    parse(line)
+                if len(chunk) >= settings.aggregate_chunk_size:
+                    await score_into(request, summary, chunk)
+                    chunk = []
+        if pending.strip():
+            parse(pending)
+        if chunk:
+            await score_into(request, summary, chunk)
+        if not rows:
+            raise HTTPException(status_code=422, detail="Stream contains no samples")
+        
+        mark_handler_done(request)
+        return aggregate_response(request, summary, group_by)
+        
+    except HTTPException:
+        raise
+    except LaneFullError as e:
+        record_prediction("aggregate", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("aggregate", settings.MODEL_VERSION, "error")
+        logger.error(f"Aggregate prediction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Aggregate prediction failed: {str(e)}")
+
+
+@router.post("/whatif", response_model=WhatIfResponse)
+async def what_if(request: Request, whatif_request: WhatIfRequest):
+    """
+    Sweep one or two features of a sample and return the probability curve or surface.
+    
+    Args:
+        request: FastAPI request object
+        whatif_request: Base sample and features to vary
+    
+    Returns:
+        What-if response
+    """
+    mark_handler_start(request)
+    
+    try:
+        vary = [FEATURE_NAMES[field] for field in whatif_request.vary]
+        
+        # The whole grid is one model call, small enough for the interactive lane
+        result = await request.app.state.scheduler.run(
+            INTERACTIVE,
+            request.app.state.predictor.what_if,
+            whatif_request.features.to_dict(),
+            vary,
+            whatif_request.points
+        )
+        
+        record_prediction("whatif", settings.MODEL_VERSION, "success", samples=result['rows_scored'])
+        mark_handler_done(request)
+        
+        return trusted_response(WhatIfResponse, {
+            "success": True,
+            "base": result['base'],
+            "axes": [
+                {"feature": field, "values": values}
+                for field, values in zip(whatif_request.vary, result['axes'])
+            ],
+            "probabilities": result['probabilities'],
+            "rows_scored": result['rows_scored']
+        })
+        
+    except LaneFullError as e:
+        record_prediction("whatif", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("whatif", settings.MODEL_VERSION, "error")
+        logger.error(f"What-if sweep failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"What-if sweep failed: {str(e)}")
+
+
+@router.post("/counterfactual", response_model=CounterfactualResponse)
+async def find_counterfactuals(request: Request, counterfactual_request: CounterfactualRequest):
+    """
+    Find the cheapest feature changes that flip a sample's predicted class.
+    
+    Args:
+        request: FastAPI request object
+        counterfactual_request: Sample, cost weights and search bounds
+    
+    Returns:
+        Counterfactual response
+    """
+    mark_handler_start(request)
+    
+    try:
+        fields = {feature: field for field, feature in FEATURE_NAMES.items()}
+        
+        # Candidate neighbourhoods are scored in large chunks on the bulk lane
+        result = await request.app.state.scheduler.run(
+            BULK,
+            request.app.state.predictor.counterfactuals,
+            counterfactual_request.features.to_dict(),
+            {FEATURE_NAMES[field]: weight for field, weight in counterfactual_request.costs.items()},
+            [FEATURE_NAMES[field] for field in counterfactual_request.frozen],
+            counterfactual_request.max_changes,
+            counterfactual_request.top_k
+        )
+        
+        record_prediction(
+            "counterfactual", settings.MODEL_VERSION, "success", samples=result['candidates_scored']
+        )
+        mark_handler_done(request)
+        
+        for item in result['counterfactuals']:
+            item['changes'] = {fields[feature]: change for feature, change in item['changes'].items()}
+        return trusted_response(CounterfactualResponse, {"success": True, **result})
+        
+    except LaneFullError as e:
+        record_prediction("counterfactual", settings.MODEL_VERSION, "rejected")
+        raise lane_full(e)
+    except Exception as e:
+        record_prediction("counterfactual", settings.MODEL_VERSION, "error")
+        logger.error(f"Counterfactual search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Counterfactual search failed: {str(e)}")
+
+
 @router.get("/example")
 async def get_example():
     """
@@ -0,0 +1,63 @@
+"""
+Prediction history endpoints.
+"""
+
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.crud.predictions import prediction_crud, PAYLOAD_COLUMNS
+from app.db.models import User
+from app.db.session import get_db
+from app.schemas.prediction import PredictionPage
+from app.utils.pagination import encode_cursor, decode_cursor
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/history", response_model=PredictionPage, response_model_exclude_none=True)
+async def prediction_history(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    include: List[str] = Query(
+        [],
+        description="Payload columns to include: input_features, prediction_result"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the current user's predictions, newest first.
+    
+    Args:
+        cursor: Opaque cursor returned by the previous page
+        limit: Page size
+        include: JSONB payload columns to return (omitted by default)
+    
+    Returns:
+        A page of predictions and the cursor of the next page
+    """
+    unknown = set(include) - set(PAYLOAD_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown include columns: {sorted(unknown)}")
+    
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Fetch one extra row to know whether another page exists
+    rows = await prediction_crud.get_user_predictions_after(
+        db, current_user.id, after=after, limit=limit + 1, include=include
+    )
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    
+    return PredictionPage(items=rows, next_cursor=next_cursor)
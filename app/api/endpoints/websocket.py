@@ -0,0 +1,188 @@
+# app/api/endpoints/websocket.py
+"""
+WebSocket prediction channel for persistent clients.
+
+A connection authenticates once, with an ``Authorization: Bearer`` header on
+the handshake or an ``{"type": "auth", "token": ...}`` first message. After
+that it sends pipelined ``{"id": ..., "features": {...}}`` messages. Each
+message is validated like ``POST /predict/single`` and scored through the
+shared micro-batcher, so messages from all connections that arrive together
+share batch calls. Each message is answered with its ``id`` as soon as its
+result is ready, so answers may come back out of order. A message holds
+one of the connection's ``WS_MAX_IN_FLIGHT`` slots until its answer has
+been sent, and no further messages are read while all slots are held. A
+client that sends fast, or stops reading answers, is therefore slowed down
+by the socket instead of queueing without bound.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+import orjson
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.api.deps import authenticate_token
+from app.core.config import settings
+from app.core.metrics import record_prediction
+from app.core.scheduler import LaneFullError
+from app.db.models import User
+from app.db.session import AsyncSessionLocal
+from app.schemas.request import PersonalityFeatures
+from app.api.endpoints.health import increment_prediction_count
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Same encoding as ORJSONResponse, so results match the HTTP endpoints
+ENCODE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class UnsupportedFrame(Exception):
+    """The client sent a frame other than a text frame."""
+
+
+async def receive_text(websocket: WebSocket) -> str:
+    """
+    Next text frame of a connection.
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected
+        UnsupportedFrame: If the frame is not a text frame
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    if message.get("text") is None:
+        raise UnsupportedFrame("Only text frames are supported")
+    return message["text"]
+
+
+async def authenticate(websocket: WebSocket) -> Optional[User]:
+    """User of a connection, from the handshake header or the first message."""
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    else:
+        try:
+            message = orjson.loads(
+                await asyncio.wait_for(receive_text(websocket), settings.ws_auth_timeout_seconds)
+            )
+        except (asyncio.TimeoutError, orjson.JSONDecodeError):
+            return None
+        if not isinstance(message, dict) or message.get("type") != "auth" or not isinstance(message.get("token"), str):
+            return None
+        token = message["token"]
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await authenticate_token(db, token)
+    except HTTPException:
+        return None
+
+
+async def close(websocket: WebSocket, code: int, reason: str = "") -> None:
+    """Close a connection that may already be gone."""
+    try:
+        await websocket.close(code=code, reason=reason)
+    except Exception:
+        pass
+
+
+@router.websocket("/ws")
+async def prediction_channel(websocket: WebSocket):
+    """Pipelined single predictions over one authenticated connection."""
+    await websocket.accept()
+    try:
+        user = await authenticate(websocket)
+    except WebSocketDisconnect:
+        return
+    except UnsupportedFrame as e:
+        await close(websocket, status.WS_1003_UNSUPPORTED_DATA, str(e))
+        return
+    if user is None:
+        await close(websocket, status.WS_1008_POLICY_VIOLATION, "Invalid authentication credentials")
+        return
+
+    batcher = websocket.app.state.batcher
+    outgoing: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    slots = asyncio.Semaphore(settings.ws_max_in_flight)
+    tasks: Set[asyncio.Task] = set()
+
+    async def write() -> None:
+        # A single writer, so concurrent answers never interleave on the socket
+        while True:
+            message = await outgoing.get()
+            await websocket.send_text(orjson.dumps(message, option=ENCODE_OPTIONS).decode())
+            # The message's slot is only freed once its answer is on the wire
+            slots.release()
+
+    async def answer(message_id: Any, features: Dict[str, Any]) -> None:
+        try:
+            result = await batcher.submit(features)
+        except LaneFullError as e:
+            record_prediction("websocket", settings.MODEL_VERSION, "rejected")
+            outgoing.put_nowait({"id": message_id, "status": 503, "error": str(e)})
+        except Exception as e:
+            record_prediction("websocket", settings.MODEL_VERSION, "error")
+            logger.error(f"WebSocket prediction failed: {str(e)}")
+            outgoing.put_nowait({"id": message_id, "status": 500, "error": str(e)})
+        else:
+            increment_prediction_count()
+            record_prediction("websocket", settings.MODEL_VERSION, "success", samples=1)
+            outgoing.put_nowait({"id": message_id, "result": result})
+
+    def reject(message_id: Any, error: Any) -> None:
+        record_prediction("websocket", settings.MODEL_VERSION, "rejected")
+        outgoing.put_nowait({"id": message_id, "status": 422, "error": error})
+
+    async def read() -> None:
+        while True:
+            # Backpressure: the next message is only read once a slot is free
+            await slots.acquire()
+            text = await receive_text(websocket)
+            message_id = None
+            try:
+                message = orjson.loads(text)
+                if not isinstance(message, dict):
+                    raise ValueError("message must be an object")
+                message_id = message.get("id")
+                features = PersonalityFeatures.model_validate(message.get("features")).to_dict()
+            except ValidationError as e:
+                reject(message_id, e.errors(include_url=False, include_context=False))
+                continue
+            except ValueError as e:
+                reject(message_id, str(e))
+                continue
+
+            task = asyncio.create_task(answer(message_id, features))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    try:
+        await websocket.send_text(orjson.dumps({
+            "type": "ready",
+            "model_version": settings.MODEL_VERSION,
+            "max_in_flight": settings.ws_max_in_flight,
+        }).decode())
+    except Exception:
+        return
+    reader = asyncio.create_task(read())
+    writer = asyncio.create_task(write())
+    try:
+        # Whichever side stops first (disconnect, bad frame, failed send) ends the connection
+        done, _ = await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in [reader, writer, *tasks]:
+            task.cancel()
+        await asyncio.gather(reader, writer, *tasks, return_exceptions=True)
+
+    error = next(iter(done)).exception()
+    if isinstance(error, WebSocketDisconnect):
+        return
+    if isinstance(error, UnsupportedFrame):
+        await close(websocket, status.WS_1003_UNSUPPORTED_DATA, str(error))
+        return
+    logger.error(f"WebSocket connection failed: {str(error)}")
+    await close(websocket, status.WS_1011_INTERNAL_ERROR)
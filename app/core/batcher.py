@@ -0,0 +1,97 @@
+"""
+Micro-batching of single predictions from persistent channels.
+
+Callers submit one sample at a time and await its result. Samples arriving
+within a short window are grouped and scored with one batch call, up to a
+maximum batch size. A batch is flushed as soon as it is full, or when the
+oldest sample has waited ``max_wait_ms``. Each caller's result resolves as
+soon as its batch completes, so results can come back out of order across
+batches. An error in a batch call fails every sample of that batch.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from app.core.metrics import MICRO_BATCH_SIZE
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Group concurrently submitted items into batch calls."""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Initialize micro-batcher.
+
+        Args:
+            run_batch: Scores a list of items, returning one result per item in order
+            max_batch: Items flushed as one batch at most
+            max_wait_ms: Longest an item waits for others before its batch is flushed
+        """
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: "set[asyncio.Task]" = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Score one item as part of the next batch.
+
+        Args:
+            item: Item to score
+
+        Returns:
+            Its result
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that went away (cancelled futures) are not scored
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        MICRO_BATCH_SIZE.observe(len(batch))
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Flush pending items and wait for batches in flight."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -1,46 +1,170 @@
 """
 Logging configuration for the application.
+
+Records are handed to a bounded in-memory queue and written to stdout by a
+background listener thread, so request handlers never block on log I/O.
+When the queue is full, records are dropped and counted instead of
+blocking. After shutdown, records are written directly. Per-prediction log lines are sampled at a configurable rate.
 """
 
+import json
 import logging
+import queue
+import random
 import sys
-from typing import Dict, Any
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional
+
+from prometheus_client import Counter
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_prediction_log_rate = 1.0
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
 
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops and counts records when the queue is full."""
 
-def setup_logging(log_level: str = "INFO") -> None:
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only resolve the message
+        # and exception text so the record no longer references live objects.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+class DrainingQueueListener(QueueListener):
+    """Queue listener whose stop waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_format: str = "json",
+    queue_size: int = 10000,
+    prediction_sample_rate: float = 1.0
+) -> None:
     """
     Setup logging configuration.
-    
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_format: "json" for structured output, "text" for the plain format
+        queue_size: Maximum records buffered before new ones are dropped
+        prediction_sample_rate: Fraction of per-prediction log lines kept (0-1)
     """
-    
-    # Configure logging format
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
-    
-    # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format=log_format,
-        datefmt=date_format,
-        stream=sys.stdout
-    )
-    
+    global _listener, _prediction_log_rate
+
+    shutdown_logging()
+    _prediction_log_rate = prediction_sample_rate
+
+    # Configure the output handler, run by the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(getattr(logging, log_level.upper()))
+
+    _listener = DrainingQueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    # Route uvicorn's own (access) logs through the queue as well
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
     logging.getLogger("xgboost").setLevel(logging.WARNING)
 
 
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the listener thread.
+
+    The root logger then writes to the output handler directly, so records
+    logged after shutdown (or by a later app in the same process) are not
+    queued for a listener that no longer runs.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        root.handlers = [
+            handler for handler in root.handlers if not isinstance(handler, DroppingQueueHandler)
+        ] + list(_listener.handlers)
+        _listener = None
+
+
+def log_prediction_sampled() -> bool:
+    """Whether the current per-prediction log line should be emitted."""
+    return _prediction_log_rate >= 1.0 or random.random() < _prediction_log_rate
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance.
-    
+
     Args:
         name: Logger name
-        
+
     Returns:
         Logger instance
     """
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
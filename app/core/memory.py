@@ -0,0 +1,221 @@
+"""
+On-demand memory diagnostics.
+
+Wraps ``tracemalloc`` so it can be started, snapshotted, compared and
+stopped at runtime; nothing is traced until an admin starts it. Long-lived
+structures (queues, windows, models, caches) register a callable reporting
+their sizes so growth can be attributed without a debugger.
+"""
+
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+
+def _module_name(filename: str, index: Dict[str, str]) -> str:
+    """Map a source file to its dotted module name, falling back to the path."""
+    return index.get(filename, filename)
+
+
+def _module_index() -> Dict[str, str]:
+    """Source file to module name for every imported module."""
+    index = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            index[filename] = name
+    return index
+
+
+class MemoryProfiler:
+    """Start/stop tracemalloc, keep a few snapshots and report on them."""
+
+    def __init__(self, max_snapshots: int = 5):
+        """
+        Initialize memory profiler.
+
+        Args:
+            max_snapshots: Snapshots kept in memory; the oldest is dropped first
+        """
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._taken_at: Dict[int, float] = {}
+        self._next_id = 1
+        self._structures: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, report: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Register a long-lived structure for size reporting.
+
+        Args:
+            name: Structure name, e.g. "scheduler"
+            report: Callable returning counts/sizes for the structure
+        """
+        self._structures[name] = report
+
+    def status(self) -> Dict[str, Any]:
+        """Tracing state, traced memory and stored snapshot ids."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "snapshots": [
+                {"id": snapshot_id, "taken_at": self._taken_at[snapshot_id]}
+                for snapshot_id in self._snapshots
+            ],
+        }
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing allocations, keeping ``frames`` frames per traceback."""
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames)
+        logger.info(f"tracemalloc started ({frames} frames)")
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+        self._taken_at.clear()
+        logger.info("tracemalloc stopped")
+
+    def take_snapshot(self) -> int:
+        """
+        Take a snapshot of traced allocations.
+
+        Returns:
+            Snapshot id
+
+        Raises:
+            RuntimeError: If tracing is not active
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_FILES]
+        )
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._snapshots[snapshot_id] = snapshot
+        self._taken_at[snapshot_id] = time.time()
+        while len(self._snapshots) > self.max_snapshots:
+            dropped, _ = self._snapshots.popitem(last=False)
+            del self._taken_at[dropped]
+        return snapshot_id
+
+    def _get(self, snapshot_id: Optional[int]) -> tracemalloc.Snapshot:
+        """Look up a snapshot; None means the latest one."""
+        if not self._snapshots:
+            raise KeyError("No snapshots taken")
+        if snapshot_id is None:
+            return next(reversed(self._snapshots.values()))
+        if snapshot_id not in self._snapshots:
+            raise KeyError(f"Unknown snapshot {snapshot_id}")
+        return self._snapshots[snapshot_id]
+
+    def top(self, snapshot_id: Optional[int] = None, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Largest allocation sites of a snapshot.
+
+        Args:
+            snapshot_id: Snapshot to report on (latest if None)
+            limit: Number of entries returned
+            group_by: "lineno", "filename" or "module"
+
+        Returns:
+            Allocation sites ordered by size
+        """
+        snapshot = self._get(snapshot_id)
+        if group_by == "module":
+            return self._by_module(snapshot.statistics("filename"), limit)
+        return [
+            {"site": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def diff(self, base_id: int, target_id: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Allocation growth between two snapshots, grouped by module.
+
+        Args:
+            base_id: Older snapshot
+            target_id: Newer snapshot (latest if None)
+            limit: Number of modules returned
+
+        Returns:
+            Modules ordered by absolute size change
+        """
+        base = self._get(base_id)
+        target = self._get(target_id)
+        index = _module_index()
+        size_diff: Counter = Counter()
+        count_diff: Counter = Counter()
+        size: Counter = Counter()
+        for stat in target.compare_to(base, "filename"):
+            module = _module_name(stat.traceback[0].filename, index)
+            size_diff[module] += stat.size_diff
+            count_diff[module] += stat.count_diff
+            size[module] += stat.size
+        ordered = sorted(size_diff, key=lambda module: abs(size_diff[module]), reverse=True)
+        return [
+            {
+                "module": module,
+                "size_diff_bytes": size_diff[module],
+                "count_diff": count_diff[module],
+                "size_bytes": size[module],
+            }
+            for module in ordered[:limit]
+        ]
+
+    @staticmethod
+    def _by_module(statistics: List[tracemalloc.Statistic], limit: int) -> List[Dict[str, Any]]:
+        """Aggregate per-file statistics into per-module totals."""
+        index = _module_index()
+        size: Counter = Counter()
+        count: Counter = Counter()
+        for stat in statistics:
+            module = _module_name(stat.traceback[0].filename, index)
+            size[module] += stat.size
+            count[module] += stat.count
+        return [
+            {"site": module, "size_bytes": module_size, "count": count[module]}
+            for module, module_size in size.most_common(limit)
+        ]
+
+    def structures(self, include_types: bool = False, type_limit: int = 20) -> Dict[str, Any]:
+        """
+        Sizes of registered structures, optionally with live object counts by type.
+
+        Args:
+            include_types: Also count all gc-tracked objects by type (slow)
+            type_limit: Number of types reported
+
+        Returns:
+            Structure reports keyed by name, plus "object_types" if requested
+        """
+        report: Dict[str, Any] = {}
+        for name, fn in self._structures.items():
+            try:
+                report[name] = fn()
+            except Exception as e:
+                report[name] = {"error": str(e)}
+        if include_types:
+            counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+            report["object_types"] = dict(counts.most_common(type_limit))
+        return report
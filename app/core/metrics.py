@@ -0,0 +1,288 @@
+"""
+Prometheus metrics and per-request stage timings for the prediction API.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (multi-worker deployments), each
+worker writes its samples to that directory and ``/metrics`` aggregates all
+of them; otherwise the default in-process registry is used.
+
+Requests that opt into ``Server-Timing`` get a per-request collector in a
+context variable; every observed stage is also added to that collector.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Request stages: parse (body, validation + dependencies), validation
+# (column-wise batch checks), cache_lookup (explanation cache, idempotency
+# keys), queue_wait (scheduling lane), preprocess, inference, db_log
+# (prediction persistence) and serialize (response rendering)
+STAGE_SECONDS = Histogram(
+    "prediction_stage_seconds",
+    "Time spent in each stage of a prediction request",
+    ["stage"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+PREDICTIONS = Counter(
+    "predictions_total",
+    "Prediction requests by endpoint, model version and outcome",
+    ["endpoint", "model_version", "outcome"],
+)
+SAMPLES = Counter(
+    "prediction_samples_total",
+    "Samples scored by endpoint and model version",
+    ["endpoint", "model_version"],
+)
+BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Number of samples per batch request",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+MICRO_BATCH_SIZE = Histogram(
+    "prediction_micro_batch_size",
+    "Number of streamed single predictions scored together by the micro-batcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+LANE_QUEUE_DEPTH = Gauge(
+    "scheduler_lane_queue_depth",
+    "Jobs waiting in each scheduling lane",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wakeup and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+LANE_IN_FLIGHT = Gauge(
+    "scheduler_lane_in_flight",
+    "Jobs running from each scheduling lane",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+PREDICTIONS_COALESCED = Counter(
+    "predictions_coalesced_total",
+    "Predictions served by another identical in-flight request or batch row",
+    ["endpoint"],
+)
+CASCADE_ROWS = Counter(
+    "cascade_rows_total",
+    "Rows scored in cascaded mode, by whether they exited before the last stage",
+    ["exit"],
+)
+CASCADE_TREES = Counter(
+    "cascade_trees_evaluated_total",
+    "Trees evaluated for rows scored in cascaded mode",
+)
+EXPLANATION_CACHE = Counter(
+    "explanation_cache_requests_total",
+    "Explanation cache lookups by result",
+    ["result"],
+)
+FEATURE_DRIFT_PSI = Gauge(
+    "feature_drift_psi",
+    "Population stability index of the last completed window against the training profile",
+    ["feature"],
+    multiprocess_mode="max",
+)
+FEATURE_MISSING_RATE = Gauge(
+    "feature_missing_rate",
+    "Fraction of missing values in the last completed window",
+    ["feature"],
+    multiprocess_mode="max",
+)
+IDEMPOTENT_REPLAYS = Counter(
+    "idempotent_replays_total",
+    "Requests answered from a stored result of the same idempotency key",
+    ["source"],
+)
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Return the q-th percentile (0-1) of a window of samples, 0 if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Stage durations of the current request, only set when Server-Timing is on
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record the duration of a request stage."""
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Context manager timing a block as the given stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def format_server_timing(timings: Dict[str, float], total: float) -> str:
+    """
+    Format stage durations as a Server-Timing header value.
+
+    Args:
+        timings: Stage name to duration in seconds
+        total: Total request duration in seconds
+
+    Returns:
+        Header value, e.g. ``inference;dur=0.412, total;dur=3.100``
+    """
+    entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
+
+
+def record_prediction(endpoint: str, model_version: str, outcome: str, samples: int = 0) -> None:
+    """
+    Count a prediction request and the samples it scored.
+
+    Args:
+        endpoint: Endpoint label, e.g. "single" or "batch"
+        model_version: Model version that served the request
+        outcome: "success", "error", "rejected", "replayed" or "not_modified"
+        samples: Number of samples scored
+    """
+    PREDICTIONS.labels(endpoint, model_version, outcome).inc()
+    if samples:
+        SAMPLES.labels(endpoint, model_version).inc(samples)
+
+
+def set_lane_gauges(lane: str, queue_depth: int, in_flight: int) -> None:
+    """Publish the current depth and concurrency of a scheduling lane."""
+    LANE_QUEUE_DEPTH.labels(lane).set(queue_depth)
+    LANE_IN_FLIGHT.labels(lane).set(in_flight)
+
+
+def set_drift_gauges(report: Dict[str, Any]) -> None:
+    """Publish per-feature PSI and missing rate of a completed drift window."""
+    for feature, entry in report["features"].items():
+        FEATURE_MISSING_RATE.labels(feature).set(entry["missing_rate"])
+        if "psi" in entry:
+            FEATURE_DRIFT_PSI.labels(feature).set(entry["psi"])
+
+
+def mark_handler_start(request) -> None:
+    """Report the parse stage: time from arrival until the endpoint runs."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        observe_stage("parse", time.perf_counter() - received_at)
+
+
+def mark_handler_done(request) -> None:
+    """Mark the end of the endpoint so the middleware can time serialization."""
+    request.state.handler_done_at = time.perf_counter()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multi-process directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class StageTimingMiddleware:
+    """
+    ASGI middleware timing the stages FastAPI runs outside the endpoint.
+
+    Stores the arrival time in the request state so endpoints can report the
+    parse stage, and reports the serialize stage when the response starts
+    if the endpoint marked when it finished. When Server-Timing is enabled,
+    either globally or by the request header, the collected stage breakdown
+    is attached to the response.
+    """
+
+    def __init__(self, app, server_timing: bool = False, header: str = "X-Server-Timing"):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            server_timing: Attach Server-Timing to every response
+            header: Request header that opts a single request in
+        """
+        self.app = app
+        self.server_timing = server_timing
+        self.header = header.lower().encode("latin-1")
+
+    def _requested(self, scope) -> bool:
+        """Whether the request opted into Server-Timing via its header."""
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.lower() in (b"1", b"true", b"on")
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received_at = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["received_at"] = received_at
+
+        timings: Optional[Dict[str, float]] = None
+        token = None
+        if self.server_timing or self._requested(scope):
+            timings = {}
+            token = _request_timings.set(timings)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                handler_done_at = state.get("handler_done_at")
+                if handler_done_at is not None:
+                    observe_stage("serialize", time.perf_counter() - handler_done_at)
+                if timings is not None:
+                    value = format_server_timing(timings, time.perf_counter() - received_at)
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                _request_timings.reset(token)
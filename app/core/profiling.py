@@ -0,0 +1,258 @@
+"""
+Opt-in sampling CPU profiler for individual requests.
+
+A request is profiled when its ``X-Profile`` header matches the configured
+profiling token, or when it is picked by one-in-N sampling of prediction
+requests. While a profiled request runs, a background thread samples the
+stacks of the event loop thread and of every scheduler worker running one
+of the request's jobs, and the result is written in collapsed-stack format
+(one ``frame;frame;frame count`` line per stack), ready for flamegraph.pl or
+speedscope. Requests that are not selected pay one header scan. Each
+profile adds a sampler thread walking every tracked stack, so only a
+bounded number of requests are profiled at once; a request selected while
+the profiler is busy runs unprofiled.
+"""
+
+import asyncio
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.collapsed$")
+
+
+def _frame_label(frame) -> str:
+    """Render a frame as ``package/module.py:function``."""
+    code = frame.f_code
+    parts = Path(code.co_filename).parts[-2:]
+    return f"{'/'.join(parts)}:{code.co_name}".replace(";", ":")
+
+
+def _collapse(frame, root: str) -> str:
+    """Render a stack, outermost frame first, as a collapsed-stack key."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class _Profile:
+    """Stack samples for one request."""
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.threads = {self.loop_thread}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{name}", daemon=True)
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.threads):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                root = "event-loop" if thread_id == self.loop_thread else "worker"
+                self.stacks[_collapse(frame, root)] += 1
+                self.samples += 1
+
+
+# Profile of the current request, only set while a selected request runs
+_active_profile: ContextVar[Optional[_Profile]] = ContextVar("active_profile", default=None)
+
+
+@contextmanager
+def track_thread() -> Iterator[None]:
+    """Include the current thread in the active request profile, if any."""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profile.threads.add(thread_id)
+    try:
+        yield
+    finally:
+        profile.threads.discard(thread_id)
+
+
+class RequestProfiler:
+    """Select requests for profiling and manage the bounded profile directory."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_files: int,
+        interval_ms: float,
+        token: str = "",
+        sample_every: int = 0,
+        path_prefix: str = "/predict",
+        max_concurrent: int = 1,
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            directory: Directory profiles are written to
+            max_files: Maximum profiles kept; the oldest are deleted first
+            interval_ms: Sampling interval in milliseconds
+            token: Secret that ``X-Profile`` must carry; empty disables the header
+            sample_every: Profile one in N matching requests; 0 disables sampling
+            path_prefix: Only requests under this path are sampled
+            max_concurrent: Maximum requests profiled at once
+        """
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self.interval = interval_ms / 1000
+        self.token = token.encode("latin-1")
+        self.sample_every = sample_every
+        self.path_prefix = path_prefix
+        self.max_concurrent = max_concurrent
+        self._seen = 0
+        self._active = 0
+        # begin runs on the event loop, finish on a worker thread
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RequestProfiler":
+        """Build the profiler from application settings."""
+        return cls(
+            directory=settings.profiling_dir,
+            max_files=settings.profiling_max_files,
+            interval_ms=settings.profiling_interval_ms,
+            token=settings.profiling_token,
+            sample_every=settings.profiling_sample_every,
+            max_concurrent=settings.profiling_max_concurrent,
+        )
+
+    def should_profile(self, scope: Dict[str, Any]) -> bool:
+        """Whether this request was selected by header or by sampling."""
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return hmac.compare_digest(value, self.token)
+        if self.sample_every and scope["path"].startswith(self.path_prefix):
+            self._seen += 1
+            return self._seen % self.sample_every == 0
+        return False
+
+    def begin(self, scope: Dict[str, Any]) -> Optional[_Profile]:
+        """
+        Start sampling a request on the current (event loop) thread.
+
+        Returns:
+            The running profile, or None if ``max_concurrent`` requests are already profiled
+        """
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                logger.debug(f"Profiler busy, not profiling {scope['path']}")
+                return None
+            self._active += 1
+        slug = re.sub(r"[^\w]+", "-", scope["path"]).strip("-") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{slug}-{time.perf_counter_ns() % 10**6:06d}"
+        profile = _Profile(name, self.interval)
+        profile.start()
+        return profile
+
+    def finish(self, profile: _Profile) -> Optional[str]:
+        """
+        Stop sampling and write the collapsed stacks.
+
+        Returns:
+            File name of the stored profile, or None if nothing was sampled
+        """
+        profile.stop()
+        with self._lock:
+            self._active -= 1
+        if not profile.stacks:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        filename = f"{profile.name}.collapsed"
+        lines = [f"{stack} {count}" for stack, count in profile.stacks.most_common()]
+        (self.directory / filename).write_text("\n".join(lines) + "\n")
+        logger.info(
+            f"Stored profile {filename}: {profile.samples} samples over "
+            f"{(time.perf_counter() - profile.started_at) * 1000:.1f} ms"
+        )
+        self._prune()
+        return filename
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond max_files."""
+        files = sorted(self.directory.glob("*.collapsed"), key=lambda path: path.stat().st_mtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            path.unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first."""
+        if not self.directory.exists():
+            return []
+        files = sorted(
+            self.directory.glob("*.collapsed"), key=lambda path: path.stat().st_mtime, reverse=True
+        )
+        return [
+            {"name": path.name, "size_bytes": path.stat().st_size, "created_at": path.stat().st_mtime}
+            for path in files
+        ]
+
+    def get_path(self, name: str) -> Optional[Path]:
+        """Resolve a stored profile by name, rejecting anything outside the directory."""
+        if not PROFILE_NAME_PATTERN.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests selected by the RequestProfiler."""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.begin(scope)
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = _active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _active_profile.reset(token)
+            # Joining the sampler and writing/pruning files stays off the event loop.
+            # The response has started by now, so the stored name is only logged.
+            await asyncio.to_thread(self.profiler.finish, profile)
@@ -0,0 +1,43 @@
+"""
+Fast JSON responses for trusted prediction payloads.
+
+Prediction endpoints build their responses from results the service
+produced itself. Passing them through the endpoint's ``response_model``
+would validate and serialize every row again with Pydantic, which costs
+more than scoring for large batches. Returning a response object makes
+FastAPI skip that step, and orjson encodes the plain dicts directly. The
+``response_model`` stays declared on each route, so the OpenAPI schema is
+unchanged. With ``validate_responses`` enabled, the payloads are validated
+against that model before encoding, for debugging.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+def trusted_response(
+    model: Type[BaseModel],
+    content: Dict[str, Any],
+    exclude_none: bool = False,
+    headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """
+    Encode a payload without re-validating it through its response model.
+
+    Args:
+        model: Response model declared on the route
+        content: Payload; it must already match ``model``, with optional
+            fields left out rather than set to None when the route excludes None
+        exclude_none: Whether the route excludes None fields, applied when validating
+        headers: Extra response headers
+
+    Returns:
+        JSON response
+    """
+    if settings.validate_responses:
+        content = model.model_validate(content).model_dump(mode="json", exclude_none=exclude_none)
+    return ORJSONResponse(content, headers=headers)
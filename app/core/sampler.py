@@ -0,0 +1,166 @@
+"""
+Background resource and event-loop health sampler.
+
+A single asyncio task wakes up every ``loop_lag_interval`` seconds and
+records how late the wakeup was (event-loop lag). Every
+``resource_interval`` seconds it also records RSS, CPU time, thread count
+and open connections. Resource samples are taken in a worker thread:
+counting connections scans /proc/net, and doing that on the event loop
+would inflate the lag being measured. Samples live in fixed-size ring
+buffers so health endpoints read recent values and percentiles from
+memory instead of querying the OS per request.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import psutil
+
+from app.core.config import Settings
+from app.core.metrics import EVENT_LOOP_LAG, percentile
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceSampler:
+    """Sample process resources and event-loop lag into ring buffers."""
+
+    def __init__(
+        self,
+        loop_lag_interval: float = 0.1,
+        resource_interval: float = 1.0,
+        window: int = 600,
+        lag_window: int = 50,
+    ):
+        """
+        Initialize sampler.
+
+        Args:
+            loop_lag_interval: Seconds between event-loop lag probes
+            resource_interval: Seconds between process resource samples
+            window: Samples kept per ring buffer
+            lag_window: Most recent lag samples used for readiness
+        """
+        self.loop_lag_interval = loop_lag_interval
+        self.resource_interval = resource_interval
+        self.lag_window = lag_window
+        self.process = psutil.Process()
+        self.loop_lag: Deque[float] = deque(maxlen=window)
+        self.rss_bytes: Deque[int] = deque(maxlen=window)
+        self.cpu_seconds: Deque[float] = deque(maxlen=window)
+        self.cpu_percent: Deque[float] = deque(maxlen=window)
+        self.threads: Deque[int] = deque(maxlen=window)
+        self.connections: Deque[int] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ResourceSampler":
+        """Build the sampler from application settings."""
+        return cls(
+            loop_lag_interval=settings.loop_lag_interval_seconds,
+            resource_interval=settings.resource_sample_interval_seconds,
+            window=settings.resource_sample_window,
+            lag_window=settings.ready_lag_window,
+        )
+
+    def start(self) -> None:
+        """Start the sampling task on the running event loop."""
+        self._sample_resources(None)
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="resource-sampler")
+
+    async def stop(self) -> None:
+        """Cancel the sampling task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_resource_sample = loop.time() + self.resource_interval
+        last_cpu = (time.monotonic(), self._cpu_time())
+        while True:
+            expected = loop.time() + self.loop_lag_interval
+            await asyncio.sleep(self.loop_lag_interval)
+            now = loop.time()
+            lag = max(0.0, now - expected)
+            self.loop_lag.append(lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+            if now >= next_resource_sample:
+                next_resource_sample = now + self.resource_interval
+                try:
+                    last_cpu = await asyncio.to_thread(self._sample_resources, last_cpu)
+                except psutil.Error as e:
+                    logger.warning(f"Resource sampling failed: {str(e)}")
+
+    def _cpu_time(self) -> float:
+        cpu = self.process.cpu_times()
+        return cpu.user + cpu.system
+
+    def _sample_resources(self, last_cpu: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+        """Append one resource sample; returns the (wall, cpu) pair for the next delta."""
+        now = time.monotonic()
+        cpu_time = self._cpu_time()
+        with self.process.oneshot():
+            self.rss_bytes.append(self.process.memory_info().rss)
+            self.threads.append(self.process.num_threads())
+        self.cpu_seconds.append(cpu_time)
+        if last_cpu is not None and now > last_cpu[0]:
+            self.cpu_percent.append(100 * (cpu_time - last_cpu[1]) / (now - last_cpu[0]))
+        self.connections.append(len(self.process.connections(kind="inet")))
+        return now, cpu_time
+
+    def memory_usage_mb(self) -> float:
+        """Latest RSS in MB."""
+        if not self.rss_bytes:
+            return self.process.memory_info().rss / 1024 / 1024
+        return self.rss_bytes[-1] / 1024 / 1024
+
+    def recent_loop_lag(self, q: float = 0.99) -> float:
+        """Percentile of event-loop lag over the readiness window, in seconds."""
+        recent = list(self.loop_lag)[-self.lag_window:]
+        return percentile(recent, q)
+
+    def summary(self) -> Dict[str, Any]:
+        """Latest values and window percentiles of every sampled series."""
+        def latest(series):
+            return series[-1] if series else None
+
+        return {
+            "loop_lag_ms": {
+                "latest": (latest(self.loop_lag) or 0.0) * 1000,
+                "p50": percentile(self.loop_lag, 0.50) * 1000,
+                "p99": percentile(self.loop_lag, 0.99) * 1000,
+                "max": max(self.loop_lag, default=0.0) * 1000,
+            },
+            "rss_mb": {
+                "latest": (latest(self.rss_bytes) or 0) / 1024 / 1024,
+                "p50": percentile(self.rss_bytes, 0.50) / 1024 / 1024,
+                "max": max(self.rss_bytes, default=0) / 1024 / 1024,
+            },
+            "cpu_percent": {
+                "latest": latest(self.cpu_percent) or 0.0,
+                "p50": percentile(self.cpu_percent, 0.50),
+                "p99": percentile(self.cpu_percent, 0.99),
+            },
+            "cpu_seconds": latest(self.cpu_seconds) or 0.0,
+            "threads": latest(self.threads) or 0,
+            "connections": latest(self.connections) or 0,
+            "samples": len(self.rss_bytes),
+        }
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Ring buffer sizes, for memory diagnostics."""
+        return {
+            "loop_lag": len(self.loop_lag),
+            "rss_bytes": len(self.rss_bytes),
+            "cpu_percent": len(self.cpu_percent),
+            "connections": len(self.connections),
+        }
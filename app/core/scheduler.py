@@ -0,0 +1,261 @@
+"""
+Priority scheduling lanes for prediction work.
+
+Latency-sensitive requests (``/predict/single``, the GUI) and throughput
+oriented requests (``/predict/batch``) are queued in separate lanes that
+share one worker pool. The interactive lane is always dequeued first; the
+bulk lane is protected from starvation by forcing one of its jobs through
+after a bounded number of interactive dispatches.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import Settings
+from app.core.metrics import observe_stage, percentile, set_lane_gauges
+from app.core.profiling import track_thread
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+logger = logging.getLogger(__name__)
+
+
+class LaneFullError(RuntimeError):
+    """Raised when a lane queue is at capacity."""
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: asyncio.Future
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+
+
+def _percentile_ms(values: Deque[float], q: float) -> float:
+    """Return the q-th percentile of a window of durations, in milliseconds."""
+    return percentile(values, q) * 1000
+
+
+def _call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    """Run a job on a worker thread, visible to the request profiler if active."""
+    with track_thread():
+        return fn(*args)
+
+
+class Lane:
+    """A named queue with its own concurrency cap and counters."""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, window: int = 1024):
+        """
+        Initialize lane.
+
+        Args:
+            name: Lane name
+            max_concurrency: Maximum jobs of this lane running at once
+            max_queue: Maximum jobs waiting in this lane
+            window: Number of recent jobs kept for latency percentiles
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue: Deque[_Job] = deque()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_times: Deque[float] = deque(maxlen=window)
+        self.run_times: Deque[float] = deque(maxlen=window)
+
+    def is_eligible(self) -> bool:
+        """Whether the lane has queued work and a free concurrency slot."""
+        return bool(self.queue) and self.in_flight < self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of lane counters and recent latency percentiles."""
+        return {
+            "queue_depth": len(self.queue),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_p50_ms": _percentile_ms(self.wait_times, 0.50),
+            "wait_p99_ms": _percentile_ms(self.wait_times, 0.99),
+            "run_p50_ms": _percentile_ms(self.run_times, 0.50),
+            "run_p99_ms": _percentile_ms(self.run_times, 0.99),
+        }
+
+
+class LaneScheduler:
+    """Dispatch blocking prediction calls from priority lanes onto a thread pool."""
+
+    def __init__(self, lanes: List[Lane], workers: int, starvation_limit: int):
+        """
+        Initialize scheduler.
+
+        Args:
+            lanes: Lanes in priority order (highest first)
+            workers: Size of the shared worker pool
+            starvation_limit: Consecutive dispatches that may bypass a waiting
+                lower-priority lane before it is served
+        """
+        self.lanes: Dict[str, Lane] = {lane.name: lane for lane in lanes}
+        self._order = list(lanes)
+        self.workers = workers
+        self.starvation_limit = starvation_limit
+        self._busy = 0
+        self._bypassed = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LaneScheduler":
+        """Build the interactive/bulk scheduler from application settings."""
+        return cls(
+            lanes=[
+                Lane(INTERACTIVE, settings.interactive_lane_concurrency, settings.interactive_lane_max_queue),
+                Lane(BULK, settings.bulk_lane_concurrency, settings.bulk_lane_max_queue),
+            ],
+            workers=settings.scheduler_workers,
+            starvation_limit=settings.bulk_starvation_limit,
+        )
+
+    def start(self) -> None:
+        """Start the worker pool. Must be called from the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="lane")
+        logger.info(
+            f"Scheduler started with {self.workers} workers, lanes: "
+            + ", ".join(f"{lane.name}={lane.max_concurrency}" for lane in self._order)
+        )
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop the worker pool."""
+        for lane in self._order:
+            while lane.queue:
+                lane.queue.popleft().future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, lane_name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Queue a blocking call on a lane and wait for its result.
+
+        The call runs in a copy of the caller's context, so stage timings it
+        records are attributed to the originating request.
+
+        Args:
+            lane_name: Lane to queue the call on
+            fn: Blocking callable to run on a worker thread
+            *args: Positional arguments for ``fn``
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            LaneFullError: If the lane queue is at capacity
+        """
+        if self._executor is None:
+            raise RuntimeError("Scheduler not started")
+        lane = self.lanes[lane_name]
+        if len(lane.queue) >= lane.max_queue:
+            lane.rejected += 1
+            raise LaneFullError(f"{lane_name} lane is full ({lane.max_queue} queued)")
+
+        job = _Job(fn=fn, args=args, future=self._loop.create_future())
+        lane.queue.append(job)
+        lane.submitted += 1
+        self._dispatch()
+        set_lane_gauges(lane.name, len(lane.queue), lane.in_flight)
+        try:
+            return await job.future
+        finally:
+            if job.started_at is not None:
+                observe_stage("queue_wait", job.started_at - job.enqueued_at)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-lane metrics keyed by lane name."""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    def queue_depth(self) -> int:
+        """Total jobs waiting across all lanes."""
+        return sum(len(lane.queue) for lane in self._order)
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Sizes of the lane queues and latency windows, for memory diagnostics."""
+        return {
+            name: {
+                "queued_jobs": len(lane.queue),
+                "wait_window": len(lane.wait_times),
+                "run_window": len(lane.run_times),
+            }
+            for name, lane in self.lanes.items()
+        }
+
+    def _next_lane(self) -> Optional[Lane]:
+        """Pick the lane to serve next, honouring priority and starvation protection."""
+        eligible = [lane for lane in self._order if lane.is_eligible()]
+        if not eligible:
+            return None
+        if len(eligible) == 1:
+            self._bypassed = 0
+            return eligible[0]
+        if self._bypassed >= self.starvation_limit:
+            self._bypassed = 0
+            return min(eligible[1:], key=lambda lane: lane.queue[0].enqueued_at)
+        self._bypassed += 1
+        return eligible[0]
+
+    def _dispatch(self) -> None:
+        """Hand queued jobs to free workers. Runs on the event loop thread."""
+        while self._busy < self.workers:
+            lane = self._next_lane()
+            if lane is None:
+                return
+            job = lane.queue.popleft()
+            if job.future.cancelled():
+                continue
+
+            started = job.started_at = time.perf_counter()
+            lane.wait_times.append(started - job.enqueued_at)
+            lane.in_flight += 1
+            self._busy += 1
+
+            def _done(cf: Future, lane: Lane = lane, job: _Job = job, started: float = started) -> None:
+                self._loop.call_soon_threadsafe(self._finish, lane, job, started, cf)
+
+            self._executor.submit(job.context.run, _call, job.fn, job.args).add_done_callback(_done)
+
+    def _finish(self, lane: Lane, job: _Job, started: float, cf: Future) -> None:
+        """Record a finished job, resolve its future and refill the pool."""
+        lane.in_flight -= 1
+        self._busy -= 1
+        lane.run_times.append(time.perf_counter() - started)
+
+        error = cf.exception()
+        if error is not None:
+            lane.failed += 1
+        else:
+            lane.completed += 1
+
+        if not job.future.cancelled():
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(cf.result())
+
+        self._dispatch()
+        set_lane_gauges(lane.name, len(lane.queue), lane.in_flight)
@@ -0,0 +1,65 @@
+"""
+Single-flight execution of identical concurrent calls.
+
+While a call for a key is running, further calls with the same key wait for
+its outcome instead of starting their own. The group only holds calls that
+are in flight; nothing is cached once they finish.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one execution."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run ``fn`` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine factory executed by the first caller
+
+        Returns:
+            Tuple of (result, shared); shared is True when the result came
+            from another caller's execution. Errors are shared the same way.
+        """
+        while True:
+            pending = self._calls.get(key)
+            if pending is None:
+                break
+            try:
+                # Shielded so a waiter going away does not cancel the leader
+                return await asyncio.shield(pending), True
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client disconnected);
+                # retry, becoming the leader if nobody else has
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so a call nobody waited on is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
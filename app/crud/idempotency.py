@@ -0,0 +1,76 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from app.db.models import IdempotencyKey
+from datetime import datetime
+from typing import Any, Dict, Optional
+import uuid
+
+class IdempotencyCRUD:
+    async def claim(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        key: str,
+        payload: Dict[str, Any],
+        now: datetime,
+        expired_before: datetime,
+        abandoned_before: datetime
+    ) -> bool:
+        """
+        Claim a key for execution, committing the claim.
+
+        An existing key is taken over only when it expired, or when its claim
+        never completed and is older than ``abandoned_before``.
+
+        Returns:
+            Whether this caller holds the claim
+        """
+        table = IdempotencyKey.__table__
+        stmt = insert(IdempotencyKey).values(user_id=user_id, key=key, payload=payload, created_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.key],
+            set_={"payload": stmt.excluded.payload, "result": None, "created_at": stmt.excluded.created_at},
+            where=or_(
+                table.c.created_at < expired_before,
+                and_(table.c.result.is_(None), table.c.created_at < abandoned_before),
+            ),
+        ).returning(table.c.key)
+        result = await db.execute(stmt)
+        claimed = result.first() is not None
+        await db.commit()
+        return claimed
+
+    async def get(self, db: AsyncSession, user_id: uuid.UUID, key: str) -> Optional[Any]:
+        """Current (payload, result, created_at) of a key, read fresh from the database."""
+        query = select(IdempotencyKey.payload, IdempotencyKey.result, IdempotencyKey.created_at).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+        )
+        result = await db.execute(query)
+        return result.first()
+
+    async def complete(self, db: AsyncSession, user_id: uuid.UUID, key: str, result: Dict[str, Any]) -> None:
+        """Record a claimed key's result; committed by the caller with the prediction log row."""
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(result=result)
+        )
+
+    async def release(self, db: AsyncSession, user_id: uuid.UUID, key: str) -> None:
+        """Give up an unfinished claim so a retry can run the request."""
+        await db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.result.is_(None),
+            )
+        )
+        await db.commit()
+
+    async def delete_expired(self, db: AsyncSession, before: datetime) -> int:
+        """Delete keys created before a cutoff; committed by the caller."""
+        result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < before))
+        return result.rowcount
+
+idempotency_crud = IdempotencyCRUD()
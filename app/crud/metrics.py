@@ -0,0 +1,81 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert
+from app.db.models import ApiMetrics, ApiMetricsRollup, ModelMetadata
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class MetricsCRUD:
+    async def upsert_rollups(
+        self,
+        db: AsyncSession,
+        rollups: List[Dict[str, Any]]
+    ) -> None:
+        """Insert rollup rows, merging into rows another worker already wrote."""
+        if not rollups:
+            return
+        stmt = insert(ApiMetricsRollup).values(rollups)
+        excluded = stmt.excluded
+        table = ApiMetricsRollup.__table__
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_api_metrics_rollup_key",
+            set_={
+                "request_count": table.c.request_count + excluded.request_count,
+                "total_ms": table.c.total_ms + excluded.total_ms,
+                "min_ms": func.least(table.c.min_ms, excluded.min_ms),
+                "max_ms": func.greatest(table.c.max_ms, excluded.max_ms),
+                "latency_histogram": text(
+                    "ARRAY(SELECT a + b FROM unnest("
+                    "api_metrics_rollups.latency_histogram, excluded.latency_histogram"
+                    ") AS u(a, b))"
+                ),
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+    
+    async def create_api_metrics(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Insert sampled or error raw request rows.
+
+        ``api_metrics.model_version`` references ``model_metadata``, so a
+        version that is not registered there is stored as NULL.
+        """
+        if not rows:
+            return
+        versions = {row["model_version"] for row in rows if row.get("model_version")}
+        if versions:
+            result = await db.execute(
+                select(ModelMetadata.model_version).where(ModelMetadata.model_version.in_(versions))
+            )
+            registered = set(result.scalars().all())
+            rows = [
+                {**row, "model_version": row["model_version"] if row.get("model_version") in registered else None}
+                for row in rows
+            ]
+        db.add_all([ApiMetrics(**row) for row in rows])
+        await db.commit()
+    
+    async def get_rollups(
+        self,
+        db: AsyncSession,
+        since: datetime,
+        endpoint: Optional[str] = None,
+        limit: int = 1000
+    ) -> List[ApiMetricsRollup]:
+        query = (
+            select(ApiMetricsRollup)
+            .where(ApiMetricsRollup.bucket_start >= since)
+            .order_by(ApiMetricsRollup.bucket_start.desc())
+            .limit(limit)
+        )
+        if endpoint is not None:
+            query = query.where(ApiMetricsRollup.endpoint == endpoint)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+metrics_crud = MetricsCRUD()
@@ -0,0 +1,152 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+import re
+
+# Daily partitions are named after the UTC day they hold
+PARTITION_NAME_FORMAT = "predictions_p%Y%m%d"
+# Catch-all for rows with no daily partition yet; maintenance moves them out
+DEFAULT_PARTITION = "predictions_p_default"
+ARCHIVE_PREFIX = "archive_"
+
+_UPPER_BOUND = re.compile(r"TO \('(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+
+
+def partition_name(day: date) -> str:
+    """Name of the daily partition holding the given UTC day."""
+    return day.strftime(PARTITION_NAME_FORMAT)
+
+
+class PartitionCRUD:
+    async def try_lock(self, db: AsyncSession, key: int) -> bool:
+        """Take a transaction-level advisory lock without waiting."""
+        result = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key})
+        return bool(result.scalar())
+
+    async def list_partitions(self, db: AsyncSession, parent: str = "predictions") -> List[Tuple[str, Optional[datetime]]]:
+        """
+        Partitions of a range-partitioned table with their exclusive upper bounds.
+
+        Returns:
+            (partition name, upper bound as naive UTC datetime, None for MAXVALUE or DEFAULT)
+        """
+        # Render bounds in UTC so they parse without an offset
+        await db.execute(text("SET LOCAL TimeZone = 'UTC'"))
+        result = await db.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass) "
+                "ORDER BY c.relname"
+            ),
+            {"parent": parent},
+        )
+        partitions = []
+        for name, bound in result.all():
+            match = _UPPER_BOUND.search(bound or "")
+            upper = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S") if match else None
+            partitions.append((name, upper))
+        return partitions
+
+    async def create_daily_partition(self, db: AsyncSession, day: date) -> None:
+        """
+        Create the partition for one UTC day if it does not exist.
+
+        Rows of that day already in the default partition are moved into the
+        new partition; Postgres refuses to create it while they are there.
+        """
+        start = f"{day.isoformat()} 00:00:00+00"
+        end = f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00"
+        window = {
+            "start": datetime.combine(day, time.min, timezone.utc),
+            "end": datetime.combine(day + timedelta(days=1), time.min, timezone.utc),
+        }
+        await db.execute(text(
+            "CREATE TEMPORARY TABLE IF NOT EXISTS predictions_moved "
+            "(LIKE predictions) ON COMMIT DROP"
+        ))
+        await db.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+                "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                "INSERT INTO predictions_moved SELECT * FROM moved"
+            ),
+            window,
+        )
+        await db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{partition_name(day)}" PARTITION OF predictions '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        await db.execute(text("INSERT INTO predictions SELECT * FROM predictions_moved"))
+        await db.execute(text("TRUNCATE predictions_moved"))
+
+    async def default_partition_days(self, db: AsyncSession) -> List[date]:
+        """UTC days that have rows in the default partition."""
+        result = await db.execute(text(
+            "SELECT DISTINCT CAST(created_at AT TIME ZONE 'UTC' AS date) "
+            f'FROM "{DEFAULT_PARTITION}" ORDER BY 1'
+        ))
+        return list(result.scalars().all())
+
+    async def drop_partition(self, db: AsyncSession, name: str) -> None:
+        await db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+
+    async def detach_partition(self, db: AsyncSession, name: str) -> str:
+        """Detach a partition and keep it as a standalone archive table."""
+        archived = f"{ARCHIVE_PREFIX}{name}"
+        await db.execute(text(f'ALTER TABLE predictions DETACH PARTITION "{name}"'))
+        await db.execute(text(f'ALTER TABLE "{name}" RENAME TO "{archived}"'))
+        return archived
+
+    async def rebuild_daily_summaries(self, db: AsyncSession, start: date, end: date) -> None:
+        """
+        Recompute per-user and per-model summaries for the UTC days in [start, end).
+
+        Both tables are rewritten for the range, so reruns are idempotent and
+        late rows are picked up on the next run within the lookback window.
+        """
+        # Day boundaries as UTC timestamps so the scan prunes to the matching partitions
+        params = {
+            "start": start,
+            "end": end,
+            "start_at": datetime.combine(start, time.min, timezone.utc),
+            "end_at": datetime.combine(end, time.min, timezone.utc),
+        }
+        window = "created_at >= :start_at AND created_at < :end_at"
+        day = "CAST(created_at AT TIME ZONE 'UTC' AS date)"
+        extrovert = "count(*) FILTER (WHERE prediction_result->>'prediction_code' = '1')"
+
+        await db.execute(
+            text("DELETE FROM prediction_daily_user_summaries WHERE day >= :start AND day < :end"), params
+        )
+        await db.execute(
+            text(
+                "INSERT INTO prediction_daily_user_summaries "
+                "(id, day, user_id, model_version, prediction_count, extrovert_count, "
+                "avg_confidence, avg_processing_ms) "
+                f"SELECT gen_random_uuid(), {day}, user_id, model_version, count(*), {extrovert}, "
+                "avg(confidence_score), avg(processing_time_ms) "
+                f"FROM predictions WHERE {window} "
+                "GROUP BY 2, 3, 4"
+            ),
+            params,
+        )
+        await db.execute(
+            text("DELETE FROM prediction_daily_model_summaries WHERE day >= :start AND day < :end"), params
+        )
+        await db.execute(
+            text(
+                "INSERT INTO prediction_daily_model_summaries "
+                "(day, model_version, prediction_count, extrovert_count, user_count, "
+                "avg_confidence, avg_processing_ms) "
+                f"SELECT {day}, model_version, count(*), {extrovert}, count(DISTINCT user_id), "
+                "avg(confidence_score), avg(processing_time_ms) "
+                f"FROM predictions WHERE {window} "
+                "GROUP BY 1, 2"
+            ),
+            params,
+        )
+
+partition_crud = PartitionCRUD()
@@ -1,23 +1,45 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from app.db.models import Prediction
 from app.schemas.prediction import PredictionCreate
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import uuid
 
+# Columns returned by history listings unless the JSONB payloads are requested
+SUMMARY_COLUMNS = (
+    Prediction.id,
+    Prediction.request_id,
+    Prediction.prediction_type,
+    Prediction.model_version,
+    Prediction.confidence_score,
+    Prediction.processing_time_ms,
+    Prediction.created_at,
+)
+PAYLOAD_COLUMNS = {
+    "input_features": Prediction.input_features,
+    "prediction_result": Prediction.prediction_result,
+}
+
 class PredictionCRUD:
     async def create_prediction(
         self, 
         db: AsyncSession, 
         prediction_data: PredictionCreate,
-        user_id: uuid.UUID
+        user_id: uuid.UUID,
+        request_id: Optional[str] = None,
+        commit: bool = True
     ) -> Prediction:
         db_prediction = Prediction(
             user_id=user_id,
-            request_id=str(uuid.uuid4()),
+            request_id=request_id or str(uuid.uuid4()),
             **prediction_data.dict()
         )
         db.add(db_prediction)
+        if not commit:
+            # Left for the caller to commit together with its own writes
+            await db.flush()
+            return db_prediction
         await db.commit()
         await db.refresh(db_prediction)
         return db_prediction
@@ -38,5 +60,49 @@ class PredictionCRUD:
         )
         result = await db.execute(query)
         return result.scalars().all()
+    
+    async def get_user_predictions_after(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        limit: int = 50,
+        include: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyset page of a user's predictions, newest first.
+        
+        Uses the (user_id, created_at, id) index, so every page costs the
+        same regardless of depth. JSONB payload columns are only selected
+        when named in ``include``.
+        """
+        columns = list(SUMMARY_COLUMNS) + [PAYLOAD_COLUMNS[name] for name in include]
+        query = (
+            select(*columns)
+            .where(Prediction.user_id == user_id)
+            .order_by(Prediction.created_at.desc(), Prediction.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(tuple_(Prediction.created_at, Prediction.id) < tuple_(*after))
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
+    async def get_common_inputs(
+        self,
+        db: AsyncSession,
+        since: datetime,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Most frequent input feature sets logged since a cutoff."""
+        query = (
+            select(Prediction.input_features)
+            .where(Prediction.created_at >= since)
+            .group_by(Prediction.input_features)
+            .order_by(func.count().desc())
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
 
 prediction_crud = PredictionCRUD()
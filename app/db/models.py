@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Boolean, Integer, Float, Date, DateTime, Text, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from datetime import datetime, timezone
 import uuid
 
 class User(Base):
@@ -22,22 +23,49 @@ class User(Base):
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (
+        # Serves keyset pagination of a user's history: (user_id, created_at, id) descending
+        Index("ix_predictions_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Daily range partitions plus a DEFAULT catch-all, created ahead and retired by PredictionPartitionService
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    request_id = Column(String(100), unique=True, nullable=False)
+    request_id = Column(String(100), nullable=False)
     prediction_type = Column(String(20), nullable=False)
     input_features = Column(JSONB, nullable=False)
     prediction_result = Column(JSONB, nullable=False)
     model_version = Column(String(50), nullable=False)
-    confidence_score = Column(Float)
+    confidence_score = Column(Float, nullable=True)  # NULL for cascade early exits
     processing_time_ms = Column(Integer)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
     
     user = relationship("User", back_populates="predictions")
     model_metadata = relationship("ModelMetadata", back_populates="predictions")
 
 
+# ------------------------------------------------------------
+#  IdempotencyKey – one claim per (user, key), shared by all workers
+# ------------------------------------------------------------
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id    = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    key        = Column(String(100), primary_key=True)
+    payload    = Column(JSONB, nullable=False)                      # request the key is bound to
+    result     = Column(JSONB)                                      # NULL while the claim is running
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<IdempotencyKey({self.user_id} {self.key} done={self.result is not None})>"
+
+
 # ------------------------------------------------------------
 #  ModelMetadata – minimal version‐tracking table for models
 # ------------------------------------------------------------
@@ -82,3 +110,77 @@ class ApiMetrics(Base):
 
     def __repr__(self) -> str:  # pragma: no cover
         return f"<ApiMetrics({self.endpoint} {self.status_code} {self.response_time_ms}ms)>"
+
+
+# ------------------------------------------------------------
+#  ApiMetricsRollup – per-interval request aggregates
+# ------------------------------------------------------------
+class ApiMetricsRollup(Base):
+    __tablename__ = "api_metrics_rollups"
+    __table_args__ = (
+        # One row per key per interval; workers merge into it with an upsert
+        UniqueConstraint(
+            "bucket_start", "endpoint", "method", "status_code", "user_id", "model_version",
+            name="uq_api_metrics_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id               = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    bucket_start     = Column(DateTime(timezone=True), nullable=False, index=True)
+    interval_seconds = Column(Integer,     nullable=False)
+    endpoint         = Column(String(100), nullable=False)             # route template
+    method           = Column(String(10),  nullable=False)
+    status_code      = Column(Integer,     nullable=False)
+    user_id          = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    model_version    = Column(String(50))
+
+    request_count     = Column(Integer, nullable=False)
+    total_ms          = Column(Float,   nullable=False)                # sum of latencies
+    min_ms            = Column(Float,   nullable=False)
+    max_ms            = Column(Float,   nullable=False)
+    latency_histogram = Column(ARRAY(Integer), nullable=False)         # counts per LATENCY_BUCKETS_MS bucket + overflow
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<ApiMetricsRollup({self.bucket_start} {self.endpoint} {self.status_code} n={self.request_count})>"
+
+
+# ------------------------------------------------------------
+#  Daily prediction summaries – built from the partitioned log
+# ------------------------------------------------------------
+class PredictionDailyUserSummary(Base):
+    __tablename__ = "prediction_daily_user_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "user_id", "model_version",
+            name="uq_prediction_daily_user_summary",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id                 = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    day                = Column(Date,        nullable=False, index=True)
+    user_id            = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
+    model_version      = Column(String(50),  nullable=False)
+    prediction_count   = Column(Integer,     nullable=False)
+    extrovert_count    = Column(Integer,     nullable=False)
+    avg_confidence     = Column(Float)
+    avg_processing_ms  = Column(Float)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<PredictionDailyUserSummary({self.day} {self.user_id} n={self.prediction_count})>"
+
+
+class PredictionDailyModelSummary(Base):
+    __tablename__ = "prediction_daily_model_summaries"
+
+    day                = Column(Date,        primary_key=True)
+    model_version      = Column(String(50),  primary_key=True)
+    prediction_count   = Column(Integer,     nullable=False)
+    extrovert_count    = Column(Integer,     nullable=False)
+    user_count         = Column(Integer,     nullable=False)
+    avg_confidence     = Column(Float)
+    avg_processing_ms  = Column(Float)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<PredictionDailyModelSummary({self.day} {self.model_version} n={self.prediction_count})>"
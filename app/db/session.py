@@ -6,7 +6,6 @@ Provides:
     • `AsyncSessionLocal`  – sessionmaker factory.
     • `get_db()`           – FastAPI dependency that yields an AsyncSession.
 """
-from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -41,7 +40,6 @@ AsyncSessionLocal = sessionmaker(
 # --------------------------------------------------------------------------- #
 # FastAPI dependency                                                          #
 # --------------------------------------------------------------------------- #
-@asynccontextmanager
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Yields an AsyncSession and guarantees proper close/rollback.
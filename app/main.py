@@ -1,13 +1,25 @@
 # app/main.py
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import get_settings
+from app.core.logging import setup_logging, shutdown_logging
 from app.models.model_loader import ModelLoader
 from app.models.predictor import PersonalityPredictor  # Import predictor
-from app.api.endpoints import predict, health, gui
+from app.core.scheduler import INTERACTIVE, LaneScheduler
+from app.core.batcher import MicroBatcher
+from app.core.metrics import StageTimingMiddleware, mark_process_dead
+from app.core.profiling import ProfilingMiddleware, RequestProfiler
+from app.core.memory import MemoryProfiler
+from app.core.sampler import ResourceSampler
+from app.services.metrics_service import ApiMetricsMiddleware, metrics_service
+from app.services.partition_service import partition_service
+from app.services.idempotency_service import idempotency_service
+from app.services.explanation_service import precompute_explanations
+from app.api.endpoints import predict, health, gui, metrics, admin, predictions, websocket
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +42,79 @@ async def lifespan(app: FastAPI):
     app.state.model_loader = model_loader
     app.state.predictor = predictor  # Store the single predictor instance
     
+    # Interactive and bulk lanes share one worker pool off the event loop
+    scheduler = LaneScheduler.from_settings(settings)
+    scheduler.start()
+    app.state.scheduler = scheduler
+    
+    # Streamed single predictions (gRPC streams, WebSockets) are scored together in micro-batches
+    batcher = MicroBatcher(
+        lambda features_list: scheduler.run(INTERACTIVE, predictor.predict_batch, features_list),
+        max_batch=settings.micro_batch_max_size,
+        max_wait_ms=settings.micro_batch_max_wait_ms
+    )
+    app.state.batcher = batcher
+    
+    # Optional gRPC server on the same event loop, sharing the predictor and lanes
+    grpc_server = None
+    if settings.grpc_enabled:
+        from app.rpc.server import GrpcServer
+        grpc_server = GrpcServer.from_settings(settings, predictor, scheduler, batcher)
+        await grpc_server.start()
+    
+    # Background sampling of process resources and event-loop lag
+    sampler = ResourceSampler.from_settings(settings)
+    sampler.start()
+    app.state.sampler = sampler
+    
+    # Periodic flush of aggregated API metrics
+    metrics_service.start()
+    
+    # Daily prediction partitions, retention and summaries
+    partition_service.start()
+    
+    # Long-lived structures reported by /admin/memory/structures
+    memory_profiler = app.state.memory_profiler
+    memory_profiler.register("model", model_loader.memory_report)
+    memory_profiler.register("single_flight", lambda: {"in_flight": len(predictor.single_flight)})
+    memory_profiler.register("explanations", predictor.explanations.stats)
+    memory_profiler.register("drift", predictor.drift.memory_report)
+    memory_profiler.register("scheduler", scheduler.memory_report)
+    memory_profiler.register("micro_batcher", lambda: {"pending": len(batcher)})
+    memory_profiler.register("sampler", sampler.memory_report)
+    memory_profiler.register("api_metrics", metrics_service.memory_report)
+    memory_profiler.register("idempotency", idempotency_service.memory_report)
+    
+    # Warm the explanation cache with common inputs in the background
+    precompute = asyncio.create_task(precompute_explanations(predictor, scheduler, settings))
+    
     logger.info("Model and predictor initialized successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    precompute.cancel()
+    if grpc_server is not None:
+        await grpc_server.stop()
+    await batcher.close()
+    await sampler.stop()
+    await metrics_service.stop()
+    await partition_service.stop()
+    scheduler.shutdown()
+    mark_process_dead()
+    shutdown_logging()
 
 def create_app() -> FastAPI:
     """Create FastAPI application."""
+    settings = get_settings()
+    setup_logging(
+        settings.log_level,
+        log_format=settings.log_format,
+        queue_size=settings.log_queue_size,
+        prediction_sample_rate=settings.prediction_log_sample_rate
+    )
+    
     app = FastAPI(
         title="XGBoost Personality Prediction API",
         description="API for personality prediction using XGBoost model",
@@ -48,8 +124,33 @@ def create_app() -> FastAPI:
     
     # Include routers
     app.include_router(predict.router, prefix="/predict", tags=["Prediction"])
-    app.include_router(health.router, tags=["Health"])
+    app.include_router(health.router, prefix="/health", tags=["Health"])
     app.include_router(gui.router, prefix="/predict", tags=["GUI"])
+    app.include_router(websocket.router, prefix="/predict", tags=["Prediction"])
+    app.include_router(metrics.router, tags=["Metrics"])
+    app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+    app.include_router(predictions.router, prefix="/predictions", tags=["History"])
+    
+    # Per-request latency/status aggregated into API metrics rollups
+    app.add_middleware(
+        ApiMetricsMiddleware,
+        service=metrics_service,
+        model_version=settings.MODEL_VERSION
+    )
+    
+    # Stage timing for the Prometheus parse/serialize histograms and Server-Timing
+    app.add_middleware(
+        StageTimingMiddleware,
+        server_timing=settings.server_timing_enabled
+    )
+    
+    # Opt-in request profiling, outermost so it covers the whole request
+    profiler = RequestProfiler.from_settings(settings)
+    app.state.profiler = profiler
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    
+    # On-demand tracemalloc diagnostics
+    app.state.memory_profiler = MemoryProfiler(settings.memory_max_snapshots)
     
     # Mount static files
     try:
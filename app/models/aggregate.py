@@ -0,0 +1,115 @@
+"""
+Population summaries of scored samples.
+
+Only aggregates are kept: class counts, probability and confidence sums and
+a fixed-bin confidence histogram, overall and per value of one input
+feature. Each chunk of predictions is folded in with a few ``bincount``
+reductions, so memory and response size do not grow with the number of
+samples.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Confidence is the larger class probability, so it lies in [0.5, 1]
+CONFIDENCE_EDGES = np.linspace(0.5, 1.0, 11)
+
+# Group of samples whose group-by feature is missing
+MISSING = "missing"
+
+
+def group_key(value: Any) -> str:
+    """Group label of one group-by feature value."""
+    if value is None or value != value:
+        return MISSING
+    if isinstance(value, str):
+        return value
+    return str(float(value))
+
+
+class _Totals:
+    def __init__(self):
+        self.count = 0
+        self.extrovert = 0
+        self.probability_sum = 0.0
+        self.confidence_sum = 0.0
+        self.histogram = np.zeros(len(CONFIDENCE_EDGES) - 1, dtype=np.int64)
+
+    def summary(self, target_mapping: Dict[int, str]) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "class_counts": {
+                target_mapping[0]: self.count - self.extrovert,
+                target_mapping[1]: self.extrovert,
+            },
+            "mean_probability": self.probability_sum / self.count if self.count else None,
+            "mean_confidence": self.confidence_sum / self.count if self.count else None,
+            "confidence_histogram": {
+                "edges": CONFIDENCE_EDGES.tolist(),
+                "counts": self.histogram.tolist(),
+            },
+        }
+
+
+class PopulationSummary:
+    """Running aggregates of predicted Extrovert probabilities, optionally grouped."""
+
+    def __init__(self, group_by: Optional[str] = None):
+        """
+        Initialize summary.
+
+        Args:
+            group_by: Model feature name whose values split the population
+        """
+        self.group_by = group_by
+        self.overall = _Totals()
+        self.groups: Dict[str, _Totals] = {}
+
+    def update(self, features_list: Sequence[Dict[str, Any]], probabilities: np.ndarray) -> None:
+        """
+        Fold a chunk of predictions into the aggregates.
+
+        Args:
+            features_list: Feature dictionaries of the chunk, for grouping
+            probabilities: Predicted Extrovert probability per sample
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        extrovert = probabilities > 0.5
+        confidence = np.maximum(probabilities, 1.0 - probabilities)
+        bins = len(CONFIDENCE_EDGES) - 1
+        histogram_index = np.clip(np.digitize(confidence, CONFIDENCE_EDGES[1:-1]), 0, bins - 1)
+
+        if self.group_by is None:
+            labels, inverse = [None], np.zeros(len(probabilities), dtype=np.intp)
+        else:
+            keys = np.array([group_key(features.get(self.group_by)) for features in features_list])
+            labels, inverse = np.unique(keys, return_inverse=True)
+
+        groups = len(labels)
+        counts = np.bincount(inverse, minlength=groups)
+        extrovert_counts = np.bincount(inverse, weights=extrovert, minlength=groups)
+        probability_sums = np.bincount(inverse, weights=probabilities, minlength=groups)
+        confidence_sums = np.bincount(inverse, weights=confidence, minlength=groups)
+        histograms = np.bincount(inverse * bins + histogram_index, minlength=groups * bins).reshape(groups, bins)
+
+        for index, label in enumerate(labels):
+            targets: List[_Totals] = [self.overall]
+            if label is not None:
+                targets.append(self.groups.setdefault(str(label), _Totals()))
+            for totals in targets:
+                totals.count += int(counts[index])
+                totals.extrovert += int(extrovert_counts[index])
+                totals.probability_sum += float(probability_sums[index])
+                totals.confidence_sum += float(confidence_sums[index])
+                totals.histogram += histograms[index]
+
+    def report(self, target_mapping: Dict[int, str]) -> Dict[str, Any]:
+        """Overall summary and, when grouping, one summary per group."""
+        return {
+            "overall": self.overall.summary(target_mapping),
+            "groups": (
+                {label: totals.summary(target_mapping) for label, totals in sorted(self.groups.items())}
+                if self.group_by is not None else None
+            ),
+        }
@@ -0,0 +1,125 @@
+"""
+Cascaded early-exit inference for the binary XGBoost model.
+
+Rows are scored in stages of boosting iterations. After each stage, the
+trees not evaluated yet can only move the margin by an amount between the
+sum of their smallest leaves and the sum of their largest leaves. Those
+bounds are computed once from the model's tree dump. A row whose partial
+margin stays on the same side of the decision boundary (margin 0, i.e.
+probability 0.5) whatever the remaining trees add leaves the cascade early.
+Its predicted class is the one the full ensemble would return, and only
+ambiguous rows are scored by the later stages.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+
+def _leaf_values(node: Dict[str, Any]) -> List[float]:
+    """Leaf values of one tree from its JSON dump."""
+    if "leaf" in node:
+        return [node["leaf"]]
+    return [value for child in node["children"] for value in _leaf_values(child)]
+
+
+class Cascade:
+    """Stage boundaries and remaining-tree margin bounds of a binary booster."""
+
+    def __init__(self, stages: List[int], lower: List[float], upper: List[float], epsilon: float = 1e-3):
+        """
+        Initialize cascade.
+
+        Args:
+            stages: Cumulative iteration counts ending each stage; the last is the full model
+            lower: Smallest margin the iterations after each stage can still add
+            upper: Largest margin the iterations after each stage can still add
+            epsilon: Extra margin required beyond the bounds, absorbing float32 rounding
+        """
+        self.stages = stages
+        self.lower = lower
+        self.upper = upper
+        self.epsilon = epsilon
+
+    @classmethod
+    def calibrate(cls, model: xgb.XGBClassifier, stages: Sequence[int], epsilon: float = 1e-3) -> "Cascade":
+        """
+        Compute the remaining-tree margin bounds of every stage.
+
+        Args:
+            model: Loaded binary classifier
+            stages: Iteration counts after which rows may exit early
+            epsilon: Safety margin added to the bounds
+
+        Returns:
+            Calibrated cascade
+
+        Raises:
+            ValueError: If the model is not a single-tree-per-round binary:logistic booster
+        """
+        booster = model.get_booster()
+        objective = json.loads(booster.save_config())["learner"]["objective"]["name"]
+        if objective != "binary:logistic":
+            raise ValueError(f"Cascaded inference needs a binary:logistic model, got {objective}")
+
+        rounds = booster.num_boosted_rounds()
+        dump = booster.get_dump(dump_format="json")
+        if len(dump) != rounds:
+            raise ValueError("Cascaded inference needs exactly one tree per boosting round")
+        leaves = [_leaf_values(json.loads(tree)) for tree in dump]
+        leaf_min = np.array([min(values) for values in leaves])
+        leaf_max = np.array([max(values) for values in leaves])
+
+        boundaries = sorted({stage for stage in stages if 0 < stage < rounds}) + [rounds]
+        # Suffix sums: bounds of what iterations [stage, rounds) can add
+        lower = [float(leaf_min[stage:].sum()) for stage in boundaries]
+        upper = [float(leaf_max[stage:].sum()) for stage in boundaries]
+        logger.info(
+            f"Cascade calibrated: stages {boundaries}, remaining-margin bounds "
+            + ", ".join(f"[{lo:.3f}, {hi:.3f}]" for lo, hi in zip(lower[:-1], upper[:-1]))
+        )
+        return cls(boundaries, lower, upper, epsilon)
+
+    def margins(self, model: xgb.XGBClassifier, frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score rows stage by stage, stopping each row once its class is decided.
+
+        Args:
+            model: Classifier the cascade was calibrated on
+            frame: Preprocessed rows
+
+        Returns:
+            Tuple of (margins, iterations evaluated per row); margins of rows
+            that exited early are partial
+        """
+        margins = np.zeros(len(frame), dtype=np.float64)
+        evaluated = np.zeros(len(frame), dtype=np.int32)
+        active = np.arange(len(frame))
+        start = 0
+        for lower, upper, end in zip(self.lower, self.upper, self.stages):
+            rows = frame.iloc[active]
+            # Later stages continue from the partial margin instead of re-scoring earlier trees
+            partial = model.predict(
+                rows,
+                output_margin=True,
+                iteration_range=(start, end),
+                base_margin=None if start == 0 else margins[active],
+            )
+            margins[active] = partial
+            evaluated[active] = end
+            decided = (partial + lower > self.epsilon) | (partial + upper < -self.epsilon)
+            active = active[~decided]
+            if not active.size:
+                break
+            start = end
+        return margins, evaluated
+
+    @property
+    def total_iterations(self) -> int:
+        return self.stages[-1]
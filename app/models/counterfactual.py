@@ -0,0 +1,120 @@
+"""
+Counterfactual search: the cheapest feature changes that flip a prediction.
+
+The feature space is small and bounded, so the neighbourhood of a sample can
+be enumerated exhaustively up to a number of changed features. Every
+candidate changes one combination of features to other whole values in
+their range (or the other category). Its cost is the weighted sum of the
+changes, with numerical changes measured as a fraction of the feature's
+range. Candidates are sorted by cost and scored in large matrix chunks, one
+model call per chunk, cheapest first. Because of that ordering, the search
+stops as soon as a chunk brings the number of flips found to ``top_k``: no
+later candidate can be cheaper. A latency budget, checked between chunks,
+bounds the search when flips are rare.
+"""
+
+import itertools
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def enumerate_candidates(
+    base: np.ndarray,
+    grids: Sequence[Optional[np.ndarray]],
+    unit_costs: np.ndarray,
+    max_changes: int,
+    limit: int
+) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Enumerate the neighbourhood of an encoded sample.
+
+    Args:
+        base: Encoded sample
+        grids: Values each column may take; None keeps the column fixed
+        unit_costs: Cost of changing each column by one unit
+        max_changes: Most columns changed at once
+        limit: Most candidates enumerated; fewer changes are enumerated first
+
+    Returns:
+        Tuple of (candidate matrix, cost per candidate, exhaustive), where
+        exhaustive is False when ``limit`` cut the enumeration short
+    """
+    columns = [column for column, grid in enumerate(grids) if grid is not None]
+    alternatives = {column: grids[column][grids[column] != base[column]] for column in columns}
+
+    blocks, costs = [], []
+    total = 0
+    for changes in range(1, max_changes + 1):
+        for combination in itertools.combinations(columns, changes):
+            values = [alternatives[column] for column in combination]
+            size = int(np.prod([len(v) for v in values]))
+            if not size:
+                continue
+            if total + size > limit:
+                return (*_stack(base, blocks, costs), False)
+
+            mesh = np.meshgrid(*values, indexing="ij")
+            block = np.tile(base, (size, 1))
+            cost = np.zeros(size)
+            for column, grid in zip(combination, mesh):
+                block[:, column] = grid.ravel()
+                cost += unit_costs[column] * np.abs(grid.ravel() - base[column])
+            blocks.append(block)
+            costs.append(cost)
+            total += size
+
+    return (*_stack(base, blocks, costs), True)
+
+
+def _stack(base: np.ndarray, blocks: List[np.ndarray], costs: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    if not blocks:
+        return np.zeros((0, len(base))), np.zeros(0)
+    return np.vstack(blocks), np.concatenate(costs)
+
+
+def search(
+    candidates: np.ndarray,
+    costs: np.ndarray,
+    flipped: Callable[[np.ndarray], np.ndarray],
+    top_k: int,
+    chunk_size: int,
+    budget_seconds: float
+) -> Tuple[np.ndarray, int, bool]:
+    """
+    Score candidates cheapest first until ``top_k`` flips are found.
+
+    Args:
+        candidates: Candidate matrix from ``enumerate_candidates``
+        costs: Cost per candidate
+        flipped: Scores a chunk of rows with one model call; True where the class flips
+        top_k: Flips wanted
+        chunk_size: Rows per model call
+        budget_seconds: Time after which no further chunk is started
+
+    Returns:
+        Tuple of (indices of the cheapest flips found, in cost order;
+        candidates scored; whether the search finished within the budget)
+    """
+    # Stable sort: among equal costs, candidates with fewer changes come first
+    order = np.argsort(costs, kind="stable")
+    deadline = time.monotonic() + budget_seconds
+    found: List[np.ndarray] = []
+    count = 0
+    scored = 0
+    for start in range(0, len(order), chunk_size):
+        if start and time.monotonic() > deadline:
+            return _first(found, top_k), scored, False
+        chunk = order[start:start + chunk_size]
+        hits = chunk[flipped(candidates[chunk])]
+        scored += len(chunk)
+        found.append(hits)
+        count += len(hits)
+        if count >= top_k:
+            break
+    return _first(found, top_k), scored, True
+
+
+def _first(found: List[np.ndarray], top_k: int) -> np.ndarray:
+    return np.concatenate(found)[:top_k] if found else np.zeros(0, dtype=np.intp)
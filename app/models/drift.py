@@ -0,0 +1,245 @@
+"""
+Online feature and prediction drift monitoring.
+
+Every feature is counted into fixed bins (unit-width bins over its valid
+range, or its categories) plus a missing bin, and the predicted Extrovert
+probability into ten equal-width bins. Counting a batch is one vectorized
+``bincount`` per feature, so the cost per sample is constant. Counts
+accumulate in time windows that rotate on a fixed period. Each window is
+compared with the reference profile that ``scripts/train_model.py`` saves
+next to the model, using the population stability index (PSI) and, for
+ordered bins, the Kolmogorov-Smirnov statistic over the binned CDFs.
+
+This module only needs numpy, so the training script can build profiles
+without the web stack.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Unit-width bins over each numerical feature's valid range (as validated by the API)
+NUMERICAL_BINS = {
+    'Time_spent_Alone': np.arange(0, 12),
+    'Social_event_attendance': np.arange(0, 11),
+    'Going_outside': np.arange(0, 11),
+    'Friends_circle_size': np.arange(0, 16),
+    'Post_frequency': np.arange(0, 11),
+}
+CATEGORICAL_BINS = {
+    'Stage_fear': ('No', 'Yes'),
+    'Drained_after_socializing': ('No', 'Yes'),
+}
+PROBABILITY_EDGES = np.linspace(0.0, 1.0, 11)
+
+# Pseudo-feature name of the predicted probability distribution
+PROBABILITY = "probability"
+
+PROFILE_VERSION = 1
+
+
+def _numeric(values: Sequence[Any]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def bin_counts(name: str, values: Sequence[Any]) -> np.ndarray:
+    """
+    Count values of one feature into its bins; the last bin counts missing values.
+
+    Args:
+        name: Feature name (or ``PROBABILITY``)
+        values: Raw values; None or NaN counts as missing
+
+    Returns:
+        Counts per bin
+    """
+    if name in CATEGORICAL_BINS:
+        categories = CATEGORICAL_BINS[name]
+        # Unknown categories are counted as missing
+        lookup = {category: index for index, category in enumerate(categories)}
+        index = np.array([lookup.get(value, len(categories)) for value in values], dtype=np.intp)
+        return np.bincount(index, minlength=len(categories) + 1)
+
+    edges = PROBABILITY_EDGES if name == PROBABILITY else NUMERICAL_BINS[name]
+    data = _numeric(values)
+    missing = np.isnan(data)
+    bins = len(edges) - 1
+    index = np.clip(np.digitize(data, edges[1:-1]), 0, bins - 1)
+    index[missing] = bins
+    return np.bincount(index, minlength=bins + 1)
+
+
+def monitored_features() -> List[str]:
+    return list(NUMERICAL_BINS) + list(CATEGORICAL_BINS) + [PROBABILITY]
+
+
+def build_profile(columns: Dict[str, Sequence[Any]]) -> Dict[str, Any]:
+    """
+    Reference profile of raw feature columns and predicted probabilities.
+
+    Args:
+        columns: Values per feature name, plus ``PROBABILITY``
+
+    Returns:
+        JSON-serializable profile
+    """
+    return {
+        "version": PROFILE_VERSION,
+        "features": {
+            name: bin_counts(name, values).tolist()
+            for name, values in columns.items()
+            if name in NUMERICAL_BINS or name in CATEGORICAL_BINS or name == PROBABILITY
+        },
+    }
+
+
+def psi(expected: np.ndarray, actual: np.ndarray, smoothing: float = 0.5) -> float:
+    """Population stability index of two count vectors over the same bins."""
+    p = (expected + smoothing) / (expected.sum() + smoothing * len(expected))
+    q = (actual + smoothing) / (actual.sum() + smoothing * len(actual))
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> Optional[float]:
+    """KS statistic of the binned CDFs of present (non-missing) values."""
+    expected, actual = expected[:-1], actual[:-1]
+    if not expected.sum() or not actual.sum():
+        return None
+    return float(np.max(np.abs(np.cumsum(expected) / expected.sum() - np.cumsum(actual) / actual.sum())))
+
+
+class _Window:
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.samples = 0
+        self.counts = {name: np.zeros(_bins(name), dtype=np.int64) for name in monitored_features()}
+
+
+def _bins(name: str) -> int:
+    if name in CATEGORICAL_BINS:
+        return len(CATEGORICAL_BINS[name]) + 1
+    edges = PROBABILITY_EDGES if name == PROBABILITY else NUMERICAL_BINS[name]
+    return len(edges)
+
+
+class DriftMonitor:
+    """Fixed-bin counts of live traffic in rotating windows, compared with a reference."""
+
+    def __init__(
+        self,
+        reference: Optional[Dict[str, Any]] = None,
+        window_seconds: int = 3600,
+        windows_kept: int = 24,
+        on_rotate=None
+    ):
+        """
+        Initialize drift monitor.
+
+        Args:
+            reference: Profile from ``build_profile``; None disables comparisons
+            window_seconds: Length of a counting window
+            windows_kept: Completed windows kept for reporting
+            on_rotate: Called with the report of each completed window
+        """
+        self.reference = {
+            name: np.array(counts) for name, counts in (reference or {}).get("features", {}).items()
+        }
+        self.window_seconds = window_seconds
+        self.on_rotate = on_rotate
+        self._current = _Window(self._window_start(time.time()))
+        self._completed: Deque[Dict[str, Any]] = deque(maxlen=windows_kept)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "DriftMonitor":
+        """Build a monitor with the reference profile at ``path``, if it exists."""
+        try:
+            with open(path) as f:
+                reference = json.load(f)
+        except FileNotFoundError:
+            reference = None
+        return cls(reference, **kwargs)
+
+    def _window_start(self, now: float) -> float:
+        return now - now % self.window_seconds
+
+    def update(self, features_list: Sequence[Dict[str, Any]], probabilities: Sequence[Optional[float]]) -> None:
+        """
+        Count a batch of raw inputs and their predicted Extrovert probabilities.
+
+        Args:
+            features_list: Raw feature dictionaries
+            probabilities: Predicted Extrovert probability per sample; None leaves the
+                sample out of the probability histogram (e.g. a cascade early exit,
+                whose probability is from a partial ensemble)
+        """
+        increments = {
+            name: bin_counts(name, [features.get(name) for features in features_list])
+            for name in list(NUMERICAL_BINS) + list(CATEGORICAL_BINS)
+        }
+        increments[PROBABILITY] = bin_counts(
+            PROBABILITY, [probability for probability in probabilities if probability is not None]
+        )
+
+        with self._lock:
+            completed = self._rotate(time.time())
+            for name, counts in increments.items():
+                self._current.counts[name] += counts
+            self._current.samples += len(features_list)
+        self._complete(completed)
+
+    def _rotate(self, now: float) -> Optional[_Window]:
+        """Start a new window once the current one has ended; returns the ended window. Holds the lock."""
+        if now - self._current.started_at < self.window_seconds:
+            return None
+        completed = self._current
+        self._current = _Window(self._window_start(now))
+        return completed
+
+    def _complete(self, completed: Optional[_Window]) -> None:
+        """Report an ended window, outside the lock."""
+        if completed is not None and completed.samples:
+            report = self._report(completed)
+            self._completed.append(report)
+            if self.on_rotate is not None:
+                self.on_rotate(report)
+
+    def _report(self, window: _Window) -> Dict[str, Any]:
+        features = {}
+        for name, counts in window.counts.items():
+            entry: Dict[str, Any] = {
+                "missing_rate": float(counts[-1] / counts.sum()) if counts.sum() else 0.0,
+            }
+            reference = self.reference.get(name)
+            if reference is not None and len(reference) == len(counts):
+                entry["psi"] = psi(reference, counts)
+                if name not in CATEGORICAL_BINS:
+                    entry["ks"] = ks(reference, counts)
+            features[name] = entry
+        return {
+            "window_start": window.started_at,
+            "window_seconds": self.window_seconds,
+            "samples": window.samples,
+            "features": features,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Drift of the current (partial) window and of recently completed windows."""
+        # Rotate here too, so an idle period does not leave a stale window as "current"
+        with self._lock:
+            completed = self._rotate(time.time())
+            current = self._report(self._current)
+        self._complete(completed)
+        return {
+            "reference_loaded": bool(self.reference),
+            "current": current,
+            "completed": list(self._completed),
+        }
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Windows held, for memory diagnostics."""
+        return {"completed_windows": len(self._completed), "current_samples": self._current.samples}
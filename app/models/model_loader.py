@@ -55,6 +55,18 @@ class ModelLoader:
             raise RuntimeError("Model not loaded")
         return self.model
     
+    def memory_report(self) -> Dict[str, Any]:
+        """Size of the resident model, for memory diagnostics."""
+        if not self.is_loaded():
+            return {"loaded": False}
+        booster = self.model.get_booster()
+        return {
+            "loaded": True,
+            "model_path": self.model_path,
+            "boosted_rounds": booster.num_boosted_rounds(),
+            "serialized_bytes": len(booster.save_raw()),
+        }
+    
     def get_feature_names(self) -> List[str]:
         """Get feature names from settings."""
         return self.settings.feature_names
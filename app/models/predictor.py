@@ -3,12 +3,41 @@ Prediction logic for XGBoost model.
 """
 
 import logging
-from typing import Dict, Any, List, Union, Optional
+import time
+from typing import Dict, Any, List, Union, Optional, Tuple, Hashable, Callable, Awaitable
 import pandas as pd
 import numpy as np
+import xgboost as xgb
 from sklearn.preprocessing import LabelEncoder
 
 from app.models.model_loader import ModelLoader
+from app.models.cascade import Cascade
+from app.models import counterfactual
+from app.models.drift import DriftMonitor
+from app.core.cache import LRUCache
+from app.core.metrics import (
+    CASCADE_ROWS, CASCADE_TREES, EXPLANATION_CACHE, PREDICTIONS_COALESCED, set_drift_gauges, time_stage
+)
+from app.core.singleflight import SingleFlight
+from app.core.logging import log_prediction_sampled
+
+# Values imputed for missing numerical features
+NUMERICAL_DEFAULTS = {
+    'Time_spent_Alone': 5.0,
+    'Social_event_attendance': 5.0,
+    'Going_outside': 5.0,
+    'Friends_circle_size': 8.0,
+    'Post_frequency': 5.0
+}
+
+# Valid range of each numerical feature (as validated by the API), swept by what-if
+FEATURE_RANGES = {
+    'Time_spent_Alone': (0.0, 11.0),
+    'Social_event_attendance': (0.0, 10.0),
+    'Going_outside': (0.0, 10.0),
+    'Friends_circle_size': (0.0, 15.0),
+    'Post_frequency': (0.0, 10.0)
+}
 
 
 class PersonalityPredictor:
@@ -27,6 +56,31 @@ class PersonalityPredictor:
         # Initialize encoders for categorical features
         self.label_encoders = {}
         self._setup_encoders()
+        
+        # Identical single predictions in flight share one computation
+        self.single_flight = SingleFlight()
+        
+        # Feature contributions by (model version, encoded features)
+        self.explanations: LRUCache[np.ndarray] = LRUCache(model_loader.settings.explain_cache_size)
+        
+        # Online input/output distributions, compared with the training profile
+        self.drift = DriftMonitor.from_file(
+            model_loader.settings.drift_reference_path,
+            window_seconds=model_loader.settings.drift_window_seconds,
+            windows_kept=model_loader.settings.drift_windows_kept,
+            on_rotate=set_drift_gauges
+        )
+        
+        # Optional early-exit inference, calibrated from the loaded model's trees
+        self.cascade: Optional[Cascade] = None
+        stages = model_loader.settings.cascade_stages
+        if stages:
+            try:
+                self.cascade = Cascade.calibrate(
+                    model_loader.get_model(), stages, model_loader.settings.cascade_margin_epsilon
+                )
+            except ValueError as e:
+                self.logger.warning(f"Cascaded inference disabled: {str(e)}")
     
     def _setup_encoders(self) -> None:
         """Setup label encoders for categorical features."""
@@ -40,104 +94,186 @@ class PersonalityPredictor:
             encoder = LabelEncoder()
             encoder.fit(categories)
             self.label_encoders[feature] = encoder
+        
+        # Category -> code lookups, so encoding a row needs no encoder call
+        self.category_codes = {
+            feature: {category: code for code, category in enumerate(encoder.classes_)}
+            for feature, encoder in self.label_encoders.items()
+        }
     
-    def _preprocess_features(self, features: Dict[str, Any]) -> pd.DataFrame:
+    def encode(self, features: Dict[str, Any]) -> Tuple[float, ...]:
         """
-        Preprocess features for prediction.
+        Canonical model input of one sample.
+        
+        Categorical features are label-encoded and missing values imputed,
+        in model feature order. Two requests with the same encoding get the
+        same prediction, so the encoding also identifies duplicate work.
         
         Args:
             features: Dictionary of feature values
             
         Returns:
-            Preprocessed features as DataFrame
-        """
-        # Create DataFrame
-        df = pd.DataFrame([features])
-        
-        # Handle categorical features
-        for feature, encoder in self.label_encoders.items():
-            if feature in df.columns:
-                # Handle missing values - replace with most common class
-                df[feature] = df[feature].fillna('No')
-                try:
-                    df[feature] = encoder.transform(df[feature])
-                except ValueError as e:
-                    self.logger.warning(f"Unknown category in {feature}: {df[feature].iloc[0]}")
-                    # Use default value (0 for 'No')
-                    df[feature] = 0
-        
-        # Handle numerical features - fill missing values with median
-        numerical_features = [
-            'Time_spent_Alone', 'Social_event_attendance', 'Going_outside',
-            'Friends_circle_size', 'Post_frequency'
-        ]
-        
-        for feature in numerical_features:
-            if feature in df.columns:
+            Encoded feature values
+        """
+        row = []
+        for feature in self.model_loader.get_feature_names():
+            value = features.get(feature)
+            if feature in self.category_codes:
+                # Missing values count as 'No'; unknown categories use code 0 ('No')
+                codes = self.category_codes[feature]
+                code = codes.get('No' if value is None else value)
+                if code is None:
+                    self.logger.warning(f"Unknown category in {feature}: {value}")
+                    code = 0
+                row.append(code)
+            elif feature not in features:
+                row.append(5.0)  # Default numerical value
+            elif value is None or value != value:
                 # For missing values, use reasonable defaults
-                if feature == 'Time_spent_Alone':
-                    df[feature] = df[feature].fillna(5.0)
-                elif feature == 'Social_event_attendance':
-                    df[feature] = df[feature].fillna(5.0)
-                elif feature == 'Going_outside':
-                    df[feature] = df[feature].fillna(5.0)
-                elif feature == 'Friends_circle_size':
-                    df[feature] = df[feature].fillna(8.0)
-                elif feature == 'Post_frequency':
-                    df[feature] = df[feature].fillna(5.0)
-        
-        # Ensure all required features are present
-        required_features = self.model_loader.get_feature_names()
-        for feature in required_features:
-            if feature not in df.columns:
-                # Add missing feature with default value
-                if feature in ['Stage_fear', 'Drained_after_socializing']:
-                    df[feature] = 0  # Default to 'No' encoded
-                else:
-                    df[feature] = 5.0  # Default numerical value
+                row.append(NUMERICAL_DEFAULTS.get(feature, 5.0))
+            else:
+                row.append(float(value))
+        return tuple(row)
+    
+    def coalescing_key(self, features: Dict[str, Any], cascade: bool = False) -> Hashable:
+        """Identity of a prediction: model version, inference mode and canonical encoded features."""
+        return (self.model_loader.settings.MODEL_VERSION, cascade, self.encode(features))
+    
+    def _frame(self, rows: List[Tuple[float, ...]]) -> pd.DataFrame:
+        """Model input frame of encoded rows."""
+        return pd.DataFrame(rows, columns=self.model_loader.get_feature_names())
+    
+    def _score(self, processed_features: pd.DataFrame, cascade: bool = False) -> List[Dict[str, Any]]:
+        """
+        Score preprocessed rows with one model call, without logging.
+        
+        Args:
+            processed_features: Frame built by ``_frame``
+            cascade: Let rows exit after the first trees once their class is decided
+            
+        Returns:
+            Prediction results, in row order
+        """
+        # Get model and make prediction
+        model = self.model_loader.get_model()
+        
+        if cascade and self.cascade is not None:
+            return self._score_cascade(model, processed_features)
+        
+        # Binary classifier: the predicted class is the one above 0.5 probability
+        with time_stage("inference"):
+            probabilities = model.predict_proba(processed_features)
+        
+        # Map prediction to label
+        target_mapping = self.model_loader.get_target_mapping()
+        return [self._result(introvert, extrovert, target_mapping) for introvert, extrovert in probabilities]
+    
+    def _score_cascade(self, model, processed_features: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Score rows through the early-exit cascade, reporting trees evaluated per row."""
+        with time_stage("inference"):
+            margins, evaluated = self.cascade.margins(model, processed_features)
+        extrovert = 1.0 / (1.0 + np.exp(-margins))
+        
+        early = int((evaluated < self.cascade.total_iterations).sum())
+        CASCADE_ROWS.labels("early").inc(early)
+        CASCADE_ROWS.labels("full").inc(len(evaluated) - early)
+        CASCADE_TREES.inc(int(evaluated.sum()))
+        
+        target_mapping = self.model_loader.get_target_mapping()
+        results = []
+        for probability, trees in zip(extrovert, evaluated):
+            result = self._result(1.0 - probability, probability, target_mapping)
+            result['trees_evaluated'] = int(trees)
+            result['early_exit'] = bool(trees < self.cascade.total_iterations)
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _result(introvert: float, extrovert: float, target_mapping: Dict[int, str]) -> Dict[str, Any]:
+        """Prediction result of one row from its class probabilities."""
+        prediction = int(extrovert > 0.5)
+        return {
+            'prediction': target_mapping[prediction],
+            'prediction_code': prediction,
+            'probabilities': {
+                'Introvert': float(introvert),
+                'Extrovert': float(extrovert)
+            },
+            'confidence': float(max(introvert, extrovert))
+        }
+    
+    @staticmethod
+    def _drift_probability(result: Dict[str, Any]) -> Optional[float]:
+        """Extrovert probability counted for drift; None for partial-ensemble (early exit) results."""
+        if result.get('early_exit'):
+            return None
+        return result['probabilities']['Extrovert']
+    
+    def _predict(self, features: Dict[str, Any], cascade: bool = False) -> Dict[str, Any]:
+        """
+        Score a single sample without logging.
+        
+        Args:
+            features: Dictionary of feature values
+            cascade: Use cascaded early-exit inference
+            
+        Returns:
+            Dictionary containing prediction results
+        """
+        # Preprocess features
+        with time_stage("preprocess"):
+            processed_features = self._frame([self.encode(features)])
+        return self._score(processed_features, cascade)[0]
+    
+    async def predict_single_coalesced(
+        self,
+        run: Callable[..., Awaitable[Dict[str, Any]]],
+        features: Dict[str, Any],
+        endpoint: str = "single",
+        cascade: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Predict one sample, sharing the computation with identical requests in flight.
         
-        # Reorder columns to match expected feature order
-        df = df[required_features]
+        Every caller is counted in the drift monitor, whether or not its
+        computation was shared.
         
-        return df
+        Args:
+            run: Executes ``predict_single`` off the event loop, e.g. on a scheduler lane
+            features: Dictionary of feature values
+            endpoint: Endpoint label of the coalescing counter
+            cascade: Use cascaded early-exit inference
+            
+        Returns:
+            Dictionary containing prediction results
+        """
+        result, shared = await self.single_flight.do(
+            self.coalescing_key(features, cascade), lambda: run(self.predict_single, features, cascade)
+        )
+        if shared:
+            PREDICTIONS_COALESCED.labels(endpoint).inc()
+        self.drift.update([features], [self._drift_probability(result)])
+        return result
     
-    def predict_single(self, features: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_single(self, features: Dict[str, Any], cascade: bool = False) -> Dict[str, Any]:
         """
         Make prediction for a single sample.
         
         Args:
             features: Dictionary of feature values
+            cascade: Use cascaded early-exit inference
             
         Returns:
             Dictionary containing prediction results
         """
         try:
-            # Preprocess features
-            processed_features = self._preprocess_features(features)
-            
-            # Get model and make prediction
-            model = self.model_loader.get_model()
-            
-            # Get prediction and probability
-            prediction = model.predict(processed_features)[0]
-            probabilities = model.predict_proba(processed_features)[0]
+            result = self._predict(features, cascade)
             
-            # Map prediction to label
-            target_mapping = self.model_loader.get_target_mapping()
-            predicted_label = target_mapping[prediction]
-            
-            # Create result
-            result = {
-                'prediction': predicted_label,
-                'prediction_code': int(prediction),
-                'probabilities': {
-                    'Introvert': float(probabilities[0]),
-                    'Extrovert': float(probabilities[1])
-                },
-                'confidence': float(max(probabilities))
-            }
-            
-            self.logger.info(f"Prediction made: {predicted_label} (confidence: {result['confidence']:.3f})")
+            if log_prediction_sampled():
+                self.logger.info(
+                    "Prediction made",
+                    extra={"prediction": result['prediction'], "confidence": round(result['confidence'], 3)}
+                )
             
             return result
             
@@ -145,27 +281,276 @@ class PersonalityPredictor:
             self.logger.error(f"Prediction failed: {str(e)}")
             raise
     
-    def predict_batch(self, features_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def explain_batch(self, features_list: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Per-feature contributions to the margin of each sample.
+        
+        Rows missing from the explanation cache are computed with a single
+        ``pred_contribs`` call for the whole batch.
+        
+        Args:
+            features_list: List of feature dictionaries
+            top_k: Only return the k contributions with the largest magnitude
+            
+        Returns:
+            List of explanations, in input order
+        """
+        version = self.model_loader.settings.MODEL_VERSION
+        with time_stage("preprocess"):
+            rows = [self.encode(features) for features in features_list]
+        
+        contributions: Dict[Tuple[float, ...], np.ndarray] = {}
+        misses = []
+        with time_stage("cache_lookup"):
+            for row in dict.fromkeys(rows):
+                cached = self.explanations.get((version, row))
+                if cached is None:
+                    misses.append(row)
+                else:
+                    contributions[row] = cached
+        EXPLANATION_CACHE.labels("hit").inc(len(contributions))
+        EXPLANATION_CACHE.labels("miss").inc(len(misses))
+        
+        if misses:
+            with time_stage("preprocess"):
+                matrix = xgb.DMatrix(self._frame(misses))
+            with time_stage("inference"):
+                values = self.model_loader.get_model().get_booster().predict(matrix, pred_contribs=True)
+            for row, value in zip(misses, values):
+                contributions[row] = value
+                self.explanations.put((version, row), value)
+        
+        target_mapping = self.model_loader.get_target_mapping()
+        names = self.model_loader.get_feature_names()
+        return [self._explanation(contributions[row], names, target_mapping, top_k) for row in rows]
+    
+    @staticmethod
+    def _explanation(
+        value: np.ndarray,
+        names: List[str],
+        target_mapping: Dict[int, str],
+        top_k: Optional[int]
+    ) -> Dict[str, Any]:
+        """Explanation of one row from its contribution vector (features, then bias)."""
+        margin = float(value.sum())
+        pairs = [(name, float(contribution)) for name, contribution in zip(names, value[:-1])]
+        if top_k is not None:
+            pairs = sorted(pairs, key=lambda pair: abs(pair[1]), reverse=True)[:top_k]
+        prediction = int(margin > 0)
+        return {
+            'prediction': target_mapping[prediction],
+            'prediction_code': prediction,
+            'margin': margin,
+            'bias': float(value[-1]),
+            'contributions': dict(pairs)
+        }
+    
+    def what_if(
+        self,
+        features: Dict[str, Any],
+        vary: List[str],
+        points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Predicted probability as one or two features sweep their range.
+        
+        The grid is built as one matrix from the encoded base sample, and the
+        grid and the base sample are scored with a single model call. Swept
+        rows are synthetic and are not counted by the drift monitor.
+        
+        Args:
+            features: Dictionary of feature values of the base sample
+            vary: Model feature names to sweep
+            points: Evenly spaced points per numerical feature; None for every whole value
+            
+        Returns:
+            Dictionary with the base prediction, grid values per feature and
+            the Extrovert probability curve (one feature) or surface (two)
+        """
+        names = self.model_loader.get_feature_names()
+        with time_stage("preprocess"):
+            axes, grids = [], []
+            for feature in vary:
+                if feature in self.category_codes:
+                    codes = self.category_codes[feature]
+                    axes.append(list(codes))
+                    grids.append(np.array(list(codes.values()), dtype=np.float64))
+                else:
+                    low, high = FEATURE_RANGES[feature]
+                    values = np.linspace(low, high, points) if points else np.arange(low, high + 1)
+                    axes.append(values.tolist())
+                    grids.append(values)
+            
+            mesh = np.meshgrid(*grids, indexing="ij")
+            # Row 0 is the base sample, the rest are the grid in row-major order
+            matrix = np.tile(np.array(self.encode(features), dtype=np.float64), (mesh[0].size + 1, 1))
+            for feature, values in zip(vary, mesh):
+                matrix[1:, names.index(feature)] = values.ravel()
+            frame = pd.DataFrame(matrix, columns=names).astype(
+                {feature: np.int64 for feature in self.category_codes}
+            )
+        
+        with time_stage("inference"):
+            probabilities = self.model_loader.get_model().predict_proba(frame)
+        
+        introvert, extrovert = probabilities[0]
+        return {
+            'base': self._result(introvert, extrovert, self.model_loader.get_target_mapping()),
+            'axes': axes,
+            'probabilities': probabilities[1:, 1].astype(np.float64).reshape(mesh[0].shape).tolist(),
+            'rows_scored': len(frame)
+        }
+    
+    def counterfactuals(
+        self,
+        features: Dict[str, Any],
+        weights: Dict[str, float],
+        frozen: List[str],
+        max_changes: int,
+        top_k: int
+    ) -> Dict[str, Any]:
+        """
+        Cheapest feature changes that flip the predicted class.
+        
+        Args:
+            features: Dictionary of feature values
+            weights: Cost weight per model feature name (default 1.0); a
+                numerical change costs its weight times the fraction of the
+                feature's range moved, a category change costs its weight
+            frozen: Model feature names that may not change
+            max_changes: Most features changed by one counterfactual
+            top_k: Counterfactuals returned
+            
+        Returns:
+            Dictionary with the base prediction, the counterfactuals in cost
+            order and search statistics
+        """
+        settings = self.model_loader.settings
+        started = time.monotonic()
+        names = self.model_loader.get_feature_names()
+        model = self.model_loader.get_model()
+        target_mapping = self.model_loader.get_target_mapping()
+        
+        with time_stage("preprocess"):
+            base = np.array(self.encode(features), dtype=np.float64)
+            grids, unit_costs = [], []
+            for feature in names:
+                weight = weights.get(feature, 1.0)
+                if feature in self.category_codes:
+                    grid, span = np.array(list(self.category_codes[feature].values()), dtype=np.float64), 1.0
+                else:
+                    low, high = FEATURE_RANGES[feature]
+                    grid, span = np.arange(low, high + 1), high - low
+                grids.append(None if feature in frozen else grid)
+                unit_costs.append(weight / span)
+            candidates, costs, exhaustive = counterfactual.enumerate_candidates(
+                base, grids, np.array(unit_costs), max_changes, settings.counterfactual_max_candidates
+            )
+        
+        def frame(rows: np.ndarray) -> pd.DataFrame:
+            return pd.DataFrame(rows, columns=names).astype({feature: np.int64 for feature in self.category_codes})
+        
+        with time_stage("inference"):
+            introvert, extrovert = model.predict_proba(frame(base[np.newaxis]))[0]
+            base_class = int(extrovert > 0.5)
+            
+            def flipped(rows: np.ndarray) -> np.ndarray:
+                return (model.predict_proba(frame(rows))[:, 1] > 0.5) != base_class
+            
+            remaining = settings.counterfactual_budget_ms / 1000 - (time.monotonic() - started)
+            found, scored, within_budget = counterfactual.search(
+                candidates, costs, flipped, top_k, settings.counterfactual_chunk_size, remaining
+            )
+            # Probabilities of the few flips returned, in one more call
+            flips = model.predict_proba(frame(candidates[found])) if len(found) else []
+        
+        decode = {
+            feature: {code: category for category, code in codes.items()}
+            for feature, codes in self.category_codes.items()
+        }
+        
+        results = []
+        for index, (flip_introvert, flip_extrovert) in zip(found, flips):
+            changes = {}
+            for column in np.flatnonzero(candidates[index] != base):
+                feature = names[column]
+                original, value = base[column], candidates[index][column]
+                if feature in decode:
+                    original, value = decode[feature][int(original)], decode[feature][int(value)]
+                else:
+                    original, value = float(original), float(value)
+                changes[feature] = {'original': original, 'value': value}
+            results.append({
+                'changes': changes,
+                'cost': float(costs[index]),
+                'result': self._result(flip_introvert, flip_extrovert, target_mapping)
+            })
+        
+        return {
+            'base': self._result(introvert, extrovert, target_mapping),
+            'counterfactuals': results,
+            'candidates_scored': scored,
+            'candidates_total': len(candidates),
+            'complete': exhaustive and within_budget
+        }
+    
+    def predict_probabilities(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Predicted Extrovert probabilities of a batch, without per-row results.
+        
+        Args:
+            features_list: List of feature dictionaries
+            
+        Returns:
+            Extrovert probability per sample, in input order
+        """
+        with time_stage("preprocess"):
+            rows = [self.encode(features) for features in features_list]
+            unique_rows = list(dict.fromkeys(rows))
+            processed_features = self._frame(unique_rows)
+        with time_stage("inference"):
+            scored = self.model_loader.get_model().predict_proba(processed_features)[:, 1]
+        position = {row: index for index, row in enumerate(unique_rows)}
+        probabilities = scored[[position[row] for row in rows]].astype(np.float64)
+        self.drift.update(features_list, probabilities)
+        
+        duplicates = len(rows) - len(unique_rows)
+        if duplicates:
+            PREDICTIONS_COALESCED.labels("aggregate").inc(duplicates)
+        return probabilities
+    
+    def predict_batch(self, features_list: List[Dict[str, Any]], cascade: bool = False) -> List[Dict[str, Any]]:
         """
         Make predictions for a batch of samples.
         
         Args:
             features_list: List of feature dictionaries
+            cascade: Use cascaded early-exit inference
             
         Returns:
             List of prediction results
         """
         try:
-            results = []
+            # Identical rows are scored once and fanned out
+            with time_stage("preprocess"):
+                rows = [self.encode(features) for features in features_list]
+                unique_rows = list(dict.fromkeys(rows))
+                processed_features = self._frame(unique_rows)
+            scored = dict(zip(unique_rows, self._score(processed_features, cascade)))
+            results = [scored[row] for row in rows]
+            self.drift.update(features_list, [self._drift_probability(result) for result in results])
             
-            for features in features_list:
-                result = self.predict_single(features)
-                results.append(result)
+            duplicates = len(rows) - len(unique_rows)
+            if duplicates:
+                PREDICTIONS_COALESCED.labels("batch").inc(duplicates)
             
-            self.logger.info(f"Batch prediction completed for {len(features_list)} samples")
+            self.logger.info(
+                "Batch prediction completed",
+                extra={"samples": len(features_list), "unique_samples": len(unique_rows)}
+            )
             
             return results
             
         except Exception as e:
             self.logger.error(f"Batch prediction failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
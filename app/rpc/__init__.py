@@ -0,0 +1,6 @@
+"""
+gRPC interface of the prediction service.
+
+``prediction_pb2`` and ``prediction_pb2_grpc`` are generated from
+``prediction.proto``; see the command at the top of that file.
+"""
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: app/rpc/prediction.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18\x61pp/rpc/prediction.proto\x12\x0epersonality.v1\"6\n\x0ePredictRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x10\n\x08\x66\x65\x61tures\x18\x02 \x03(\x02\"\x86\x01\n\x0fPredictResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x15\n\rmodel_version\x18\x02 \x01(\t\x12\x18\n\x10prediction_codes\x18\x03 \x03(\x05\x12\x1f\n\x17\x65xtrovert_probabilities\x18\x04 \x03(\x02\x12\r\n\x05\x65rror\x18\x05 \x01(\t\"\x12\n\x10ModelInfoRequest\"\x1c\n\nCategories\x12\x0e\n\x06labels\x18\x01 \x03(\t\"\xdd\x01\n\tModelInfo\x12\x15\n\rmodel_version\x18\x01 \x01(\t\x12\x15\n\rfeature_names\x18\x02 \x03(\t\x12=\n\ncategories\x18\x03 \x03(\x0b\x32).personality.v1.ModelInfo.CategoriesEntry\x12\x14\n\x0c\x63lass_labels\x18\x04 \x03(\t\x1aM\n\x0f\x43\x61tegoriesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12)\n\x05value\x18\x02 \x01(\x0b\x32\x1a.personality.v1.Categories:\x02\x38\x01\x32\x85\x02\n\x14PersonalityPredictor\x12J\n\x07Predict\x12\x1e.personality.v1.PredictRequest\x1a\x1f.personality.v1.PredictResponse\x12T\n\rPredictStream\x12\x1e.personality.v1.PredictRequest\x1a\x1f.personality.v1.PredictResponse(\x01\x30\x01\x12K\n\x0cGetModelInfo\x12 .personality.v1.ModelInfoRequest\x1a\x19.personality.v1.ModelInfob\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'app.rpc.prediction_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_MODELINFO_CATEGORIESENTRY']._options = None
+  _globals['_MODELINFO_CATEGORIESENTRY']._serialized_options = b'8\001'
+  _globals['_PREDICTREQUEST']._serialized_start=44
+  _globals['_PREDICTREQUEST']._serialized_end=98
+  _globals['_PREDICTRESPONSE']._serialized_start=101
+  _globals['_PREDICTRESPONSE']._serialized_end=235
+  _globals['_MODELINFOREQUEST']._serialized_start=237
+  _globals['_MODELINFOREQUEST']._serialized_end=255
+  _globals['_CATEGORIES']._serialized_start=257
+  _globals['_CATEGORIES']._serialized_end=285
+  _globals['_MODELINFO']._serialized_start=288
+  _globals['_MODELINFO']._serialized_end=509
+  _globals['_MODELINFO_CATEGORIESENTRY']._serialized_start=432
+  _globals['_MODELINFO_CATEGORIESENTRY']._serialized_end=509
+  _globals['_PERSONALITYPREDICTOR']._serialized_start=512
+  _globals['_PERSONALITYPREDICTOR']._serialized_end=773
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,136 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from app.rpc import prediction_pb2 as app_dot_rpc_dot_prediction__pb2
+
+
+class PersonalityPredictorStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Predict = channel.unary_unary(
+                '/personality.v1.PersonalityPredictor/Predict',
+                request_serializer=app_dot_rpc_dot_prediction__pb2.PredictRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_prediction__pb2.PredictResponse.FromString,
+                )
+        self.PredictStream = channel.stream_stream(
+                '/personality.v1.PersonalityPredictor/PredictStream',
+                request_serializer=app_dot_rpc_dot_prediction__pb2.PredictRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_prediction__pb2.PredictResponse.FromString,
+                )
+        self.GetModelInfo = channel.unary_unary(
+                '/personality.v1.PersonalityPredictor/GetModelInfo',
+                request_serializer=app_dot_rpc_dot_prediction__pb2.ModelInfoRequest.SerializeToString,
+                response_deserializer=app_dot_rpc_dot_prediction__pb2.ModelInfo.FromString,
+                )
+
+
+class PersonalityPredictorServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Predict(self, request, context):
+        """Score one or more samples.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PredictStream(self, request_iterator, context):
+        """Persistent stream for high-rate callers. Every request is answered with
+        one response carrying its request_id; responses may arrive out of order.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetModelInfo(self, request, context):
+        """Feature order, category codes and labels used by the float encoding.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_PersonalityPredictorServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Predict': grpc.unary_unary_rpc_method_handler(
+                    servicer.Predict,
+                    request_deserializer=app_dot_rpc_dot_prediction__pb2.PredictRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_prediction__pb2.PredictResponse.SerializeToString,
+            ),
+            'PredictStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.PredictStream,
+                    request_deserializer=app_dot_rpc_dot_prediction__pb2.PredictRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_prediction__pb2.PredictResponse.SerializeToString,
+            ),
+            'GetModelInfo': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetModelInfo,
+                    request_deserializer=app_dot_rpc_dot_prediction__pb2.ModelInfoRequest.FromString,
+                    response_serializer=app_dot_rpc_dot_prediction__pb2.ModelInfo.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'personality.v1.PersonalityPredictor', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class PersonalityPredictor(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Predict(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/personality.v1.PersonalityPredictor/Predict',
+            app_dot_rpc_dot_prediction__pb2.PredictRequest.SerializeToString,
+            app_dot_rpc_dot_prediction__pb2.PredictResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def PredictStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/personality.v1.PersonalityPredictor/PredictStream',
+            app_dot_rpc_dot_prediction__pb2.PredictRequest.SerializeToString,
+            app_dot_rpc_dot_prediction__pb2.PredictResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetModelInfo(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/personality.v1.PersonalityPredictor/GetModelInfo',
+            app_dot_rpc_dot_prediction__pb2.ModelInfoRequest.SerializeToString,
+            app_dot_rpc_dot_prediction__pb2.ModelInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
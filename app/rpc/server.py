@@ -0,0 +1,241 @@
+"""
+In-process gRPC server sharing the HTTP app's predictor.
+
+The server runs on the same event loop as the FastAPI app (``grpc.aio``)
+and uses the same predictor, scheduling lanes, single-flight coalescing,
+caches and metrics, so a sample scores identically over both transports.
+Samples travel as packed floats in model feature order, which avoids JSON
+parsing and per-field validation models. The values are still checked by
+the same column-wise validation engine as ``/predict/batch``.
+
+``Predict`` scores one sample on the interactive lane (coalesced with
+identical in-flight requests) or several on the bulk lane.
+``PredictStream`` keeps a stream open for high-rate callers: single-sample
+messages go through the shared micro-batcher and are answered as soon as
+their batch completes. Each stream has a bound on messages in flight, and
+a message counts against it until its response has been sent.
+"""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import grpc
+import numpy as np
+
+from app.api.endpoints.health import increment_prediction_count
+from app.core.batcher import MicroBatcher
+from app.core.config import Settings
+from app.core.metrics import record_prediction
+from app.core.scheduler import BULK, INTERACTIVE, LaneFullError, LaneScheduler
+from app.models.predictor import PersonalityPredictor
+from app.rpc import prediction_pb2, prediction_pb2_grpc
+from app.schemas.request import FEATURE_NAMES
+from app.utils.validation import validate_batch
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidSamples(ValueError):
+    """A request's samples are malformed or fail validation."""
+
+
+class PredictionServicer(prediction_pb2_grpc.PersonalityPredictorServicer):
+    """gRPC prediction service backed by the shared predictor."""
+
+    def __init__(
+        self,
+        predictor: PersonalityPredictor,
+        scheduler: LaneScheduler,
+        batcher: MicroBatcher,
+        stream_max_in_flight: int = 256
+    ):
+        """
+        Initialize servicer.
+
+        Args:
+            predictor: Predictor shared with the HTTP app
+            scheduler: Scheduler shared with the HTTP app
+            batcher: Micro-batcher for streamed single samples
+            stream_max_in_flight: Messages of one stream scored concurrently; reading pauses beyond it
+        """
+        self.predictor = predictor
+        self.scheduler = scheduler
+        self.batcher = batcher
+        self.stream_max_in_flight = stream_max_in_flight
+        self.model_version = predictor.model_loader.settings.MODEL_VERSION
+        self.feature_names: List[str] = predictor.model_loader.get_feature_names()
+        self.fields = {feature: field for field, feature in FEATURE_NAMES.items()}
+        self.labels = {
+            feature: {code: label for label, code in codes.items()}
+            for feature, codes in predictor.category_codes.items()
+        }
+
+    def decode(self, values) -> List[Dict[str, Any]]:
+        """
+        Validated samples of a packed feature array.
+
+        Raises:
+            InvalidSamples: If the array is not whole samples or a sample fails validation
+        """
+        width = len(self.feature_names)
+        if not len(values) or len(values) % width:
+            raise InvalidSamples(f"features must hold a positive multiple of {width} values")
+        rows = np.asarray(values, dtype=np.float64).reshape(-1, width)
+
+        columns = {}
+        for index, feature in enumerate(self.feature_names):
+            column = rows[:, index]
+            if feature in self.labels:
+                # Unknown codes keep their number so validation reports them
+                labels = self.labels[feature]
+                columns[self.fields[feature]] = [
+                    None if value != value else labels.get(value, str(value)) for value in column.tolist()
+                ]
+            else:
+                columns[self.fields[feature]] = [None if value != value else value for value in column.tolist()]
+        samples = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+        validation = validate_batch(samples)
+        if validation.errors:
+            raise InvalidSamples("; ".join(
+                f"sample {index}: {', '.join(errors)}" for index, errors in sorted(validation.errors.items())
+            ))
+        return validation.features
+
+    def response(self, request_id: str, results: List[Dict[str, Any]]) -> prediction_pb2.PredictResponse:
+        return prediction_pb2.PredictResponse(
+            request_id=request_id,
+            model_version=self.model_version,
+            prediction_codes=[result['prediction_code'] for result in results],
+            extrovert_probabilities=[result['probabilities']['Extrovert'] for result in results],
+        )
+
+    async def Predict(self, request, context):
+        try:
+            features_list = self.decode(request.features)
+            if len(features_list) == 1:
+                results = [await self.predictor.predict_single_coalesced(
+                    partial(self.scheduler.run, INTERACTIVE), features_list[0], endpoint="grpc"
+                )]
+            else:
+                results = await self.scheduler.run(BULK, self.predictor.predict_batch, features_list)
+        except InvalidSamples as e:
+            record_prediction("grpc", self.model_version, "rejected")
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except LaneFullError as e:
+            record_prediction("grpc", self.model_version, "rejected")
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except Exception as e:
+            record_prediction("grpc", self.model_version, "error")
+            logger.error(f"gRPC prediction failed: {str(e)}")
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
+
+        increment_prediction_count(len(results))
+        record_prediction("grpc", self.model_version, "success", samples=len(results))
+        return self.response(request.request_id, results)
+
+    async def _answer(self, request) -> prediction_pb2.PredictResponse:
+        """Response to one streamed request; failures are reported in its error field."""
+        try:
+            features_list = self.decode(request.features)
+            if len(features_list) == 1:
+                results = [await self.batcher.submit(features_list[0])]
+            else:
+                results = await self.scheduler.run(BULK, self.predictor.predict_batch, features_list)
+        except InvalidSamples as e:
+            record_prediction("grpc_stream", self.model_version, "rejected")
+            return prediction_pb2.PredictResponse(request_id=request.request_id, error=str(e))
+        except LaneFullError as e:
+            record_prediction("grpc_stream", self.model_version, "rejected")
+            return prediction_pb2.PredictResponse(request_id=request.request_id, error=str(e))
+        except Exception as e:
+            record_prediction("grpc_stream", self.model_version, "error")
+            logger.error(f"gRPC stream prediction failed: {str(e)}")
+            return prediction_pb2.PredictResponse(request_id=request.request_id, error=str(e))
+
+        increment_prediction_count(len(results))
+        record_prediction("grpc_stream", self.model_version, "success", samples=len(results))
+        return self.response(request.request_id, results)
+
+    async def PredictStream(self, request_iterator, context) -> AsyncIterator[prediction_pb2.PredictResponse]:
+        responses: "asyncio.Queue[Optional[prediction_pb2.PredictResponse]]" = asyncio.Queue()
+        slots = asyncio.Semaphore(self.stream_max_in_flight)
+        tasks: Set[asyncio.Task] = set()
+
+        async def answer(request) -> None:
+            # _answer reports failures in the response, so every request is answered
+            responses.put_nowait(await self._answer(request))
+
+        async def read() -> None:
+            try:
+                async for request in request_iterator:
+                    # Backpressure: stop reading (and let HTTP/2 flow control push back) while full
+                    await slots.acquire()
+                    task = asyncio.create_task(answer(request))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                responses.put_nowait(None)
+
+        reader = asyncio.create_task(read())
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                yield response
+                # The request's slot is only freed once its response has been taken by gRPC
+                slots.release()
+        finally:
+            reader.cancel()
+            for task in list(tasks):
+                task.cancel()
+
+    async def GetModelInfo(self, request, context):
+        target_mapping = self.predictor.model_loader.get_target_mapping()
+        return prediction_pb2.ModelInfo(
+            model_version=self.model_version,
+            feature_names=self.feature_names,
+            categories={
+                feature: prediction_pb2.Categories(labels=[labels[code] for code in sorted(labels)])
+                for feature, labels in self.labels.items()
+            },
+            class_labels=[target_mapping[code] for code in sorted(target_mapping)],
+        )
+
+
+class GrpcServer:
+    """Lifecycle of the in-process gRPC server."""
+
+    def __init__(self, servicer: PredictionServicer, host: str, port: int):
+        self.servicer = servicer
+        self.address = f"{host}:{port}"
+        self._server: Optional[grpc.aio.Server] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        predictor: PersonalityPredictor,
+        scheduler: LaneScheduler,
+        batcher: MicroBatcher
+    ) -> "GrpcServer":
+        """Build the server from application settings and the app's shared objects."""
+        servicer = PredictionServicer(predictor, scheduler, batcher, settings.grpc_stream_max_in_flight)
+        return cls(servicer, settings.host, settings.grpc_port)
+
+    async def start(self) -> None:
+        # SO_REUSEPORT lets every uvicorn worker bind the same port
+        self._server = grpc.aio.server(options=[("grpc.so_reuseport", 1)])
+        prediction_pb2_grpc.add_PersonalityPredictorServicer_to_server(self.servicer, self._server)
+        self._server.add_insecure_port(self.address)
+        await self._server.start()
+        logger.info(f"gRPC server listening on {self.address}")
+
+    async def stop(self, grace: float = 5.0) -> None:
+        if self._server is not None:
+            await self._server.stop(grace)
+            self._server = None
@@ -0,0 +1,87 @@
+"""
+Schemas for admin-only diagnostics endpoints.
+"""
+
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ProfilingConfig(BaseModel):
+    """Runtime request-profiling configuration."""
+    
+    sample_every: int = Field(
+        ...,
+        ge=0,
+        description="Profile one in N prediction requests (0 disables sampling)"
+    )
+
+
+class ProfileInfo(BaseModel):
+    """A stored request profile."""
+    
+    name: str = Field(..., description="Profile file name")
+    size_bytes: int = Field(..., description="File size in bytes")
+    created_at: float = Field(..., description="Creation time (Unix timestamp)")
+
+
+class ProfileListResponse(BaseModel):
+    """Stored request profiles, newest first."""
+    
+    sample_every: int = Field(..., description="Current one-in-N sampling rate (0 = off)")
+    profiles: List[ProfileInfo] = Field(..., description="Stored profiles")
+
+
+class MemorySnapshotInfo(BaseModel):
+    """A stored tracemalloc snapshot."""
+    
+    id: int = Field(..., description="Snapshot id")
+    taken_at: float = Field(..., description="Capture time (Unix timestamp)")
+
+
+class MemoryStatus(BaseModel):
+    """tracemalloc state."""
+    
+    tracing: bool = Field(..., description="Whether allocations are being traced")
+    frames: int = Field(..., description="Frames stored per traceback")
+    traced_current_bytes: int = Field(..., description="Currently traced memory in bytes")
+    traced_peak_bytes: int = Field(..., description="Peak traced memory in bytes")
+    snapshots: List[MemorySnapshotInfo] = Field(..., description="Stored snapshots, oldest first")
+
+
+class AllocationSite(BaseModel):
+    """Allocations attributed to one source line, file or module."""
+    
+    site: str = Field(..., description="Source line, file or module")
+    size_bytes: int = Field(..., description="Allocated bytes")
+    count: int = Field(..., description="Number of allocated blocks")
+
+
+class ModuleAllocationDiff(BaseModel):
+    """Allocation change for one module between two snapshots."""
+    
+    module: str = Field(..., description="Module name (or file path if not imported)")
+    size_diff_bytes: int = Field(..., description="Change in allocated bytes")
+    count_diff: int = Field(..., description="Change in allocated blocks")
+    size_bytes: int = Field(..., description="Allocated bytes in the newer snapshot")
+
+
+class ApiMetricsRollupOut(BaseModel):
+    """One per-interval API metrics rollup row."""
+    
+    bucket_start: datetime = Field(..., description="Start of the interval")
+    interval_seconds: int = Field(..., description="Interval length in seconds")
+    endpoint: str = Field(..., description="Route template")
+    method: str = Field(..., description="HTTP method")
+    status_code: int = Field(..., description="Response status code")
+    user_id: Optional[uuid.UUID] = Field(None, description="Authenticated user, if any")
+    model_version: Optional[str] = Field(None, description="Model version for prediction endpoints")
+    request_count: int = Field(..., description="Requests in the interval")
+    total_ms: float = Field(..., description="Sum of latencies in ms")
+    min_ms: float = Field(..., description="Fastest request in ms")
+    max_ms: float = Field(..., description="Slowest request in ms")
+    latency_histogram: List[int] = Field(..., description="Request counts per latency bucket")
+    
+    class Config:
+        from_attributes = True
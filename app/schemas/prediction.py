@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 import uuid
 from datetime import datetime
 
@@ -8,7 +8,7 @@ class PredictionBase(BaseModel):
     input_features: Dict[str, Any]
     prediction_result: Dict[str, Any]
     model_version: str
-    confidence_score: float
+    confidence_score: Optional[float] = None  # absent for cascade early exits (partial-ensemble confidence)
     processing_time_ms: int
 
 class PredictionCreate(PredictionBase):
@@ -25,3 +25,20 @@ class PredictionInDB(PredictionBase):
 
 class Prediction(PredictionInDB):
     pass
+
+class PredictionSummary(BaseModel):
+    """History entry; JSONB payloads are only present when requested."""
+    id: uuid.UUID
+    request_id: str
+    prediction_type: str
+    model_version: str
+    confidence_score: Optional[float] = None
+    processing_time_ms: Optional[int] = None
+    created_at: datetime
+    input_features: Optional[Dict[str, Any]] = None
+    prediction_result: Optional[Dict[str, Any]] = None
+
+class PredictionPage(BaseModel):
+    """One keyset page of prediction history."""
+    items: List[PredictionSummary]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; absent on the last page")
@@ -2,8 +2,19 @@
 Request schemas for the API.
 """
 
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional, List, Dict, Any
+from pydantic import BaseModel, Field, WithJsonSchema, field_validator
+
+# API field name -> model feature name
+FEATURE_NAMES = {
+    'time_spent_alone': 'Time_spent_Alone',
+    'stage_fear': 'Stage_fear',
+    'social_event_attendance': 'Social_event_attendance',
+    'going_outside': 'Going_outside',
+    'drained_after_socializing': 'Drained_after_socializing',
+    'friends_circle_size': 'Friends_circle_size',
+    'post_frequency': 'Post_frequency'
+}
 
 
 class PersonalityFeatures(BaseModel):
@@ -57,15 +68,7 @@ class PersonalityFeatures(BaseModel):
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary with proper field names."""
-        return {
-            'Time_spent_Alone': self.time_spent_alone,
-            'Stage_fear': self.stage_fear,
-            'Social_event_attendance': self.social_event_attendance,
-            'Going_outside': self.going_outside,
-            'Drained_after_socializing': self.drained_after_socializing,
-            'Friends_circle_size': self.friends_circle_size,
-            'Post_frequency': self.post_frequency
-        }
+        return {feature: getattr(self, field) for field, feature in FEATURE_NAMES.items()}
 
 
 class SinglePredictionRequest(BaseModel):
@@ -77,12 +80,98 @@ class SinglePredictionRequest(BaseModel):
     )
 
 
+# A sample accepted as-is but documented with the PersonalityFeatures schema
+RawPersonalityFeatures = Annotated[Any, WithJsonSchema(PersonalityFeatures.model_json_schema())]
+
+
 class BatchPredictionRequest(BaseModel):
     """Request for batch prediction."""
     
-    features: List[PersonalityFeatures] = Field(
+    # Raw samples: they are validated column-wise per batch (app.utils.validation),
+    # so one bad sample does not reject the others
+    features: List[RawPersonalityFeatures] = Field(
         ..., 
-        description="List of features for batch personality prediction",
+        description="List of features for batch personality prediction, each shaped like PersonalityFeatures",
         min_length=1,
         max_length=100
-    )
\ No newline at end of file
+    )
+
+
+class AggregateRequest(BaseModel):
+    """Request for aggregate-only scoring of a cohort."""
+    
+    features: List[PersonalityFeatures] = Field(
+        ...,
+        description="Samples to score; only their aggregates are returned",
+        min_length=1,
+        max_length=10000
+    )
+
+
+class WhatIfRequest(BaseModel):
+    """Request for a what-if sweep around one sample."""
+    
+    features: PersonalityFeatures = Field(
+        ...,
+        description="Base sample; features not varied keep these values"
+    )
+    vary: List[str] = Field(
+        ...,
+        description="One or two features (API field names) swept over their valid range",
+        min_length=1,
+        max_length=2
+    )
+    points: Optional[int] = Field(
+        None,
+        ge=2,
+        le=51,
+        description="Evenly spaced grid points per numerical feature; default is every whole value"
+    )
+    
+    @field_validator('vary')
+    def validate_vary(cls, v):
+        """Validate varied feature names."""
+        unknown = [field for field in v if field not in FEATURE_NAMES]
+        if unknown:
+            raise ValueError(f'Unknown features: {", ".join(unknown)}')
+        if len(set(v)) != len(v):
+            raise ValueError('Features to vary must be distinct')
+        return v
+
+
+class CounterfactualRequest(BaseModel):
+    """Request for the cheapest changes that flip a prediction."""
+    
+    features: PersonalityFeatures = Field(
+        ...,
+        description="Sample whose prediction should flip"
+    )
+    costs: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Cost weight per feature (API field names, default 1.0); a numerical change costs "
+                    "its weight times the fraction of the feature's range moved, a Yes/No change its weight"
+    )
+    frozen: List[str] = Field(
+        default_factory=list,
+        description="Features that may not change"
+    )
+    max_changes: int = Field(2, ge=1, le=3, description="Most features changed by one counterfactual")
+    top_k: int = Field(5, ge=1, le=20, description="Counterfactuals returned, cheapest first")
+    
+    @field_validator('costs')
+    def validate_costs(cls, v):
+        """Validate cost weights."""
+        for field, weight in v.items():
+            if field not in FEATURE_NAMES:
+                raise ValueError(f'Unknown feature: {field}')
+            if weight < 0:
+                raise ValueError(f'Cost of {field} must not be negative')
+        return v
+    
+    @field_validator('frozen')
+    def validate_frozen(cls, v):
+        """Validate frozen feature names."""
+        unknown = [field for field in v if field not in FEATURE_NAMES]
+        if unknown:
+            raise ValueError(f'Unknown features: {", ".join(unknown)}')
+        return v
@@ -2,7 +2,7 @@
 Response schemas for the API.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +25,15 @@ class PredictionResult(BaseModel):
         ..., 
         description="Confidence of the prediction (max probability)"
     )
+    trees_evaluated: Optional[int] = Field(
+        None,
+        description="Trees evaluated for this sample (cascaded mode only)"
+    )
+    early_exit: Optional[bool] = Field(
+        None,
+        description="Whether the sample left the cascade before the full ensemble; "
+                    "probabilities are then from the partial ensemble (cascaded mode only)"
+    )
 
 
 class SinglePredictionResponse(BaseModel):
@@ -35,15 +44,135 @@ class SinglePredictionResponse(BaseModel):
     message: str = Field("Prediction completed successfully", description="Response message")
 
 
+class RowError(BaseModel):
+    """Validation errors of one batch sample."""
+    
+    index: int = Field(..., description="Position of the sample in the request")
+    errors: List[str] = Field(..., description="Validation error messages")
+
+
 class BatchPredictionResponse(BaseModel):
     """Response for batch prediction."""
     
     success: bool = Field(True, description="Whether the prediction was successful")
-    results: List[PredictionResult] = Field(..., description="List of prediction results")
+    results: List[PredictionResult] = Field(
+        ...,
+        description="Prediction results of the valid samples, in request order"
+    )
     count: int = Field(..., description="Number of predictions made")
+    failed: int = Field(0, description="Number of samples rejected by validation")
+    errors: Optional[List[RowError]] = Field(
+        None,
+        description="Per-sample validation errors; those samples are skipped in results"
+    )
+    early_exit_rate: Optional[float] = Field(
+        None,
+        description="Fraction of samples that exited the cascade early (cascaded mode only)"
+    )
     message: str = Field("Batch prediction completed successfully", description="Response message")
 
 
+class ExplanationResult(BaseModel):
+    """Feature contributions (SHAP values) for one sample."""
+    
+    prediction: str = Field(..., description="Predicted personality type (Introvert/Extrovert)")
+    prediction_code: int = Field(..., description="Prediction code (0=Introvert, 1=Extrovert)")
+    margin: float = Field(..., description="Raw model score (log-odds of Extrovert); bias plus all contributions")
+    bias: float = Field(..., description="Expected margin before any feature is known")
+    contributions: Dict[str, float] = Field(
+        ...,
+        description="Contribution of each feature to the margin; only the largest k with top_k"
+    )
+
+
+class ExplanationResponse(BaseModel):
+    """Response for batch explanations."""
+    
+    success: bool = Field(True, description="Whether the explanation was successful")
+    results: List[ExplanationResult] = Field(..., description="Explanations, in request order")
+    count: int = Field(..., description="Number of samples explained")
+
+
+class ConfidenceHistogram(BaseModel):
+    """Fixed-bin histogram of prediction confidence."""
+    
+    edges: List[float] = Field(..., description="Bin edges over [0.5, 1]")
+    counts: List[int] = Field(..., description="Samples per bin")
+
+
+class AggregateSummary(BaseModel):
+    """Aggregates of the predictions of a population."""
+    
+    count: int = Field(..., description="Samples scored")
+    class_counts: Dict[str, int] = Field(..., description="Samples per predicted class")
+    mean_probability: Optional[float] = Field(None, description="Mean predicted Extrovert probability")
+    mean_confidence: Optional[float] = Field(None, description="Mean confidence (max probability)")
+    confidence_histogram: ConfidenceHistogram = Field(..., description="Confidence distribution")
+
+
+class AggregateResponse(BaseModel):
+    """Response for aggregate-only scoring."""
+    
+    success: bool = Field(True, description="Whether the scoring was successful")
+    overall: AggregateSummary = Field(..., description="Aggregates over all samples")
+    group_by: Optional[str] = Field(None, description="Feature the groups are split on")
+    groups: Optional[Dict[str, AggregateSummary]] = Field(
+        None,
+        description="Aggregates per value of the group-by feature ('missing' when absent)"
+    )
+
+
+class WhatIfAxis(BaseModel):
+    """One swept feature and its grid."""
+    
+    feature: str = Field(..., description="Swept feature (API field name)")
+    values: List[Union[float, str]] = Field(..., description="Grid values, in sweep order")
+
+
+class WhatIfResponse(BaseModel):
+    """Response for a what-if sweep."""
+    
+    success: bool = Field(True, description="Whether the sweep was successful")
+    base: PredictionResult = Field(..., description="Prediction for the unmodified sample")
+    axes: List[WhatIfAxis] = Field(..., description="Swept features, in request order")
+    probabilities: Union[List[float], List[List[float]]] = Field(
+        ...,
+        description="Extrovert probability over the grid: a curve for one feature, "
+                    "or a surface indexed [first axis][second axis] for two"
+    )
+    rows_scored: int = Field(..., description="Rows scored in the single model call, including the base sample")
+
+
+class FeatureChange(BaseModel):
+    """Change of one feature in a counterfactual."""
+    
+    original: Union[float, str] = Field(..., description="Value in the sample (imputed when it was missing)")
+    value: Union[float, str] = Field(..., description="Value in the counterfactual")
+
+
+class Counterfactual(BaseModel):
+    """Feature changes that flip the prediction."""
+    
+    changes: Dict[str, FeatureChange] = Field(..., description="Changed features (API field names)")
+    cost: float = Field(..., description="Weighted cost of the changes")
+    result: PredictionResult = Field(..., description="Prediction for the changed sample")
+
+
+class CounterfactualResponse(BaseModel):
+    """Response for a counterfactual search."""
+    
+    success: bool = Field(True, description="Whether the search was successful")
+    base: PredictionResult = Field(..., description="Prediction for the unmodified sample")
+    counterfactuals: List[Counterfactual] = Field(..., description="Flipping changes, cheapest first")
+    candidates_scored: int = Field(..., description="Candidates scored before the search stopped")
+    candidates_total: int = Field(..., description="Candidates in the enumerated neighbourhood")
+    complete: bool = Field(
+        ...,
+        description="False when the latency budget or the candidate limit cut the search short, "
+                    "so cheaper counterfactuals may exist"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     
@@ -60,6 +189,36 @@ class MetricsResponse(BaseModel):
     model_status: str = Field(..., description="Model status")
     uptime_seconds: float = Field(..., description="Application uptime in seconds")
     memory_usage_mb: float = Field(..., description="Memory usage in MB")
+    lanes: Optional[Dict[str, Dict[str, Any]]] = Field(
+        None,
+        description="Per-lane scheduler metrics (queue depth, in-flight, wait/run percentiles)"
+    )
+    resources: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Recent process resources and event-loop lag from the background sampler"
+    )
+
+
+class DriftWindow(BaseModel):
+    """Drift of one counting window against the training profile."""
+    
+    window_start: float = Field(..., description="Window start (Unix time)")
+    window_seconds: int = Field(..., description="Window length in seconds")
+    samples: int = Field(..., description="Samples counted in the window")
+    features: Dict[str, Dict[str, Optional[float]]] = Field(
+        ...,
+        description="Per feature (and 'probability'): missing_rate, plus psi and ks when a reference is loaded"
+    )
+    drifted: List[str] = Field(..., description="Features whose PSI exceeds the alert threshold")
+
+
+class DriftResponse(BaseModel):
+    """Drift monitor report."""
+    
+    reference_loaded: bool = Field(..., description="Whether a training reference profile is loaded")
+    psi_alert: float = Field(..., description="PSI above which a feature is reported as drifted")
+    current: DriftWindow = Field(..., description="Current, partially filled window")
+    completed: List[DriftWindow] = Field(..., description="Recently completed windows, oldest first")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,119 @@
+"""
+Chunked scoring of uploaded CSV files.
+
+The upload is read through a CSV reader a chunk of rows at a time. Each
+chunk is validated column-wise with the same engine as ``/predict/batch``,
+and valid rows are scored with the predictor's vectorized batch path. Each chunk comes
+back as CSV text with the original columns plus the prediction columns, so
+neither the upload nor the scored file is ever held in memory as a whole.
+Rows that fail validation are kept, with the reason in the ``error`` column.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+from typing import BinaryIO, List, Optional
+
+from app.models.predictor import PersonalityPredictor
+from app.schemas.request import FEATURE_NAMES
+from app.utils.validation import validate_batch
+
+OUTPUT_COLUMNS = ["prediction", "probability_extrovert", "confidence", "error"]
+
+# Accepted header spellings: API field names and the model's (training CSV) feature names
+_FIELDS_BY_HEADER = {
+    **{field: field for field in FEATURE_NAMES},
+    **{feature: field for field, feature in FEATURE_NAMES.items()},
+}
+
+
+class CSVFormatError(ValueError):
+    """The upload is not a CSV file with at least one feature column."""
+
+
+class CSVScoringJob:
+    """Scores one uploaded CSV file chunk by chunk."""
+
+    def __init__(self, predictor: PersonalityPredictor, file: BinaryIO):
+        """
+        Read the header of an uploaded file.
+
+        Args:
+            predictor: Predictor scoring the rows
+            file: Binary file object of the upload
+
+        Raises:
+            CSVFormatError: If the file has no header or no feature column
+        """
+        self.predictor = predictor
+        self.rows = 0
+        self.errors = 0
+        # An incremental decoder works on any file object, including spooled uploads
+        self._reader = csv.reader(codecs.getreader("utf-8-sig")(file))
+        try:
+            self.columns = next(self._reader)
+        except StopIteration:
+            raise CSVFormatError("The file is empty")
+        except UnicodeDecodeError:
+            raise CSVFormatError("The file is not UTF-8 encoded CSV")
+
+        self._fields = {
+            index: _FIELDS_BY_HEADER[name.strip()]
+            for index, name in enumerate(self.columns)
+            if name.strip() in _FIELDS_BY_HEADER
+        }
+        if not self._fields:
+            raise CSVFormatError(
+                "No feature columns found; expected headers such as " + ", ".join(FEATURE_NAMES)
+            )
+
+    def header(self) -> str:
+        """CSV header line of the scored file."""
+        return self._write([self.columns + OUTPUT_COLUMNS])
+
+    def next_chunk(self, size: int) -> Optional[str]:
+        """
+        Validate and score the next rows.
+
+        Args:
+            size: Rows read
+
+        Returns:
+            Scored rows as CSV text, or None at the end of the file
+        """
+        try:
+            rows = list(itertools.islice(self._reader, size))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise CSVFormatError(f"Unreadable CSV after row {self.rows}: {str(e)}")
+        if not rows:
+            return None
+
+        validation = validate_batch([
+            {field: row[index].strip() or None for index, field in self._fields.items() if index < len(row)}
+            for row in rows
+        ])
+        results = iter(self.predictor.predict_batch(validation.features) if validation.features else [])
+        output = []
+        for position, row in enumerate(rows):
+            errors = validation.errors.get(position)
+            if errors:
+                output.append(row + ["", "", "", "; ".join(errors)])
+            else:
+                result = next(results)
+                output.append(row + [
+                    result['prediction'],
+                    f"{result['probabilities']['Extrovert']:.6f}",
+                    f"{result['confidence']:.6f}",
+                    "",
+                ])
+
+        self.rows += len(rows)
+        self.errors += len(validation.errors)
+        return self._write(output)
+
+    @staticmethod
+    def _write(rows: List[List[str]]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
@@ -0,0 +1,64 @@
+"""
+Startup precomputation of feature contributions.
+
+The most common inputs logged recently are explained once after the model
+loads, so their explanations are served from the predictor's cache. The
+work runs on the bulk lane and never delays startup or prediction traffic.
+Workers started together share one Postgres advisory lock, so only one of
+them runs the lookback query; the others fill their caches on demand.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import Settings
+from app.core.scheduler import BULK, LaneScheduler
+from app.crud.partitions import partition_crud
+from app.crud.predictions import prediction_crud
+from app.db.session import AsyncSessionLocal
+from app.models.predictor import PersonalityPredictor
+
+logger = logging.getLogger(__name__)
+
+# Rows explained per bulk-lane job, matching the batch endpoint limit
+CHUNK_SIZE = 100
+
+# Advisory lock key held by the worker running the precompute
+PRECOMPUTE_LOCK_KEY = 0x6578706c  # "expl"
+
+
+async def precompute_explanations(
+    predictor: PersonalityPredictor,
+    scheduler: LaneScheduler,
+    settings: Settings
+) -> int:
+    """
+    Explain the most common recent inputs to warm the explanation cache.
+
+    Args:
+        predictor: Predictor owning the explanation cache
+        scheduler: Scheduler whose bulk lane runs the computation
+        settings: Application settings
+
+    Returns:
+        Number of inputs explained (0 if another worker holds the precompute lock)
+    """
+    limit = min(settings.explain_precompute_limit, settings.explain_cache_size)
+    if limit <= 0:
+        return 0
+    since = datetime.now(timezone.utc) - timedelta(hours=settings.explain_precompute_lookback_hours)
+    try:
+        # The transaction-level lock is held until the session closes, so
+        # workers starting at the same time skip instead of repeating the query
+        async with AsyncSessionLocal() as db:
+            if not await partition_crud.try_lock(db, PRECOMPUTE_LOCK_KEY):
+                logger.info("Explanation precompute running in another worker")
+                return 0
+            inputs = await prediction_crud.get_common_inputs(db, since, limit)
+            for start in range(0, len(inputs), CHUNK_SIZE):
+                await scheduler.run(BULK, predictor.explain_batch, inputs[start:start + CHUNK_SIZE])
+    except Exception as e:
+        logger.warning(f"Explanation precompute skipped: {str(e)}")
+        return 0
+    logger.info(f"Precomputed explanations for {len(inputs)} common inputs")
+    return len(inputs)
@@ -0,0 +1,201 @@
+"""
+Idempotent prediction requests.
+
+A client-supplied idempotency key runs its request once per user. Before
+scoring, a request claims the key in ``idempotency_keys`` with
+``INSERT ... ON CONFLICT``, so across all workers only one request holds
+it. The key's result is committed in the same transaction as the
+prediction log row, which also stores the key as its ``request_id``. A
+retry with the same key and payload returns the stored result without
+rescoring or logging again. A duplicate that arrives while the first
+request is still running waits for its result. In the same worker it
+waits on the running request; in another worker it polls the database.
+A claim that never completes, for example because its worker died, is
+taken over after ``claim_timeout_seconds``. Recent results are also kept
+in a bounded in-memory index.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, settings
+from app.core.metrics import IDEMPOTENT_REPLAYS, time_stage
+from app.crud.idempotency import idempotency_crud
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 100  # idempotency_keys.key and predictions.request_id are VARCHAR(100)
+
+# Polling interval while another worker runs a claimed key, doubling up to the maximum
+CLAIM_POLL_SECONDS = 0.02
+MAX_CLAIM_POLL_SECONDS = 0.5
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a request with a different payload."""
+
+
+@dataclass
+class _Entry:
+    payload: Dict[str, Any]
+    result: Dict[str, Any]
+    stored_at: float
+
+
+class IdempotencyService:
+    """Replay stored results for repeated idempotency keys."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 86400, claim_timeout_seconds: int = 30):
+        """
+        Initialize idempotency service.
+
+        Args:
+            max_entries: Keys kept in memory; the least recently used is evicted first
+            ttl_seconds: Age after which a key no longer replays
+            claim_timeout_seconds: Age after which an unfinished claim is taken over by a duplicate
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "IdempotencyService":
+        """Build the service from application settings."""
+        return cls(
+            max_entries=settings.idempotency_cache_size,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            claim_timeout_seconds=settings.idempotency_claim_timeout_seconds,
+        )
+
+    async def execute(
+        self,
+        db: AsyncSession,
+        user_id: Any,
+        key: str,
+        payload: Dict[str, Any],
+        run: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a request once per idempotency key.
+
+        Args:
+            db: Database session holding the claim; ``run``'s writes are committed on it
+            user_id: Owner of the key; keys are scoped per user
+            key: Client-supplied idempotency key
+            payload: Request payload the key is bound to
+            run: Scores the request and stages its log writes on ``db`` without committing
+
+        Returns:
+            Tuple of (result, replayed)
+
+        Raises:
+            IdempotencyKeyReused: If the key was used with a different payload
+        """
+        cache_key = (user_id, key)
+        source = "memory"
+        with time_stage("cache_lookup"):
+            while True:
+                entry = self._lookup(cache_key)
+                if entry is not None:
+                    return self._replay(entry, payload, source), True
+
+                pending = self._in_flight.get(cache_key)
+                if pending is None:
+                    break
+                # Wait for the first execution, then re-check; if it failed, the
+                # key is still unused and this request runs it instead
+                await asyncio.shield(pending)
+                source = "in_flight"
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = future
+        try:
+            with time_stage("cache_lookup"):
+                delay = CLAIM_POLL_SECONDS
+                while True:
+                    now = datetime.now(timezone.utc)
+                    claimed = await idempotency_crud.claim(
+                        db, user_id, key, payload, now,
+                        expired_before=now - timedelta(seconds=self.ttl_seconds),
+                        abandoned_before=now - timedelta(seconds=self.claim_timeout_seconds),
+                    )
+                    if claimed:
+                        break
+                    stored = await idempotency_crud.get(db, user_id, key)
+                    await db.rollback()
+                    if stored is None:
+                        # Released by a failed first attempt; claim it again
+                        continue
+                    if stored.result is not None:
+                        entry = self._store(cache_key, stored.payload, stored.result, stored.created_at.timestamp())
+                        return self._replay(entry, payload, "database"), True
+                    if stored.payload != payload:
+                        raise IdempotencyKeyReused("Idempotency key was already used with a different request payload")
+                    # Another worker is running it; poll until it completes or is abandoned
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, MAX_CLAIM_POLL_SECONDS)
+
+            try:
+                result = await run()
+                with time_stage("db_log"):
+                    await idempotency_crud.complete(db, user_id, key, result)
+                    await db.commit()
+            except Exception:
+                await self._release(db, user_id, key)
+                raise
+            self._store(cache_key, payload, result, time.time())
+            return result, False
+        finally:
+            del self._in_flight[cache_key]
+            future.set_result(None)
+
+    @staticmethod
+    async def _release(db: AsyncSession, user_id: Any, key: str) -> None:
+        """Drop a failed attempt's claim so a retry runs the request."""
+        try:
+            await db.rollback()
+            await idempotency_crud.release(db, user_id, key)
+        except Exception as e:
+            # The claim is taken over once it times out
+            logger.error(f"Failed to release idempotency key: {str(e)}")
+
+    def _lookup(self, cache_key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if time.time() - entry.stored_at > self.ttl_seconds:
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return entry
+
+    def _store(self, cache_key: Hashable, payload: Dict[str, Any], result: Dict[str, Any], stored_at: float) -> _Entry:
+        entry = _Entry(payload=payload, result=result, stored_at=stored_at)
+        self._entries[cache_key] = entry
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _replay(entry: _Entry, payload: Dict[str, Any], source: str) -> Dict[str, Any]:
+        if entry.payload != payload:
+            raise IdempotencyKeyReused("Idempotency key was already used with a different request payload")
+        IDEMPOTENT_REPLAYS.labels(source).inc()
+        return entry.result
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Cached keys and pending executions, for memory diagnostics."""
+        return {"keys": len(self._entries), "in_flight": len(self._in_flight)}
+
+
+idempotency_service = IdempotencyService.from_settings(settings)
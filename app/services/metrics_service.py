@@ -0,0 +1,214 @@
+"""
+Pre-aggregated API request metrics.
+
+Requests are folded into in-memory rollups keyed by interval, endpoint
+(route template), method, status, user and model version. A background
+task flushes one row per key per interval into ``api_metrics_rollups``;
+concurrent workers merge into the same row through an upsert. Raw
+``api_metrics`` rows are only kept for a sampled fraction of requests and
+for server errors.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import Settings, settings
+from app.crud.metrics import metrics_crud
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; a final bucket counts overflow
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+RollupKey = Tuple[float, str, str, int, Optional[Any], Optional[str]]
+
+
+@dataclass
+class _Rollup:
+    count: int = 0
+    total_ms: float = 0.0
+    min_ms: float = float("inf")
+    max_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = min(self.min_ms, duration_ms)
+        self.max_ms = max(self.max_ms, duration_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+
+class ApiMetricsService:
+    """Aggregate request metrics in memory and flush compact rollups."""
+
+    def __init__(self, interval_seconds: int = 60, raw_sample_rate: float = 0.01, max_raw_rows: int = 10000):
+        """
+        Initialize metrics service.
+
+        Args:
+            interval_seconds: Rollup interval and flush period
+            raw_sample_rate: Fraction of successful requests also stored as raw rows
+            max_raw_rows: Raw rows buffered per interval before further ones are dropped
+        """
+        self.interval_seconds = interval_seconds
+        self.raw_sample_rate = raw_sample_rate
+        self.max_raw_rows = max_raw_rows
+        self._rollups: Dict[RollupKey, _Rollup] = {}
+        self._raw: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ApiMetricsService":
+        """Build the service from application settings."""
+        return cls(
+            interval_seconds=settings.api_metrics_interval_seconds,
+            raw_sample_rate=settings.api_metrics_raw_sample_rate,
+        )
+
+    def record(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        duration_ms: float,
+        user_id: Optional[Any] = None,
+        model_version: Optional[str] = None
+    ) -> None:
+        """Fold one finished request into the current interval."""
+        now = time.time()
+        bucket = now - now % self.interval_seconds
+        key = (bucket, endpoint, method, status_code, user_id, model_version)
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = self._rollups[key] = _Rollup()
+        rollup.add(duration_ms)
+
+        if status_code >= 500 or random.random() < self.raw_sample_rate:
+            if len(self._raw) < self.max_raw_rows:
+                self._raw.append({
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status_code": status_code,
+                    "response_time_ms": int(duration_ms),
+                    "user_id": user_id,
+                    "model_version": model_version,
+                })
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="api-metrics-flush")
+
+    async def stop(self) -> None:
+        """Stop the flush task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            # Wake just after each interval boundary so completed buckets are written once
+            await asyncio.sleep(self.interval_seconds - time.time() % self.interval_seconds + 0.1)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered rollups and raw rows to the database."""
+        rollups, self._rollups = self._rollups, {}
+        raw, self._raw = self._raw, []
+        if not rollups and not raw:
+            return
+
+        rows = [
+            {
+                "bucket_start": datetime.fromtimestamp(bucket, timezone.utc),
+                "interval_seconds": self.interval_seconds,
+                "endpoint": endpoint,
+                "method": method,
+                "status_code": status_code,
+                "user_id": user_id,
+                "model_version": model_version,
+                "request_count": rollup.count,
+                "total_ms": rollup.total_ms,
+                "min_ms": rollup.min_ms,
+                "max_ms": rollup.max_ms,
+                "latency_histogram": rollup.histogram,
+            }
+            for (bucket, endpoint, method, status_code, user_id, model_version), rollup in rollups.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                await metrics_crud.upsert_rollups(db, rows)
+                await metrics_crud.create_api_metrics(db, raw)
+        except Exception as e:
+            logger.error(f"Failed to flush API metrics ({len(rows)} rollups, {len(raw)} raw rows): {str(e)}")
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Buffered rollup keys and raw rows, for memory diagnostics."""
+        return {"rollup_keys": len(self._rollups), "raw_rows": len(self._raw)}
+
+
+class ApiMetricsMiddleware:
+    """ASGI middleware recording the latency and status of every HTTP request."""
+
+    def __init__(self, app, service: ApiMetricsService, model_version: str, model_path_prefix: str = "/predict"):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            service: Aggregating metrics service
+            model_version: Version attributed to requests under model_path_prefix
+            model_path_prefix: Path prefix of endpoints served by the model
+        """
+        self.app = app
+        self.service = service
+        self.model_version = model_version
+        self.model_path_prefix = model_path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Route templates keep cardinality bounded; unmatched paths share one key
+            endpoint = getattr(route, "path", None) or "unmatched"
+            model_version = self.model_version if scope["path"].startswith(self.model_path_prefix) else None
+            self.service.record(
+                endpoint=endpoint,
+                method=scope["method"],
+                status_code=status_code,
+                duration_ms=(time.perf_counter() - started) * 1000,
+                user_id=scope.get("state", {}).get("user_id"),
+                model_version=model_version,
+            )
+
+
+metrics_service = ApiMetricsService.from_settings(settings)
@@ -0,0 +1,173 @@
+"""
+Maintenance of the partitioned prediction log.
+
+``predictions`` is range-partitioned by ``created_at`` into one partition
+per UTC day. A background task periodically creates the partitions for
+the coming days, moves rows that landed in the default partition (while
+maintenance was not running) into daily partitions of their own, drops
+(or detaches into ``archive_*`` tables) partitions older than the
+retention window, and rebuilds the daily per-user and per-model summary
+tables for recent days. It also deletes expired idempotency keys. Every
+run takes a Postgres advisory lock, so with several workers only one of
+them does the work.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import Settings, settings
+from app.crud.idempotency import idempotency_crud
+from app.crud.partitions import partition_crud, partition_name
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by all workers running partition maintenance
+MAINTENANCE_LOCK_KEY = 0x70726564  # "pred"
+
+RETENTION_ACTIONS = ("drop", "detach")
+
+
+class PredictionPartitionService:
+    """Create, retire and summarize daily prediction partitions."""
+
+    def __init__(
+        self,
+        premake_days: int = 7,
+        retention_days: int = 90,
+        retention_action: str = "drop",
+        interval_seconds: int = 3600,
+        summary_lookback_days: int = 2,
+        idempotency_ttl_seconds: int = 86400,
+    ):
+        """
+        Initialize partition service.
+
+        Args:
+            premake_days: Future daily partitions kept created ahead of time
+            retention_days: Days of partitions kept; 0 disables retention
+            retention_action: "drop" deletes old partitions, "detach" keeps them as archive tables
+            interval_seconds: Seconds between maintenance runs
+            summary_lookback_days: Recent days whose summaries are rebuilt each run
+            idempotency_ttl_seconds: Age after which idempotency keys are deleted
+        """
+        if retention_action not in RETENTION_ACTIONS:
+            raise ValueError(f"retention_action must be one of {RETENTION_ACTIONS}, got {retention_action!r}")
+        self.premake_days = premake_days
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+        self.interval_seconds = interval_seconds
+        self.summary_lookback_days = summary_lookback_days
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PredictionPartitionService":
+        """Build the service from application settings."""
+        return cls(
+            premake_days=settings.prediction_partition_premake_days,
+            retention_days=settings.prediction_retention_days,
+            retention_action=settings.prediction_retention_action,
+            interval_seconds=settings.partition_maintenance_interval_seconds,
+            summary_lookback_days=settings.prediction_summary_lookback_days,
+            idempotency_ttl_seconds=settings.idempotency_ttl_seconds,
+        )
+
+    def start(self) -> None:
+        """Start the maintenance task on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="partition-maintenance")
+
+    async def stop(self) -> None:
+        """Cancel the maintenance task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prediction partition maintenance failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Run one maintenance pass.
+
+        Returns:
+            Created, retired and summarized partitions, or ``{"skipped": True}``
+            when another worker holds the maintenance lock
+        """
+        today = datetime.now(timezone.utc).date()
+        report: Dict[str, Any] = {"skipped": False}
+
+        # Partition DDL in its own short transaction; a lock timeout keeps it
+        # from queueing inserts behind a long-running query
+        async with AsyncSessionLocal() as db:
+            if not await partition_crud.try_lock(db, MAINTENANCE_LOCK_KEY):
+                return {"skipped": True}
+            await db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            report["created"] = await self._premake(db, today)
+            report["retired"] = await self._apply_retention(db, today)
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.idempotency_ttl_seconds)
+            report["expired_idempotency_keys"] = await idempotency_crud.delete_expired(db, expired_before)
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            if not await partition_crud.try_lock(db, MAINTENANCE_LOCK_KEY):
+                return {"skipped": True}
+            start = today - timedelta(days=self.summary_lookback_days)
+            await partition_crud.rebuild_daily_summaries(db, start, today + timedelta(days=1))
+            await db.commit()
+            report["summarized_from"] = start.isoformat()
+
+        if report["created"] or report["retired"]:
+            logger.info(
+                f"Prediction partitions: created {report['created']}, "
+                f"{self.retention_action} {report['retired']}"
+            )
+        return report
+
+    async def _premake(self, db, today) -> List[str]:
+        """Create today's and the next premake_days partitions, and those of days in the default partition."""
+        existing = {name for name, _ in await partition_crud.list_partitions(db)}
+        days = [today + timedelta(days=offset) for offset in range(self.premake_days + 1)]
+        days += await partition_crud.default_partition_days(db)
+        created = []
+        for day in sorted(set(days)):
+            name = partition_name(day)
+            if name not in existing:
+                await partition_crud.create_daily_partition(db, day)
+                created.append(name)
+        return created
+
+    async def _apply_retention(self, db, today) -> List[str]:
+        """Drop or detach partitions whose rows are all older than the retention window."""
+        if self.retention_days <= 0:
+            return []
+        cutoff = datetime.combine(today - timedelta(days=self.retention_days), datetime.min.time())
+        retired = []
+        for name, upper_bound in await partition_crud.list_partitions(db):
+            if upper_bound is None or upper_bound > cutoff:
+                continue
+            if self.retention_action == "detach":
+                await partition_crud.detach_partition(db, name)
+            else:
+                await partition_crud.drop_partition(db, name)
+            retired.append(name)
+        return retired
+
+
+partition_service = PredictionPartitionService.from_settings(settings)
@@ -52,48 +52,6 @@ def preprocess_single_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
     return processed
 
 
-def validate_feature_ranges(sample: Dict[str, Any]) -> List[str]:
-    """
-    Validate feature ranges.
-    
-    Args:
-        sample: Dictionary containing feature values
-        
-    Returns:
-        List of validation errors
-    """
-    errors = []
-    
-    # Define valid ranges
-    ranges = {
-        'Time_spent_Alone': (0, 11),
-        'Social_event_attendance': (0, 10),
-        'Going_outside': (0, 10),
-        'Friends_circle_size': (0, 15),
-        'Post_frequency': (0, 10)
-    }
-    
-    for feature, (min_val, max_val) in ranges.items():
-        if feature in sample and sample[feature] is not None:
-            value = sample[feature]
-            if not (min_val <= value <= max_val):
-                errors.append(f"{feature} must be between {min_val} and {max_val}")
-    
-    # Validate categorical features
-    categorical_values = {
-        'Stage_fear': ['Yes', 'No'],
-        'Drained_after_socializing': ['Yes', 'No']
-    }
-    
-    for feature, valid_values in categorical_values.items():
-        if feature in sample and sample[feature] is not None:
-            value = sample[feature]
-            if value not in valid_values:
-                errors.append(f"{feature} must be one of {valid_values}")
-    
-    return errors
-
-
 def convert_to_model_format(sample: Dict[str, Any]) -> pd.DataFrame:
     """
     Convert sample to model input format.
@@ -1,169 +1,133 @@
 """
-Input validation utilities.
+Column-wise validation of prediction inputs.
+
+A batch is validated one feature column at a time with vectorized masks:
+numeric conversion and range checks for numerical features, and Yes/No
+checks for categorical ones. The cost grows with the number of columns,
+not with Python work per row. Every row gets its own error list, so a
+batch can score its valid rows and report the invalid ones instead of
+failing as a whole. The rules match ``PersonalityFeatures``: every feature
+is optional, numbers may be given as numeric strings, and Yes/No is
+case-insensitive.
 """
 
-from typing import Dict, Any, List, Optional, Union
-import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
 
+import numpy as np
 
-logger = logging.getLogger(__name__)
+from app.schemas.request import FEATURE_NAMES
 
+# Valid range of each numerical feature, by API field name
+NUMERICAL_RANGES = {
+    'time_spent_alone': (0, 11),
+    'social_event_attendance': (0, 10),
+    'going_outside': (0, 10),
+    'friends_circle_size': (0, 15),
+    'post_frequency': (0, 10)
+}
 
-def validate_required_features(sample: Dict[str, Any], required_features: List[str]) -> List[str]:
-    """
-    Validate that required features are present.
-    
-    Args:
-        sample: Dictionary containing feature values
-        required_features: List of required feature names
-        
-    Returns:
-        List of validation errors
-    """
-    errors = []
-    
-    for feature in required_features:
-        if feature not in sample:
-            errors.append(f"Missing required feature: {feature}")
-    
-    return errors
+# Categorical features, by API field name: lowercase value -> canonical value
+CATEGORICAL_VALUES = {
+    'stage_fear': {'yes': 'Yes', 'no': 'No'},
+    'drained_after_socializing': {'yes': 'Yes', 'no': 'No'}
+}
 
 
-def validate_feature_types(sample: Dict[str, Any]) -> List[str]:
-    """
-    Validate feature data types.
-    
-    Args:
-        sample: Dictionary containing feature values
-        
-    Returns:
-        List of validation errors
-    """
-    errors = []
-    
-    # Define expected types
-    type_mapping = {
-        'Time_spent_Alone': (int, float),
-        'Social_event_attendance': (int, float),
-        'Going_outside': (int, float),
-        'Friends_circle_size': (int, float),
-        'Post_frequency': (int, float),
-        'Stage_fear': str,
-        'Drained_after_socializing': str
-    }
-    
-    for feature, expected_type in type_mapping.items():
-        if feature in sample and sample[feature] is not None:
-            value = sample[feature]
-            if not isinstance(value, expected_type):
-                errors.append(f"{feature} must be of type {expected_type}")
-    
-    return errors
-
-
-def validate_feature_values(sample: Dict[str, Any]) -> List[str]:
-    """
-    Validate feature values are within acceptable ranges.
-    
-    Args:
-        sample: Dictionary containing feature values
-        
-    Returns:
-        List of validation errors
-    """
-    errors = []
-    
-    # Validate numerical ranges
-    numerical_ranges = {
-        'Time_spent_Alone': (0, 11),
-        'Social_event_attendance': (0, 10),
-        'Going_outside': (0, 10),
-        'Friends_circle_size': (0, 15),
-        'Post_frequency': (0, 10)
-    }
-    
-    for feature, (min_val, max_val) in numerical_ranges.items():
-        if feature in sample and sample[feature] is not None:
-            value = sample[feature]
-            if not (min_val <= value <= max_val):
-                errors.append(f"{feature} must be between {min_val} and {max_val}, got {value}")
-    
-    # Validate categorical values
-    categorical_values = {
-        'Stage_fear': ['Yes', 'No', 'yes', 'no'],
-        'Drained_after_socializing': ['Yes', 'No', 'yes', 'no']
-    }
-    
-    for feature, valid_values in categorical_values.items():
-        if feature in sample and sample[feature] is not None:
-            value = sample[feature]
-            if value not in valid_values:
-                errors.append(f"{feature} must be one of {valid_values}, got {value}")
-    
-    return errors
-
-
-def validate_sample(sample: Dict[str, Any], required_features: Optional[List[str]] = None) -> List[str]:
-    """
-    Comprehensive validation of a sample.
-    
-    Args:
-        sample: Dictionary containing feature values
-        required_features: Optional list of required features
-        
-    Returns:
-        List of validation errors
-    """
-    errors = []
-    
-    # Validate required features
-    if required_features:
-        errors.extend(validate_required_features(sample, required_features))
-    
-    # Validate feature types
-    errors.extend(validate_feature_types(sample))
-    
-    # Validate feature values
-    errors.extend(validate_feature_values(sample))
-    
-    if errors:
-        logger.warning(f"Validation errors found: {errors}")
-    
-    return errors
-
-
-def sanitize_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+@dataclass
+class BatchValidation:
+    """Outcome of validating a batch."""
+
+    features: List[Dict[str, Any]] = field(default_factory=list)  # valid rows, by model feature name
+    valid: List[int] = field(default_factory=list)  # input positions of the valid rows
+    errors: Dict[int, List[str]] = field(default_factory=dict)  # input position -> error messages
+
+
+def _to_number(value: Any) -> Any:
+    """Float value of a numerical input, None if it is missing, NaN if it is not a number."""
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float)):
+        try:
+            return float(value)
+        except OverflowError:
+            # An integer too large for a float is out of every range
+            return np.inf
+    # Padded decimal or exponent notation; digit separators and non-ASCII digits are rejected
+    if isinstance(value, str) and value.isascii() and "_" not in value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return np.nan
+
+
+def _is_string(value: Any) -> bool:
+    """Whether an input is a string."""
+    return isinstance(value, str)
+
+
+_to_numbers = np.frompyfunc(_to_number, 1, 1)
+_are_strings = np.frompyfunc(_is_string, 1, 1)
+
+
+def validate_batch(samples: Sequence[Any]) -> BatchValidation:
     """
-    Sanitize sample by cleaning and normalizing values.
-    
+    Validate a batch of raw samples column by column.
+
     Args:
-        sample: Dictionary containing feature values
-        
+        samples: Raw samples keyed by API field name; unknown keys are ignored
+
     Returns:
-        Sanitized sample
+        Normalized valid rows, their positions and per-row errors
     """
-    sanitized = sample.copy()
-    
-    # Normalize categorical values
-    categorical_features = ['Stage_fear', 'Drained_after_socializing']
-    
-    for feature in categorical_features:
-        if feature in sanitized and sanitized[feature] is not None:
-            value = str(sanitized[feature]).strip().title()
-            sanitized[feature] = value
-    
-    # Ensure numerical values are numeric
-    numerical_features = [
-        'Time_spent_Alone', 'Social_event_attendance', 'Going_outside',
-        'Friends_circle_size', 'Post_frequency'
+    n = len(samples)
+    masks: List[tuple] = []
+
+    objects = np.fromiter((isinstance(sample, dict) for sample in samples), dtype=bool, count=n)
+    masks.append((~objects, "sample must be an object"))
+    records = [sample if is_object else {} for sample, is_object in zip(samples, objects)]
+
+    def column(name: str) -> np.ndarray:
+        return np.fromiter((record.get(name) for record in records), dtype=object, count=n)
+
+    normalized = {}
+    for name, (low, high) in NUMERICAL_RANGES.items():
+        raw = column(name)
+        missing = np.equal(raw, None).astype(bool)
+        # Missing values become NaN too; an explicit NaN is rejected like a
+        # non-number (PersonalityFeatures' range check fails on it)
+        values = _to_numbers(raw).astype(np.float64)
+        masks.append((~missing & np.isnan(values), f"{name}: must be a number"))
+        masks.append(((values < low) | (values > high), f"{name}: must be between {low} and {high}"))
+        normalized[FEATURE_NAMES[name]] = np.where(missing, None, values)
+
+    for name, canonical in CATEGORICAL_VALUES.items():
+        raw = column(name)
+        missing = np.equal(raw, None).astype(bool)
+        strings = _are_strings(raw).astype(bool)
+        masks.append((~missing & ~strings, f"{name}: must be a string"))
+        lowered = np.char.lower(raw[strings].astype(str))
+        values = np.full(n, None, dtype=object)
+        positions = np.flatnonzero(strings)
+        for lower, value in canonical.items():
+            values[positions[lowered == lower]] = value
+        masks.append((strings & np.equal(values, None).astype(bool), f'{name}: must be either "Yes" or "No"'))
+        normalized[FEATURE_NAMES[name]] = values
+
+    result = BatchValidation()
+    invalid = np.zeros(n, dtype=bool)
+    for mask, message in masks:
+        if mask.any():
+            for row in np.flatnonzero(mask):
+                result.errors.setdefault(int(row), []).append(message)
+            invalid |= mask
+
+    # Rows keep the model's feature names; missing values are None, as from PersonalityFeatures.to_dict
+    result.valid = np.flatnonzero(~invalid).tolist()
+    columns = {feature: values[result.valid].tolist() for feature, values in normalized.items()}
+    result.features = [
+        {feature: columns[feature][position] for feature in FEATURE_NAMES.values()}
+        for position in range(len(result.valid))
     ]
-    
-    for feature in numerical_features:
-        if feature in sanitized and sanitized[feature] is not None:
-            try:
-                sanitized[feature] = float(sanitized[feature])
-            except (ValueError, TypeError):
-                logger.warning(f"Could not convert {feature} to float: {sanitized[feature]}")
-                sanitized[feature] = None
-    
-    return sanitized
\ No newline at end of file
+    return result
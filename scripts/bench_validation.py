@@ -0,0 +1,47 @@
+"""
+Micro-benchmark of column-wise batch validation.
+
+Times ``validate_batch`` on batches of typical samples, so a change to the
+validation engine can be checked against the per-call budget of the
+single-sample and batch paths.
+
+Usage:
+    python scripts/bench_validation.py --sizes 1 100 --repeat 2000
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils.validation import validate_batch  # noqa: E402
+
+# Example sample by API field name, with numeric strings and mixed-case Yes/No
+EXAMPLE = {
+    "time_spent_alone": 5.0,
+    "stage_fear": "no",
+    "social_event_attendance": "7",
+    "going_outside": 6,
+    "drained_after_socializing": "Yes",
+    "friends_circle_size": None,
+    "post_frequency": 4,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100], help="Batch sizes to time")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls timed per batch size")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        samples = [dict(EXAMPLE) for _ in range(size)]
+        timer = timeit.Timer(lambda: validate_batch(samples))
+        best = min(timer.repeat(repeat=5, number=args.repeat)) / args.repeat
+        print(f"{size:>6} rows: {best * 1e6:8.1f} us/call, {best * 1e6 / size:6.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
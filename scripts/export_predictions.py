@@ -0,0 +1,252 @@
+"""
+Incremental Parquet export of the prediction log for analytics.
+
+Streams ``predictions`` out of Postgres through a server-side cursor, one
+time window at a time, and writes each window to its own Parquet file under
+a ``date=YYYY-MM-DD`` directory. The JSONB features and results are
+flattened into typed columns in SQL. Chunks of ``--chunk-size`` rows are
+written as row groups as they arrive, so memory stays bounded whatever the
+table size. A checkpoint file records the end of the last exported window,
+and a rerun continues from there. Only windows that ended at least
+``--settle-seconds`` ago are exported, so rows still being written are not
+missed.
+
+Usage:
+    python scripts/export_predictions.py --output exports/predictions
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+
+# Yes/No features; every other model feature is numeric
+CATEGORICAL_FEATURES = ("Stage_fear", "Drained_after_socializing")
+
+CHECKPOINT_FILE = "_checkpoint.json"
+
+
+def setup_logging():
+    """Setup logging configuration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
+def build_schema() -> pa.Schema:
+    """Arrow schema of the flattened export."""
+    feature_fields = [
+        pa.field(name, pa.string() if name in CATEGORICAL_FEATURES else pa.float64())
+        for name in settings.feature_names
+    ]
+    return pa.schema([
+        pa.field("id", pa.string()),
+        pa.field("request_id", pa.string()),
+        pa.field("user_id", pa.string()),
+        pa.field("created_at", pa.timestamp("us", tz="UTC")),
+        pa.field("prediction_type", pa.string()),
+        pa.field("model_version", pa.string()),
+        pa.field("processing_time_ms", pa.int32()),
+        *feature_fields,
+        pa.field("prediction", pa.string()),
+        pa.field("prediction_code", pa.int8()),
+        pa.field("probability_introvert", pa.float64()),
+        pa.field("probability_extrovert", pa.float64()),
+        pa.field("confidence", pa.float64()),
+    ])
+
+
+def build_query():
+    """Window query flattening the JSONB payloads into typed columns."""
+    features = [
+        f"input_features->>'{name}'" if name in CATEGORICAL_FEATURES
+        else f"CAST(input_features->>'{name}' AS double precision)"
+        for name in settings.feature_names
+    ]
+    return text(
+        "SELECT CAST(id AS text), request_id, CAST(user_id AS text), created_at, "
+        "prediction_type, model_version, processing_time_ms, "
+        + ", ".join(features) + ", "
+        "prediction_result->>'prediction', "
+        "CAST(prediction_result->>'prediction_code' AS smallint), "
+        "CAST(prediction_result->'probabilities'->>'Introvert' AS double precision), "
+        "CAST(prediction_result->'probabilities'->>'Extrovert' AS double precision), "
+        "CAST(prediction_result->>'confidence' AS double precision) "
+        "FROM predictions "
+        "WHERE created_at >= :start AND created_at < :end"
+    )
+
+
+def floor_window(moment: datetime, window: timedelta) -> datetime:
+    """Align a timestamp down to a window boundary (windows start at UTC midnight)."""
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + ((moment - midnight) // window) * window
+
+
+def load_checkpoint(output: Path) -> Optional[datetime]:
+    """End of the last exported window, if any."""
+    path = output / CHECKPOINT_FILE
+    if not path.exists():
+        return None
+    return datetime.fromisoformat(json.loads(path.read_text())["exported_until"])
+
+
+def save_checkpoint(output: Path, exported_until: datetime) -> None:
+    """Atomically record the end of the last exported window."""
+    path = output / CHECKPOINT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"exported_until": exported_until.isoformat()}))
+    os.replace(tmp, path)
+
+
+async def export_window(
+    conn: AsyncConnection,
+    output: Path,
+    schema: pa.Schema,
+    start: datetime,
+    end: datetime,
+    chunk_size: int
+) -> int:
+    """
+    Stream one window into its Parquet file.
+
+    Args:
+        conn: Database connection
+        output: Export root directory
+        schema: Arrow schema of the export
+        start: Window start (inclusive)
+        end: Window end (exclusive)
+        chunk_size: Rows fetched from the cursor and written per row group
+
+    Returns:
+        Number of rows exported
+    """
+    directory = output / f"date={start.date().isoformat()}"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"predictions-{start.strftime('%H%M%S')}-{end.strftime('%H%M%S')}.parquet"
+    tmp = path.with_suffix(".parquet.tmp")
+
+    rows = 0
+    writer = None
+    try:
+        # Server-side cursor: rows are fetched chunk_size at a time, never buffered whole
+        query = build_query().execution_options(max_row_buffer=chunk_size)
+        result = await conn.stream(query, {"start": start, "end": end})
+        async for chunk in result.partitions(chunk_size):
+            columns = list(zip(*chunk))
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, schema, compression="zstd")
+            writer.write_batch(batch)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # Rerunning a window replaces its file, so a crash before the checkpoint
+    # write never leaves duplicate rows behind
+    if writer is not None:
+        os.replace(tmp, path)
+    return rows
+
+
+async def export(
+    database_url: str,
+    output: Path,
+    window: timedelta,
+    chunk_size: int,
+    settle: timedelta,
+    since: Optional[datetime] = None
+) -> None:
+    """Export every settled window after the checkpoint."""
+    logger = logging.getLogger(__name__)
+    output.mkdir(parents=True, exist_ok=True)
+    schema = build_schema()
+    engine = create_async_engine(database_url, pool_size=1, max_overflow=0)
+
+    try:
+        async with engine.connect() as conn:
+            start = load_checkpoint(output) or since
+            if start is None:
+                async with conn.begin():
+                    first = (await conn.execute(text("SELECT min(created_at) FROM predictions"))).scalar()
+                if first is None:
+                    logger.info("No predictions to export")
+                    return
+                start = floor_window(first.astimezone(timezone.utc), window)
+
+            horizon = datetime.now(timezone.utc) - settle
+            total = 0
+            while start + window <= horizon:
+                end = start + window
+                # Each window is its own short transaction on the source database
+                async with conn.begin():
+                    rows = await export_window(conn, output, schema, start, end, chunk_size)
+                save_checkpoint(output, end)
+                total += rows
+                logger.info(f"Exported {rows} predictions for {start.isoformat()} - {end.isoformat()}")
+                start = end
+            logger.info(f"Export complete: {total} predictions, checkpoint at {start.isoformat()}")
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export the prediction log to partitioned Parquet files")
+    parser.add_argument("--output", default="exports/predictions", help="Export root directory")
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("EXPORT_DATABASE_URL", settings.DATABASE_URL),
+        help="Source database; point it at a read replica to keep load off the primary",
+    )
+    parser.add_argument("--window-minutes", type=int, default=60, help="Rows per file, by created_at")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows fetched and written per row group")
+    parser.add_argument("--settle-seconds", type=int, default=300, help="Skip windows that ended more recently")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Start of the first export when there is no checkpoint (default: oldest prediction)",
+    )
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main export function."""
+    setup_logging()
+    args = parse_args()
+    window = timedelta(minutes=args.window_minutes)
+    if timedelta(days=1) % window:
+        raise SystemExit("--window-minutes must divide a day evenly")
+    since = args.since
+    if since is not None:
+        since = floor_window(since if since.tzinfo else since.replace(tzinfo=timezone.utc), window)
+    asyncio.run(export(
+        args.database_url,
+        Path(args.output),
+        window,
+        args.chunk_size,
+        timedelta(seconds=args.settle_seconds),
+        since,
+    ))
+
+
+if __name__ == "__main__":
+    main()
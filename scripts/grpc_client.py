@@ -0,0 +1,108 @@
+"""
+Local client for the gRPC prediction service.
+
+Fetches the model info, makes one unary prediction and then sends a burst
+of single-sample requests over one ``PredictStream``, reporting the
+throughput and checking that every request got its answer. Start the API
+with ``GRPC_ENABLED=true`` first.
+
+Usage:
+    python scripts/grpc_client.py --target localhost:50051 --stream-requests 10000
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import grpc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.rpc import prediction_pb2, prediction_pb2_grpc  # noqa: E402
+
+# Example sample by feature name; categorical values are given as labels
+EXAMPLE = {
+    "Time_spent_Alone": 5.0,
+    "Stage_fear": "No",
+    "Social_event_attendance": 7.0,
+    "Going_outside": 6.0,
+    "Drained_after_socializing": "Yes",
+    "Friends_circle_size": 8.0,
+    "Post_frequency": 4.0,
+}
+
+
+def encode(info: prediction_pb2.ModelInfo, sample: dict) -> list:
+    """Packed feature values of one sample in the server's feature order."""
+    values = []
+    for feature in info.feature_names:
+        value = sample.get(feature)
+        if value is None:
+            values.append(math.nan)
+        elif feature in info.categories:
+            values.append(float(list(info.categories[feature].labels).index(value)))
+        else:
+            values.append(float(value))
+    return values
+
+
+def random_sample() -> dict:
+    return {
+        "Time_spent_Alone": float(random.randint(0, 11)),
+        "Stage_fear": random.choice(["No", "Yes"]),
+        "Social_event_attendance": float(random.randint(0, 10)),
+        "Going_outside": float(random.randint(0, 10)),
+        "Drained_after_socializing": random.choice(["No", "Yes"]),
+        "Friends_circle_size": float(random.randint(0, 15)),
+        "Post_frequency": float(random.randint(0, 10)),
+    }
+
+
+async def run(target: str, stream_requests: int) -> None:
+    async with grpc.aio.insecure_channel(target) as channel:
+        stub = prediction_pb2_grpc.PersonalityPredictorStub(channel)
+
+        info = await stub.GetModelInfo(prediction_pb2.ModelInfoRequest())
+        print(f"Model {info.model_version}: features {list(info.feature_names)}")
+
+        response = await stub.Predict(prediction_pb2.PredictRequest(request_id="unary", features=encode(info, EXAMPLE)))
+        code = response.prediction_codes[0]
+        print(f"Unary: {info.class_labels[code]} (Extrovert probability {response.extrovert_probabilities[0]:.3f})")
+
+        async def requests():
+            for index in range(stream_requests):
+                yield prediction_pb2.PredictRequest(request_id=str(index), features=encode(info, random_sample()))
+
+        started = time.perf_counter()
+        answered, errors = set(), 0
+        async for response in stub.PredictStream(requests()):
+            answered.add(response.request_id)
+            errors += bool(response.error)
+        elapsed = time.perf_counter() - started
+
+        missing = stream_requests - len(answered)
+        print(
+            f"Stream: {stream_requests} requests in {elapsed:.2f}s "
+            f"({stream_requests / elapsed:.0f}/s), {errors} errors, {missing} unanswered"
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Exercise the gRPC prediction service")
+    parser.add_argument("--target", default="localhost:50051", help="gRPC server address")
+    parser.add_argument("--stream-requests", type=int, default=1000, help="Requests sent over one stream")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main client function."""
+    args = parse_args()
+    asyncio.run(run(args.target, args.stream_requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,15 @@ import xgboost as xgb
 from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import json
 import logging
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.drift import PROBABILITY, build_profile  # noqa: E402
 
 
 def setup_logging():
@@ -155,6 +162,32 @@ def save_model(model, model_path: str):
     logger.info("Model saved successfully")
 
 
+def save_reference_profile(raw_df, model, X, profile_path: str):
+    """
+    Save the drift monitor's reference profile.
+    
+    Bins the raw (pre-encoding) training features and the model's predicted
+    Extrovert probabilities, as the serving drift monitor does for live traffic.
+    
+    Args:
+        raw_df: Training data as read from the CSV
+        model: Trained XGBoost model
+        X: Encoded training features
+        profile_path: Path to save the profile
+    """
+    logger = logging.getLogger(__name__)
+    
+    columns = {
+        name: raw_df[name].where(raw_df[name].notna(), None).tolist()
+        for name in X.columns
+    }
+    columns[PROBABILITY] = model.predict_proba(X)[:, 1].tolist()
+    
+    logger.info(f"Saving reference profile to {profile_path}")
+    with open(profile_path, "w") as f:
+        json.dump(build_profile(columns), f)
+
+
 def main():
     """Main training function."""
     setup_logging()
@@ -165,6 +198,7 @@ def main():
     # Paths
     data_path = 'data/personality_train.csv'
     model_path = 'models/model.ubj'
+    profile_path = 'models/reference_profile.json'
     
     try:
         # Load and preprocess data
@@ -176,6 +210,9 @@ def main():
         # Save model
         save_model(model, model_path)
         
+        # Save the reference distribution used for drift monitoring
+        save_reference_profile(pd.read_csv(data_path), model, X, profile_path)
+        
         logger.info("Training completed successfully!")
         
     except Exception as e:
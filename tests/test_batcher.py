@@ -0,0 +1,86 @@
+"""
+The micro-batcher flushes a batch as soon as it is full, or once its oldest
+item has waited ``max_wait_ms``.
+"""
+
+import asyncio
+import time
+
+from app.core.batcher import MicroBatcher
+
+
+class Recorder:
+    """Batch function that records the batches it was called with."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+
+def test_full_batch_is_flushed_without_waiting():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch=3, max_wait_ms=10_000)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(item) for item in range(3))), 1)
+
+    assert asyncio.run(main()) == [0, 10, 20]
+    assert recorder.batches == [[0, 1, 2]]
+
+
+def test_partial_batch_is_flushed_by_the_timer():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch=64, max_wait_ms=50)
+
+    async def main():
+        started = time.perf_counter()
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(main())
+
+    assert results == [10, 20]
+    assert recorder.batches == [[1, 2]]
+    assert elapsed >= 0.05
+
+
+def test_items_beyond_a_full_batch_start_the_next_one():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch=2, max_wait_ms=20)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(item) for item in range(5)))
+
+    assert asyncio.run(main()) == [0, 10, 20, 30, 40]
+    assert recorder.batches == [[0, 1], [2, 3], [4]]
+
+
+def test_batch_error_fails_every_item_of_the_batch():
+    async def fail(items):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(fail, max_batch=2, max_wait_ms=10)
+
+    async def main():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    errors = asyncio.run(main())
+
+    assert [str(error) for error in errors] == ["model unavailable"] * 2
+
+
+def test_close_flushes_pending_items():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch=64, max_wait_ms=10_000)
+
+    async def main():
+        pending = asyncio.create_task(batcher.submit(7))
+        await asyncio.sleep(0)
+        assert len(batcher) == 1
+        await batcher.close()
+        return await pending
+
+    assert asyncio.run(main()) == 70
@@ -0,0 +1,125 @@
+"""
+Cascaded early-exit inference must never change a sample's predicted class.
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.api.endpoints import predict
+from app.core.config import get_settings
+from app.db.session import get_db
+from app.models.cascade import Cascade
+from app.models.model_loader import ModelLoader
+from app.models.predictor import PersonalityPredictor
+from app.utils.validation import NUMERICAL_RANGES
+from app.schemas.request import FEATURE_NAMES
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    settings = get_settings()
+    model_loader = ModelLoader(settings.xgb_model_path)
+    asyncio.run(model_loader.load_model())
+    return PersonalityPredictor(model_loader)
+
+
+def samples(count, seed=0):
+    """Random valid samples over the full feature ranges, with some values missing."""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        sample = {
+            FEATURE_NAMES[name]: float(rng.integers(low, high + 1))
+            for name, (low, high) in NUMERICAL_RANGES.items()
+        }
+        sample['Stage_fear'] = str(rng.choice(['Yes', 'No']))
+        sample['Drained_after_socializing'] = str(rng.choice(['Yes', 'No']))
+        for feature in sample:
+            if rng.random() < 0.1:
+                sample[feature] = None
+        yield sample
+
+
+# Late stages, where the remaining-tree bounds are narrow enough for most rows to exit
+EXITING_STAGES = [45, 55]
+
+
+@pytest.mark.parametrize("stages", [get_settings().cascade_stages, [1, 2, 5], [30], EXITING_STAGES, [40, 50, 55, 58]])
+def test_cascade_never_flips_the_class(predictor, stages):
+    model = predictor.model_loader.get_model()
+    cascade = Cascade.calibrate(model, stages, get_settings().cascade_margin_epsilon)
+    frame = predictor._frame([predictor.encode(sample) for sample in samples(5000)])
+
+    margins, evaluated = cascade.margins(model, frame)
+    full = model.predict_proba(frame)[:, 1]
+
+    np.testing.assert_array_equal((margins > 0).astype(int), (full > 0.5).astype(int))
+    # Rows that ran every tree have the full model's margin
+    complete = evaluated == cascade.total_iterations
+    np.testing.assert_allclose(1 / (1 + np.exp(-margins[complete])), full[complete], atol=1e-5)
+
+
+def test_cascade_exits_early(predictor):
+    model = predictor.model_loader.get_model()
+    cascade = Cascade.calibrate(model, EXITING_STAGES, get_settings().cascade_margin_epsilon)
+    frame = predictor._frame([predictor.encode(sample) for sample in samples(5000)])
+
+    _, evaluated = cascade.margins(model, frame)
+
+    assert (evaluated < cascade.total_iterations).mean() > 0.5
+
+
+def test_cascade_results_match_full_predictions(predictor, monkeypatch):
+    model = predictor.model_loader.get_model()
+    monkeypatch.setattr(predictor, "cascade", Cascade.calibrate(model, EXITING_STAGES))
+    features_list = list(samples(2000, seed=1))
+
+    cascaded = predictor.predict_batch(features_list, cascade=True)
+    full = predictor.predict_batch(features_list)
+
+    assert any(result['early_exit'] for result in cascaded)
+    for cascaded_result, full_result in zip(cascaded, full):
+        assert cascaded_result['prediction_code'] == full_result['prediction_code']
+        if not cascaded_result['early_exit']:
+            assert cascaded_result['probabilities']['Extrovert'] == pytest.approx(
+                full_result['probabilities']['Extrovert'], abs=1e-5
+            )
+
+
+def test_early_exit_single_prediction_is_logged_without_confidence(predictor, monkeypatch):
+    model = predictor.model_loader.get_model()
+    monkeypatch.setattr(predictor, "cascade", Cascade.calibrate(model, EXITING_STAGES))
+    sample = next(
+        sample for sample in samples(200, seed=2)
+        if predictor.predict_single(sample, cascade=True)['early_exit']
+    )
+    fields = {field: sample[feature] for field, feature in FEATURE_NAMES.items()}
+
+    async def run(lane, fn, *args):
+        return fn(*args)
+
+    logged = []
+
+    async def create_prediction(db, prediction_data, user_id, request_id=None, commit=True):
+        logged.append(prediction_data)
+
+    monkeypatch.setattr(predict.prediction_crud, "create_prediction", create_prediction)
+    app = FastAPI()
+    app.include_router(predict.router, prefix="/predict")
+    app.state.predictor = predictor
+    app.state.scheduler = SimpleNamespace(run=run)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=uuid.uuid4())
+
+    response = TestClient(app).post("/predict/single?cascade=true", json={"features": fields})
+
+    assert response.status_code == 200
+    assert response.json()["result"]["early_exit"] is True
+    assert logged[0].confidence_score is None
+    assert logged[0].prediction_result["early_exit"] is True
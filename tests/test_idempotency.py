@@ -0,0 +1,100 @@
+"""
+A duplicate request waits for a key claimed by another worker and takes the
+claim over once it is older than the claim timeout.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import idempotency_service as service_module
+from app.services.idempotency_service import IdempotencyService
+
+USER_ID = "user"
+KEY = "key-1"
+PAYLOAD = {"Time_spent_Alone": 5.0}
+
+
+class FakeIdempotencyCRUD:
+    """idempotency_keys with the claim rules of IdempotencyCRUD, in memory."""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def claim(self, db, user_id, key, payload, now, expired_before, abandoned_before):
+        row = self.rows.get((user_id, key))
+        if row is None or row.created_at < expired_before or (
+            row.result is None and row.created_at < abandoned_before
+        ):
+            self.rows[(user_id, key)] = SimpleNamespace(payload=payload, result=None, created_at=now)
+            return True
+        return False
+
+    async def get(self, db, user_id, key):
+        return self.rows.get((user_id, key))
+
+    async def complete(self, db, user_id, key, result):
+        self.rows[(user_id, key)].result = result
+
+    async def release(self, db, user_id, key):
+        self.rows.pop((user_id, key), None)
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def crud(monkeypatch):
+    crud = FakeIdempotencyCRUD()
+    # Claimed by another worker that never finishes
+    crud.rows[(USER_ID, KEY)] = SimpleNamespace(
+        payload=PAYLOAD, result=None, created_at=datetime.now(timezone.utc)
+    )
+    monkeypatch.setattr(service_module, "idempotency_crud", crud)
+    return crud
+
+
+def test_abandoned_claim_is_taken_over_after_the_timeout(crud):
+    service = IdempotencyService(claim_timeout_seconds=0.2)
+    runs = []
+
+    async def run():
+        runs.append(1)
+        return {"prediction": "Extrovert"}
+
+    started = time.perf_counter()
+    result, replayed = asyncio.run(service.execute(FakeSession(), USER_ID, KEY, PAYLOAD, run))
+
+    assert time.perf_counter() - started >= 0.2
+    assert (result, replayed) == ({"prediction": "Extrovert"}, False)
+    assert runs == [1]
+    assert crud.rows[(USER_ID, KEY)].result == {"prediction": "Extrovert"}
+
+
+def test_claim_completed_by_another_worker_is_replayed(crud):
+    service = IdempotencyService(claim_timeout_seconds=30)
+
+    async def run():
+        raise AssertionError("the key was already running in another worker")
+
+    async def main():
+        async def finish_elsewhere():
+            await asyncio.sleep(0.05)
+            crud.rows[(USER_ID, KEY)].result = {"prediction": "Introvert"}
+
+        finisher = asyncio.create_task(finish_elsewhere())
+        outcome = await service.execute(FakeSession(), USER_ID, KEY, PAYLOAD, run)
+        await finisher
+        return outcome
+
+    result, replayed = asyncio.run(main())
+
+    assert (result, replayed) == ({"prediction": "Introvert"}, True)
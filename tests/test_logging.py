@@ -0,0 +1,40 @@
+"""
+Records logged after the queue listener has stopped must still be written.
+"""
+
+import json
+import logging
+
+import pytest
+
+from app.core.logging import setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    shutdown_logging()
+    root.handlers, root.level = handlers, level
+
+
+def test_records_after_shutdown_are_written(root_logger, capsys):
+    setup_logging("INFO", "json")
+    logging.getLogger("app.test").info("while running")
+    shutdown_logging()
+    logging.getLogger("app.test").info("after shutdown")
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["message"] for line in lines] == ["while running", "after shutdown"]
+
+
+def test_logging_can_be_set_up_again_after_shutdown(root_logger, capsys):
+    setup_logging("INFO", "json")
+    shutdown_logging()
+    setup_logging("INFO", "json")
+    logging.getLogger("app.test").info("second run")
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["message"] for line in lines] == ["second run"]
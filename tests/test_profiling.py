@@ -0,0 +1,20 @@
+"""
+Only a bounded number of requests are profiled at once.
+"""
+
+from app.core.profiling import RequestProfiler
+
+SCOPE = {"type": "http", "path": "/predict/single", "headers": []}
+
+
+def test_requests_are_not_profiled_while_the_profiler_is_busy(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_files=10, interval_ms=1.0, max_concurrent=1)
+
+    first = profiler.begin(SCOPE)
+    assert first is not None
+    assert profiler.begin(SCOPE) is None
+
+    profiler.finish(first)
+    second = profiler.begin(SCOPE)
+    assert second is not None
+    profiler.finish(second)
@@ -0,0 +1,69 @@
+"""
+The interactive lane goes first, but a waiting bulk job is served after at
+most ``starvation_limit`` interactive dispatches.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.core.scheduler import BULK, INTERACTIVE, Lane, LaneScheduler
+
+
+def scheduler(starvation_limit):
+    return LaneScheduler(
+        lanes=[Lane(INTERACTIVE, 1, 100), Lane(BULK, 1, 100)],
+        workers=1,
+        starvation_limit=starvation_limit,
+    )
+
+
+def dispatch_order(scheduler, jobs):
+    """Names of ``jobs`` (lane, name) in the order the single worker ran them, all queued behind a blocking job."""
+
+    async def main():
+        scheduler.start()
+        try:
+            gate = threading.Event()
+            order = []
+            blocker = asyncio.create_task(scheduler.run(INTERACTIVE, gate.wait))
+            await asyncio.sleep(0.01)
+            runs = []
+            for lane, name in jobs:
+                runs.append(asyncio.create_task(scheduler.run(lane, order.append, name)))
+                await asyncio.sleep(0)
+            gate.set()
+            await asyncio.gather(blocker, *runs)
+            return order
+        finally:
+            scheduler.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_bulk_job_is_served_after_starvation_limit():
+    jobs = [(INTERACTIVE, f"i{index}") for index in range(6)] + [(BULK, "b0"), (BULK, "b1")]
+
+    order = dispatch_order(scheduler(starvation_limit=2), jobs)
+
+    assert order == ["i0", "i1", "b0", "i2", "i3", "b1", "i4", "i5"]
+
+
+def test_interactive_lane_goes_first_within_the_limit():
+    jobs = [(BULK, "b0"), (INTERACTIVE, "i0"), (INTERACTIVE, "i1")]
+
+    order = dispatch_order(scheduler(starvation_limit=10), jobs)
+
+    assert order == ["i0", "i1", "b0"]
+
+
+def test_starved_lane_with_the_oldest_job_is_served():
+    high, middle, low = Lane("high", 1, 10), Lane("middle", 1, 10), Lane("low", 1, 10)
+    lanes_scheduler = LaneScheduler(lanes=[high, middle, low], workers=1, starvation_limit=1)
+    high.queue.append(SimpleNamespace(enqueued_at=3.0))
+    middle.queue.append(SimpleNamespace(enqueued_at=2.0))
+    low.queue.append(SimpleNamespace(enqueued_at=1.0))
+
+    assert lanes_scheduler._next_lane() is high
+    assert lanes_scheduler._next_lane() is low
+    assert lanes_scheduler._bypassed == 0
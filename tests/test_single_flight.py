@@ -0,0 +1,119 @@
+"""
+Identical concurrent calls share one execution, including its error, and
+a cancelled leader hands the call over to a waiter. Coalesced single
+predictions still count every caller.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.singleflight import SingleFlight
+from app.models.model_loader import ModelLoader
+from app.models.predictor import PersonalityPredictor
+
+SAMPLE = {
+    "Time_spent_Alone": 5.0,
+    "Stage_fear": "No",
+    "Social_event_attendance": 7.0,
+    "Going_outside": 6.0,
+    "Drained_after_socializing": "Yes",
+    "Friends_circle_size": 8.0,
+    "Post_frequency": 4.0,
+}
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    settings = get_settings()
+    model_loader = ModelLoader(settings.xgb_model_path)
+    asyncio.run(model_loader.load_model())
+    return PersonalityPredictor(model_loader)
+
+
+def test_coalesced_callers_are_each_counted_in_drift(predictor):
+    calls = []
+
+    async def run(fn, *args):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return fn(*args)
+
+    async def predict_concurrently(count):
+        return await asyncio.gather(*(
+            predictor.predict_single_coalesced(run, dict(SAMPLE)) for _ in range(count)
+        ))
+
+    before = predictor.drift.memory_report()["current_samples"]
+    results = asyncio.run(predict_concurrently(3))
+
+    assert len(calls) == 1
+    assert results[0] == results[1] == results[2]
+    assert predictor.drift.memory_report()["current_samples"] - before == 3
+
+
+def test_error_is_shared_with_waiters():
+    group = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(group.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+
+    assert calls == 1
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len(group) == 0
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    group = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        leader = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter, leader
+
+    (result, shared), leader = asyncio.run(main())
+
+    assert leader.cancelled()
+    assert (result, shared) == (2, False)
+    assert len(group) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_leader():
+    group = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(group.do("key", compute))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await leader, waiter
+
+    (result, shared), waiter = asyncio.run(main())
+
+    assert waiter.cancelled()
+    assert (result, shared) == ("done", False)
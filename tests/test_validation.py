@@ -0,0 +1,119 @@
+"""
+Column-wise batch validation must accept and normalize exactly what
+PersonalityFeatures does, since it is the only validation of batch, CSV
+and gRPC input.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.api.endpoints import predict
+from app.schemas.request import PersonalityFeatures
+from app.utils.validation import validate_batch
+
+CASES = [
+    # Complete and empty samples
+    {
+        "time_spent_alone": 5.0, "stage_fear": "No", "social_event_attendance": 7,
+        "going_outside": 6, "drained_after_socializing": "Yes",
+        "friends_circle_size": 8, "post_frequency": 4,
+    },
+    {},
+    {"time_spent_alone": None, "stage_fear": None},
+    # Numeric strings
+    {"time_spent_alone": "5"},
+    {"post_frequency": " 10.0 "},
+    {"friends_circle_size": "1e1"},
+    {"going_outside": "abc"},
+    {"going_outside": "nan"},
+    {"going_outside": ""},
+    # Bools
+    {"time_spent_alone": True},
+    {"social_event_attendance": False},
+    {"stage_fear": True},
+    # Out of range
+    {"time_spent_alone": 11},
+    {"time_spent_alone": 11.5},
+    {"time_spent_alone": -0.1},
+    {"friends_circle_size": 16},
+    {"post_frequency": float("inf")},
+    {"post_frequency": float("nan")},
+    # Mixed-case Yes/No
+    {"stage_fear": "yes"},
+    {"stage_fear": "NO"},
+    {"drained_after_socializing": "yEs"},
+    {"drained_after_socializing": "maybe"},
+    {"drained_after_socializing": ""},
+    # Non-string categoricals
+    {"stage_fear": 1},
+    {"stage_fear": 0.0},
+    {"drained_after_socializing": ["Yes"]},
+    {"drained_after_socializing": {"value": "Yes"}},
+    # Non-numeric numericals
+    {"time_spent_alone": [1]},
+    {"time_spent_alone": {"hours": 1}},
+    # Unknown keys are ignored
+    {"time_spent_alone": 3, "unknown": "x"},
+]
+
+NON_OBJECTS = [None, 1, "time_spent_alone=5", ["No"], True]
+
+
+def reference(sample):
+    """Normalized features from PersonalityFeatures, or None when it rejects the sample."""
+    if not isinstance(sample, dict):
+        return None
+    try:
+        return PersonalityFeatures(**sample).to_dict()
+    except (ValidationError, TypeError):
+        return None
+
+
+@pytest.mark.parametrize("sample", CASES, ids=repr)
+def test_sample_matches_personality_features(sample):
+    expected = reference(sample)
+    validation = validate_batch([sample])
+
+    if expected is None:
+        assert validation.valid == []
+        assert validation.errors[0]
+    else:
+        assert validation.errors == {}
+        assert validation.features == [expected]
+
+
+@pytest.mark.parametrize("sample", NON_OBJECTS, ids=repr)
+def test_non_object_samples_are_rejected(sample):
+    validation = validate_batch([sample])
+
+    assert validation.valid == []
+    assert validation.errors == {0: ["sample must be an object"]}
+
+
+def test_mixed_batch_keeps_positions_of_valid_rows():
+    samples = CASES + NON_OBJECTS
+    validation = validate_batch(samples)
+
+    expected = [reference(sample) for sample in samples]
+    assert validation.valid == [index for index, features in enumerate(expected) if features is not None]
+    assert validation.features == [features for features in expected if features is not None]
+    assert sorted(validation.errors) == [index for index, features in enumerate(expected) if features is None]
+
+
+def test_all_invalid_batch_returns_422():
+    app = FastAPI()
+    app.include_router(predict.router, prefix="/predict")
+    app.state.predictor = SimpleNamespace(cascade=None)
+    client = TestClient(app)
+
+    response = client.post("/predict/batch", json={"features": [{"stage_fear": "maybe"}, 3]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"index": 0, "errors": ['stage_fear: must be either "Yes" or "No"']},
+        {"index": 1, "errors": ["sample must be an object"]},
+    ]
@@ -0,0 +1,101 @@
+"""
+The WebSocket channel authenticates once, then answers pipelined messages
+by id as soon as each result is ready.
+"""
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from fastapi import FastAPI, HTTPException, status
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.endpoints import websocket
+
+TOKEN = "valid-token"
+
+
+class Batcher:
+    """Scores a sample by echoing its time alone; 1 hour takes longer than the others."""
+
+    async def submit(self, features):
+        await asyncio.sleep(0.05 if features["Time_spent_Alone"] == 1 else 0)
+        return {"echo": features["Time_spent_Alone"]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def authenticate_token(db, token):
+        if token != TOKEN:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        return SimpleNamespace(id="user")
+
+    @contextlib.asynccontextmanager
+    async def session():
+        yield None
+
+    monkeypatch.setattr(websocket, "authenticate_token", authenticate_token)
+    monkeypatch.setattr(websocket, "AsyncSessionLocal", session)
+    app = FastAPI()
+    app.include_router(websocket.router, prefix="/predict")
+    app.state.batcher = Batcher()
+    return TestClient(app)
+
+
+def send(connection, message):
+    connection.send_text(orjson.dumps(message).decode())
+
+
+def test_header_auth_and_out_of_order_answers(client):
+    with client.websocket_connect("/predict/ws", headers={"Authorization": f"Bearer {TOKEN}"}) as connection:
+        assert connection.receive_json()["type"] == "ready"
+        send(connection, {"id": "slow", "features": {"time_spent_alone": 1}})
+        send(connection, {"id": "fast", "features": {"time_spent_alone": 2}})
+
+        answers = [connection.receive_json() for _ in range(2)]
+
+    assert answers == [
+        {"id": "fast", "result": {"echo": 2.0}},
+        {"id": "slow", "result": {"echo": 1.0}},
+    ]
+
+
+def test_first_message_auth_and_invalid_messages(client):
+    with client.websocket_connect("/predict/ws") as connection:
+        send(connection, {"type": "auth", "token": TOKEN})
+        assert connection.receive_json()["type"] == "ready"
+        send(connection, {"id": 1, "features": {"stage_fear": "maybe"}})
+        connection.send_text("[]")
+
+        invalid = connection.receive_json()
+        not_an_object = connection.receive_json()
+
+    assert invalid["id"] == 1 and invalid["status"] == 422
+    assert not_an_object == {"id": None, "status": 422, "error": "message must be an object"}
+
+
+@pytest.mark.parametrize("first_message", [
+    {"type": "auth", "token": "wrong"},
+    {"type": "auth"},
+    {"id": 1, "features": {}},
+])
+def test_invalid_credentials_close_with_policy_violation(client, first_message):
+    with client.websocket_connect("/predict/ws") as connection:
+        send(connection, first_message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            connection.receive_json()
+
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_binary_frame_closes_with_unsupported_data(client):
+    with client.websocket_connect("/predict/ws", headers={"Authorization": f"Bearer {TOKEN}"}) as connection:
+        connection.receive_json()
+        connection.send_bytes(b"\x00")
+        with pytest.raises(WebSocketDisconnect) as closed:
+            connection.receive_json()
+
+    assert closed.value.code == status.WS_1003_UNSUPPORTED_DATA